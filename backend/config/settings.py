@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,7 +46,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'eld_api.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'eld_api.db_router.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -83,6 +87,12 @@ DATABASES = {
     }
 }
 
+# Read replicas: DATABASES aliases that reads are routed to (see eld_api/db_router.py)
+DATABASE_ROUTERS = ['eld_api.db_router.ReplicaRouter']
+ELD_DB_REPLICAS = []
+# Seconds a client's reads stay on the primary after it writes (read-your-writes)
+ELD_REPLICA_STICKY_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -132,7 +142,62 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
+        # Compact alternatives for mobile clients (see eld_api/renderers.py)
+        'eld_api.renderers.ColumnarJSONRenderer',
+        'eld_api.renderers.MessagePackRenderer',
     ],
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'eld_api.renderers.CompactContentNegotiation',
+}
+
+# Memoized cycle-independent trip plans, keyed by normalized lane
+TRIP_PLAN_CACHE = {
+    'MAX_ENTRIES': 1024,
+    'TTL_SECONDS': 6 * 60 * 60,
+}
+# Plans of simulated what-if lanes, cached apart from the trip plans above
+SIMULATION_PLAN_CACHE = {
+    'MAX_ENTRIES': 256,
+    'TTL_SECONDS': 60 * 60,
+}
+
+# Load the truck-stop index, HOS rule tables and services in AppConfig.ready()
+# (preload them in the master process, e.g. gunicorn --preload, to share them across workers;
+# config/wsgi.py then freezes them out of the garbage collector)
+ELD_PREWARM_REFERENCE_DATA = True
+
+# HOS rule table applied to trips and driver logs: '70_8' (70h/8-day) or '60_7' (60h/7-day)
+HOS_RULE_SET = '70_8'
+
+# POST /api/trips/simulate/ limits
+TRIP_SIMULATION_MAX_VARIANTS = 500
+TRIP_SIMULATION_BUDGET_MS = 2000
+
+# Pub/sub behind GET /api/trips/{id}/events/ (server-sent events, needs ASGI)
+ELD_EVENT_BROKER = 'eld_api.events.InProcessBroker'
+
+# ELD log retention: partitions older than this are archived to NDJSON
+ELD_LOG_RETENTION_MONTHS = 6
+ELD_LOG_ARCHIVE_DIR = BASE_DIR / 'archive' / 'eld_logs'
+
+# Records per validation/insert chunk for POST /api/eld-logs/bulk/
+ELD_INGEST_CHUNK_SIZE = 5000
+
+# POST /api/trips/{id}/position/ rewrites stop ETAs only when they move by at least this much
+ELD_ETA_MIN_CHANGE_MINUTES = 2
+
+# Per-client token buckets for the expensive endpoints (see eld_api/admission.py):
+# bursts of up to CAPACITY requests, refilling at REFILL_PER_SECOND
+ELD_TOKEN_BUCKETS = {
+    'trip_create': {'CAPACITY': 20, 'REFILL_PER_SECOND': 1},
+    'batch': {'CAPACITY': 5, 'REFILL_PER_SECOND': 0.2},
+}
+# Cache alias holding the buckets
+ELD_THROTTLE_CACHE = 'default'
+# Per-process concurrency limits: requests running at once, how many more may wait,
+# and for how many seconds, before being shed with 503
+ELD_ADMISSION_POOLS = {
+    'trip_create': {'MAX_CONCURRENT': 8, 'MAX_QUEUE': 16, 'QUEUE_TIMEOUT': 2},
+    'batch': {'MAX_CONCURRENT': 2, 'MAX_QUEUE': 4, 'QUEUE_TIMEOUT': 5},
 }
 
 # CORS settings
@@ -142,3 +207,6 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True  # For development only
+# Replica stickiness header (see eld_api/db_router.py): readable by the frontend and sent back by it
+CORS_EXPOSE_HEADERS = ['X-ELD-Read-Primary-Until']
+CORS_ALLOW_HEADERS = (*default_headers, 'x-eld-read-primary-until')
@@ -0,0 +1,42 @@
+"""
+Slim API-only settings for serverless deploys (see vercel.json).
+
+The JSON API never touches the admin, sessions, messages, static files or
+template stack, so this profile leaves them out of INSTALLED_APPS and
+MIDDLEWARE: a cold start then imports, checks and keeps resident only what
+a request needs. Compare profiles with `python manage.py benchmark startup`.
+
+rest_framework also imports optional packages (requests, yaml, pygments,
+markdown, ...) whenever they are installed. requirements.txt lists none of
+them, so keep them out of the deploy bundle rather than hiding them here.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'rest_framework',
+    'corsheaders',
+    'eld_api',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'eld_api.compression.CompressionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'eld_api.db_router.ReplicaPinningMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+TEMPLATES = []
+
+AUTH_PASSWORD_VALIDATORS = []
+
+# Without django.contrib.auth there is no user model to authenticate against
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
+
+# Cold starts only pay for reference data when a request first needs it
+ELD_PREWARM_REFERENCE_DATA = False
@@ -0,0 +1,170 @@
+"""Admission control for the expensive write and batch endpoints
+
+Two layers, checked in this order:
+
+* TokenBucketThrottle, a DRF throttle: each client (by IP, honouring
+  NUM_PROXIES) gets a bucket of settings.ELD_TOKEN_BUCKETS[scope] tokens
+  that refills continuously, so bursts up to CAPACITY pass and the
+  sustained rate is capped. An empty bucket answers 429 with Retry-After.
+* ConcurrencyLimiter, per pool in settings.ELD_ADMISSION_POOLS: at most
+  MAX_CONCURRENT requests run, up to MAX_QUEUE more wait QUEUE_TIMEOUT
+  seconds for a slot, and anything beyond is shed at once with 503.
+
+Buckets live in a Django cache (the local-memory default unless
+ELD_THROTTLE_CACHE names another) and limiters in process memory, so both
+are per worker process.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import APIException
+from rest_framework.throttling import BaseThrottle
+
+
+class Overloaded(APIException):
+    status_code = 503
+    default_detail = 'Server is busy, retry shortly.'
+    default_code = 'overloaded'
+
+    def __init__(self, wait: float = None, detail=None):
+        super().__init__(detail)
+        # Read by DRF's exception handler to set Retry-After
+        self.wait = wait
+
+
+_throttled: Dict[str, int] = {}
+_bucket_lock = threading.Lock()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Per-client token bucket for the view's `throttle_scope`"""
+    cache_format = 'eld_bucket:%(scope)s:%(ident)s'
+
+    def __init__(self, scope: str = None):
+        self.scope = scope
+        self.retry_after = None
+
+    def allow_request(self, request, view):
+        self.scope = self.scope or getattr(view, 'throttle_scope', None)
+        config = getattr(settings, 'ELD_TOKEN_BUCKETS', {}).get(self.scope)
+        if config is None:
+            return True
+        capacity, rate = config['CAPACITY'], config['REFILL_PER_SECOND']
+
+        cache = caches[getattr(settings, 'ELD_THROTTLE_CACHE', 'default')]
+        key = self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+        with _bucket_lock:
+            now = time.time()
+            tokens, updated = cache.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            else:
+                self.retry_after = (1 - tokens) / rate
+                _throttled[self.scope] = _throttled.get(self.scope, 0) + 1
+            # An idle bucket expires once it would have refilled anyway
+            cache.set(key, (tokens, now), timeout=int((capacity - tokens) / rate) + 1)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class ConcurrencyLimiter:
+    """Bounded concurrency with a bounded, time-limited wait queue"""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self.active = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+
+    def _acquire(self):
+        with self._condition:
+            if self.active < self.max_concurrent and not self.queued:
+                self.active += 1
+                self.admitted += 1
+                return
+            if self.queued >= self.max_queue:
+                self.shed_queue_full += 1
+                raise Overloaded(wait=math.ceil(self.queue_timeout))
+
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            try:
+                admitted = self._condition.wait_for(
+                    lambda: self.active < self.max_concurrent, timeout=self.queue_timeout
+                )
+            finally:
+                self.queued -= 1
+            if not admitted:
+                self.shed_timeout += 1
+                raise Overloaded(wait=math.ceil(self.queue_timeout))
+            self.active += 1
+            self.admitted += 1
+
+    def _release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self):
+        """Hold a slot for the block, or raise Overloaded (503)"""
+        self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'active': self.active,
+                'queue_depth': self.queued,
+                'peak_queue_depth': self.peak_queued,
+                'admitted': self.admitted,
+                'shed_queue_full': self.shed_queue_full,
+                'shed_timeout': self.shed_timeout,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_limiter(pool: str) -> ConcurrencyLimiter:
+    """Process-wide limiter for a pool in settings.ELD_ADMISSION_POOLS"""
+    config = getattr(settings, 'ELD_ADMISSION_POOLS', {})[pool]
+    return ConcurrencyLimiter(pool, config['MAX_CONCURRENT'], config['MAX_QUEUE'], config['QUEUE_TIMEOUT'])
+
+
+def limit_concurrency(pool: str):
+    """Run a view method inside a slot of the pool's limiter"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            with get_limiter(pool).slot():
+                return method(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def admission_stats() -> Dict:
+    return {
+        'pools': {pool: get_limiter(pool).stats() for pool in getattr(settings, 'ELD_ADMISSION_POOLS', {})},
+        'throttled': {scope: _throttled.get(scope, 0) for scope in getattr(settings, 'ELD_TOKEN_BUCKETS', {})},
+    }
@@ -1,6 +1,44 @@
+import time
+from typing import Dict
+
 from django.apps import AppConfig
+from django.conf import settings
+
+
+def _reference_loaders():
+    """Process-wide reference data and stateless services, by name
+
+    Each loader is an lru_cache'd getter, so calling it once here is what
+    every later request reuses.
+    """
+    from .hos_rules import RULE_SETS, get_rule_engine
+    from .services import get_hos_service, get_route_service
+    from .truck_stops import get_truck_stop_index
+
+    return {
+        'truck_stop_index': get_truck_stop_index,
+        'hos_rule_engines': lambda: [get_rule_engine(name) for name in RULE_SETS] + [get_rule_engine()],
+        'route_service': get_route_service,
+        'hos_service': get_hos_service,
+    }
 
 
 class EldApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'eld_api'
+    # Milliseconds each reference loader took in ready(), empty when prewarming is off
+    warmup_ms: Dict[str, float] = {}
+
+    def ready(self):
+        if getattr(settings, 'ELD_PREWARM_REFERENCE_DATA', True):
+            self.warm_reference_data()
+
+    def warm_reference_data(self) -> Dict[str, float]:
+        """Load reference data and services once, before the first request needs them"""
+        timings = {}
+        for name, load in _reference_loaders().items():
+            started = time.perf_counter()
+            load()
+            timings[name] = round((time.perf_counter() - started) * 1000, 2)
+        type(self).warmup_ms = timings
+        return timings
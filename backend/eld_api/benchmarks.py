@@ -0,0 +1,421 @@
+"""Micro-benchmarks run with `python manage.py benchmark <name>`
+
+Each benchmark returns a dict of measurements; they avoid the database
+unless the benchmark is about database work.
+"""
+import time
+from datetime import time as dtime
+from types import SimpleNamespace
+from typing import Callable, Dict
+
+BENCHMARKS: Dict[str, Callable[..., Dict]] = {}
+
+
+def benchmark(name: str):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def _sample_day_logs(variant: int):
+    """A typical long-haul day, shifted by `variant` minutes so every sheet differs"""
+    shift = variant % 120
+    layout = [
+        (480, 510, 'on_duty_not_driving'), (510, 570, 'driving'), (570, 630, 'on_duty_not_driving'),
+        (630, 870, 'driving'), (870, 900, 'on_duty_not_driving'), (900, 1140, 'driving'),
+        (1140, 1170, 'sleeper_berth'), (1170, 1260, 'driving'), (1260, 1320, 'on_duty_not_driving'),
+    ]
+    logs = []
+    for start, end, status in layout:
+        start, end = start + shift, min(end + shift, 1439)
+        logs.append(SimpleNamespace(
+            start_time=dtime(start // 60, start % 60),
+            end_time=dtime(end // 60, end % 60),
+            duty_status=status,
+        ))
+    return logs
+
+
+@benchmark('log_sheets')
+def bench_log_sheets(count: int = 10000) -> Dict:
+    """Uncached render throughput of daily log sheets (target: 10k SVG/minute/core)"""
+    from .log_sheet import RENDERERS, day_segments
+
+    days = [day_segments(_sample_day_logs(i)) for i in range(count)]
+    results = {'sheets': count}
+    for fmt, (renderer, _) in RENDERERS.items():
+        n = count if fmt == 'svg' else max(1, count // 10)
+        started = time.perf_counter()
+        for segments in days[:n]:
+            renderer(segments, f"Daily Log sample {fmt}")
+        elapsed = time.perf_counter() - started
+        results[f'{fmt}_per_minute'] = round(n / elapsed * 60)
+    return results
+
+
+@benchmark('ingest')
+def bench_ingest(count: int = 1000000) -> Dict:
+    """Bulk ingest of `count` NDJSON records into the database, rolled back afterwards"""
+    import json
+    from datetime import date, timedelta
+    from django.db import transaction
+    from .ingest import BulkLogIngestor, parse_ndjson
+    from .models import Trip
+
+    statuses = ['on_duty_not_driving', 'driving', 'sleeper_berth', 'off_duty']
+    results = {'records': count}
+    with transaction.atomic():
+        trip = Trip.objects.create(
+            current_location='Benchmark', pickup_location='Benchmark',
+            dropoff_location='Benchmark', current_cycle_hours=0
+        )
+        start_day = date(2026, 1, 1)
+
+        def lines():
+            for i in range(count):
+                minute = (i % 96) * 15
+                yield json.dumps({
+                    'trip': str(trip.id),
+                    'date': (start_day + timedelta(days=i // 96)).isoformat(),
+                    'start_time': f'{minute // 60:02d}:{minute % 60:02d}',
+                    'end_time': f'{(minute + 15) // 60 % 24:02d}:{(minute + 15) % 60:02d}',
+                    'duty_status': statuses[i % 4],
+                    'location': 'I-40 mile marker',
+                    'vehicle_miles': 13,
+                }).encode()
+
+        started = time.perf_counter()
+        result = BulkLogIngestor().ingest(parse_ndjson(lines()))
+        elapsed = time.perf_counter() - started
+        results.update(inserted=result['inserted'], seconds=round(elapsed, 2),
+                       rows_per_second=round(count / elapsed))
+
+        # Replaying the same upload must insert nothing
+        started = time.perf_counter()
+        replay = BulkLogIngestor().ingest(parse_ndjson(lines()))
+        results.update(replay_duplicates=replay['duplicates'],
+                       replay_seconds=round(time.perf_counter() - started, 2))
+        transaction.set_rollback(True)
+    return results
+
+
+# Cold start of one WSGI worker: settings, app registry, URLconf and a first request
+STARTUP_SCRIPT = '''
+import io, resource, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': '/api/', 'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+    'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http',
+}
+b''.join(application(environ, lambda status, headers: None))
+elapsed = time.perf_counter() - started
+# ru_maxrss survives exec on Linux and would report the parent's peak; VmHWM is per process image
+try:
+    with open('/proc/self/status') as status:
+        peak_kb = next(int(line.split()[1]) for line in status if line.startswith('VmHWM:'))
+except OSError:
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(elapsed, peak_kb, len(sys.modules))
+'''
+
+
+def _cold_start(settings_module: str, importtime: bool = False):
+    import os
+    import subprocess
+    import sys
+    from django.conf import settings
+
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module, PYTHONPATH=str(settings.BASE_DIR))
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', STARTUP_SCRIPT]
+    proc = subprocess.run(command, env=env, cwd=settings.BASE_DIR, capture_output=True, text=True, check=True)
+    seconds, maxrss_kb, modules = proc.stdout.split()
+    return float(seconds), int(maxrss_kb), int(modules), proc.stderr
+
+
+def _slowest_imports(report: str, limit: int = 10):
+    """Top-level packages by cumulative import time from a `-X importtime` report"""
+    totals = {}
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.startswith(' ') and not name.startswith('  '):
+            package = name.strip().split('.')[0]
+            totals[package] = totals.get(package, 0) + int(cumulative)
+    ranked = sorted(totals.items(), key=lambda item: -item[1])[:limit]
+    return {package: round(us / 1000, 1) for package, us in ranked}
+
+
+@benchmark('startup')
+def bench_startup(count: int = 5) -> Dict:
+    """Cold-start wall time, peak RSS and import cost of the full vs slim serverless settings"""
+    import statistics
+
+    profiles = ('config.settings', 'config.settings_serverless')
+    # Alternate the profiles so drifting machine load skews both alike
+    all_runs = {profile: [] for profile in profiles}
+    for _ in range(count):
+        for profile in profiles:
+            all_runs[profile].append(_cold_start(profile))
+
+    results = {}
+    for profile, runs in all_runs.items():
+        report = _cold_start(profile, importtime=True)[3]
+        results[profile] = {
+            'cold_start_ms': round(statistics.median(run[0] for run in runs) * 1000, 1),
+            'max_rss_mb': round(statistics.median(run[1] for run in runs) / 1024, 1),
+            'modules': runs[0][2],
+            'slowest_imports_ms': _slowest_imports(report),
+        }
+    full, slim = results['config.settings'], results['config.settings_serverless']
+    results['cold_start_reduction'] = round(1 - slim['cold_start_ms'] / full['cold_start_ms'], 3)
+    results['rss_reduction'] = round(1 - slim['max_rss_mb'] / full['max_rss_mb'], 3)
+    return results
+
+
+@benchmark('log_timestamps')
+def bench_log_timestamps(count: int = 20000) -> Dict:
+    """Per-segment cost of turning a planned log timeline into row dates/times and JSON strings
+
+    Compares naive datetime/timedelta arithmetic with strftime against
+    integer epoch minutes converted once at the boundary.
+    """
+    import tracemalloc
+    from datetime import datetime, timedelta
+    from .clock import (
+        LocalClock, clock_string, get_zone, local_date, local_day_start, local_time, now_minutes
+    )
+    from .services import build_trip_plan
+
+    segments = build_trip_plan('New York, NY', 'New York, NY', 'Denver, CO').eld_logs
+    zone = get_zone('America/Chicago')
+
+    def legacy():
+        rows = []
+        for _ in range(count):
+            current_date = datetime.now().date()
+            day_start = datetime.combine(current_date, dtime(8, 0))
+            for segment in segments:
+                start = day_start + timedelta(minutes=segment['start_offset_minutes'])
+                end = start + timedelta(minutes=segment['duration_minutes'])
+                rows.append((start, end))
+        return rows
+
+    def legacy_boundary(rows):
+        return [(start.date(), start.time(), end.time(), start.date().isoformat(),
+                 start.time().strftime('%H:%M:%S'), end.time().strftime('%H:%M:%S')) for start, end in rows]
+
+    def minutes():
+        rows = []
+        span = segments[-1]['start_offset_minutes'] + segments[-1]['duration_minutes']
+        for _ in range(count):
+            day_start = local_day_start(now_minutes(), zone, hour=8)
+            clock = LocalClock(zone, day_start, day_start + span)
+            for segment in segments:
+                start = clock.local(day_start + segment['start_offset_minutes'])
+                rows.append((start, start + segment['duration_minutes']))
+        return rows
+
+    def minutes_boundary(rows):
+        return [(local_date(start), local_time(start), local_time(end), local_date(start).isoformat(),
+                 clock_string(start), clock_string(end)) for start, end in rows]
+
+    results = {'segments': count * len(segments)}
+    for name, build, boundary in (('datetime', legacy, legacy_boundary), ('epoch_minutes', minutes, minutes_boundary)):
+        started = time.perf_counter()
+        timeline = build()
+        build_seconds = time.perf_counter() - started
+
+        # Separate traced run: tracemalloc slows allocation too much to time under it
+        del timeline
+        tracemalloc.start()
+        timeline = build()
+        timeline_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        boundary(timeline)
+        boundary_seconds = time.perf_counter() - started
+        results[name] = {
+            'timeline_ns_per_segment': round(build_seconds / results['segments'] * 1e9),
+            'timeline_bytes_per_segment': round(timeline_bytes / results['segments']),
+            'boundary_ns_per_segment': round(boundary_seconds / results['segments'] * 1e9),
+        }
+    return results
+
+
+@benchmark('wire_formats')
+def bench_wire_formats(count: int = 5000) -> Dict:
+    """Payload bytes and encode time of an eld_logs-style response per format and compression"""
+    import gzip
+    import json
+    import uuid
+    from datetime import date, timedelta
+    from .compression import BROTLI_QUALITY, brotli
+    from .models import ELDLog
+    from .renderers import ColumnarJSONRenderer, MessagePackRenderer, from_columnar
+    from .serializers import ELDLogSerializer
+    from rest_framework.renderers import JSONRenderer
+
+    # One trip's logs over consecutive days, nine segments a day shifted differently each day
+    trip_id, driver_id = uuid.uuid4(), uuid.uuid4()
+    per_day = len(_sample_day_logs(0))
+    logs = []
+    for i in range(count):
+        day = i // per_day
+        segment = _sample_day_logs(day * 37)[i % per_day]
+        logs.append(ELDLog(
+            id=i + 1, trip_id=trip_id, driver_id=driver_id,
+            date=date(2026, 1, 1) + timedelta(days=day),
+            start_time=segment.start_time, end_time=segment.end_time, duty_status=segment.duty_status,
+            location='En route to Los Angeles, CA', vehicle_miles=220 if segment.duty_status == 'driving' else 0,
+            total_hours=4.0, driving_time=4.0 if segment.duty_status == 'driving' else 0.0, on_duty_time=4.0,
+        ))
+    data = {'trip_id': trip_id, 'logs': ELDLogSerializer(logs, many=True).data}
+
+    compressors = {'gzip': lambda body: gzip.compress(body, compresslevel=6)}
+    if brotli is not None:
+        compressors['br'] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+
+    renderers = [JSONRenderer(), ColumnarJSONRenderer()]
+    if MessagePackRenderer.available:
+        renderers.append(MessagePackRenderer())
+
+    results = {'rows': count}
+    for renderer in renderers:
+        started = time.perf_counter()
+        body = renderer.render(data)
+        encode_seconds = time.perf_counter() - started
+        entry = {'bytes': len(body), 'encode_ms': round(encode_seconds * 1000, 1)}
+        for name, compress in compressors.items():
+            started = time.perf_counter()
+            compressed = compress(body)
+            entry[f'{name}_bytes'] = len(compressed)
+            entry[f'{name}_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        results[renderer.format] = entry
+
+    columnar = json.loads(ColumnarJSONRenderer().render(data))
+    results['columnar_round_trip'] = from_columnar(columnar) == json.loads(JSONRenderer().render(data))
+    formats = [renderer.format for renderer in renderers]
+    results['gzip_bytes_vs_json'] = {
+        fmt: round(results[fmt]['gzip_bytes'] / results['json']['gzip_bytes'], 3) for fmt in formats
+    }
+    return results
+
+
+@benchmark('request_setup')
+def bench_request_setup(count: int = 20000) -> Dict:
+    """Per-request setup before planning: fresh services and gazetteer vs the ready() registry
+
+    Also times the first trip plan of a process with cold reference data
+    against one after EldApiConfig.ready() has warmed it.
+    """
+    from django.apps import apps
+    from .hos_rules import get_rule_engine
+    from .services import (
+        GAZETTEER, US_CENTER, HOSService, RouteService, build_trip_plan, geocode, get_hos_service,
+        get_route_service
+    )
+    from .truck_stops import get_truck_stop_index
+
+    addresses = ('Chicago, IL', 'Denver, CO', 'Los Angeles, CA')
+
+    def legacy_geocode(address):
+        # As before the registry: the lookup table was rebuilt on every call
+        table = {city.title(): coords for city, coords in GAZETTEER}
+        for city, coords in table.items():
+            if city.lower() in address.lower():
+                return coords
+        return US_CENTER
+
+    def per_request():
+        RouteService()
+        HOSService()
+        for address in addresses:
+            legacy_geocode(address)
+
+    def registry():
+        get_route_service()
+        get_hos_service()
+        for address in addresses:
+            geocode(address)
+
+    results = {'requests': count}
+    for name, setup in (('per_request', per_request), ('registry', registry)):
+        setup()
+        started = time.perf_counter()
+        for _ in range(count):
+            setup()
+        results[f'{name}_us'] = round((time.perf_counter() - started) / count * 1e6, 2)
+
+    loaders = (get_truck_stop_index, get_rule_engine, geocode, get_route_service, get_hos_service)
+
+    def first_plan_ms():
+        started = time.perf_counter()
+        build_trip_plan(*addresses)
+        return round((time.perf_counter() - started) * 1000, 2)
+
+    for loader in loaders:
+        loader.cache_clear()
+    results['first_plan_cold_ms'] = first_plan_ms()
+    for loader in loaders:
+        loader.cache_clear()
+    results['warmup_ms'] = apps.get_app_config('eld_api').warm_reference_data()
+    results['first_plan_warm_ms'] = first_plan_ms()
+    return results
+
+
+@benchmark('eta_pings')
+def bench_eta_pings(count: int = 20000) -> Dict:
+    """Position-ping throughput of ETA recomputation across a fleet, rolled back afterwards"""
+    import random
+    from django.db import transaction
+    from .clock import now_minutes, to_datetime
+    from .eta import record_position
+    from .geo import Polyline
+    from .models import RouteStop, Trip
+
+    fleet = max(1, count // 100)
+    route = Polyline([(41.8781, -87.6298), (39.7392, -104.9903), (34.0522, -118.2437)])
+    stop_miles = [route.cumulative[1], route.cumulative[1] + 400, route.cumulative[1] + 800, route.length]
+    stop_types = ['pickup', 'fuel_stop', 'mandatory_break', 'dropoff']
+    rng = random.Random(42)
+    start = now_minutes()
+
+    results = {'trips': fleet, 'pings': count}
+    with transaction.atomic():
+        trips = Trip.objects.bulk_create([
+            Trip(current_location='Chicago, IL', pickup_location='Denver, CO',
+                 dropoff_location='Los Angeles, CA', current_cycle_hours=0)
+            for _ in range(fleet)
+        ])
+        RouteStop.objects.bulk_create([
+            RouteStop(trip=trip, stop_type=stop_type, location=stop_type, latitude=lat, longitude=lon,
+                      estimated_arrival=to_datetime(start + round(mile / 55 * 60)), duration_minutes=30, order=order)
+            for trip in trips
+            for order, (stop_type, mile) in enumerate(zip(stop_types, stop_miles))
+            for lat, lon in [route.point_at(mile)]
+        ])
+
+        # Each truck advances along the route, running at 45-65 mph against the planned 55
+        speeds = {trip.id: rng.uniform(45, 65) for trip in trips}
+        writes = 0
+        started = time.perf_counter()
+        for i in range(count):
+            trip = trips[i % fleet]
+            minute = (i // fleet + 1) * 10
+            result = record_position(trip.id, route.point_at(speeds[trip.id] * minute / 60), start + minute)
+            writes += bool(result['reached'] or result['updated'])
+        elapsed = time.perf_counter() - started
+        transaction.set_rollback(True)
+
+    results.update(
+        seconds=round(elapsed, 2),
+        pings_per_second=round(count / elapsed),
+        # Share of pings that issued the bulk UPDATE; the rest only read
+        writing_pings=round(writes / count, 3),
+    )
+    return results
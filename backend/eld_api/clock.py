@@ -0,0 +1,91 @@
+"""Integer epoch-minute timestamps for planned stops and log segments
+
+Trip timelines are plain ints, minutes since the Unix epoch (UTC). They
+become aware datetimes, or wall-clock dates and times in a driver's home
+terminal time zone, only at the database and JSON boundary.
+"""
+import time as _time
+from datetime import date, datetime, time, timezone as dt_timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils import timezone
+
+MINUTES_PER_DAY = 24 * 60
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def now_minutes() -> int:
+    return int(_time.time()) // 60
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: str = None) -> ZoneInfo:
+    """ZoneInfo by IANA name (default: settings.TIME_ZONE)"""
+    return ZoneInfo(name or settings.TIME_ZONE)
+
+
+def today_in(zone_name: str = None) -> date:
+    """Today's wall-clock date in the named zone (default: settings.TIME_ZONE)"""
+    return timezone.localdate(timezone=get_zone(zone_name))
+
+
+def utc_offset_minutes(minute: int, zone: ZoneInfo) -> int:
+    return int(datetime.fromtimestamp(minute * 60, zone).utcoffset().total_seconds()) // 60
+
+
+def local_day_start(minute: int, zone: ZoneInfo, hour: int = 0) -> int:
+    """Epoch minute of hour:00 wall-clock time on the zone's local day containing `minute`"""
+    local = minute + utc_offset_minutes(minute, zone)
+    start = local - local % MINUTES_PER_DAY + hour * 60
+    return start - utc_offset_minutes(start - utc_offset_minutes(minute, zone), zone)
+
+
+def to_datetime(minute: int) -> datetime:
+    """Aware UTC datetime for the database"""
+    return datetime.fromtimestamp(minute * 60, dt_timezone.utc)
+
+
+def from_datetime(value: datetime) -> int:
+    """Epoch minute of an aware datetime, truncated"""
+    return int(value.timestamp()) // 60
+
+
+def to_iso(minute: int) -> str:
+    """ISO 8601 UTC timestamp for JSON, formatted like DRF's DateTimeField"""
+    day, rest = divmod(minute, MINUTES_PER_DAY)
+    return f"{date.fromordinal(EPOCH_ORDINAL + day).isoformat()}T{rest // 60:02d}:{rest % 60:02d}:00Z"
+
+
+def local_date(local_minute: int) -> date:
+    return date.fromordinal(EPOCH_ORDINAL + local_minute // MINUTES_PER_DAY)
+
+
+def local_time(local_minute: int) -> time:
+    minute = local_minute % MINUTES_PER_DAY
+    return time(minute // 60, minute % 60)
+
+
+def clock_string(local_minute: int) -> str:
+    """HH:MM:SS wall-clock string, as ELD log times are serialized"""
+    minute = local_minute % MINUTES_PER_DAY
+    return f"{minute // 60:02d}:{minute % 60:02d}:00"
+
+
+class LocalClock:
+    """Maps epoch minutes in [start, end] to a zone's wall clock
+
+    Looks the UTC offset up once when no DST change falls inside the span,
+    so converting a trip's segments costs an addition each.
+    """
+
+    def __init__(self, zone: ZoneInfo, start: int, end: int):
+        self.zone = zone
+        offset = utc_offset_minutes(start, zone)
+        self.offset = offset if utc_offset_minutes(end, zone) == offset else None
+
+    def local(self, minute: int) -> int:
+        if self.offset is not None:
+            return minute + self.offset
+        return minute + utc_offset_minutes(minute, self.zone)
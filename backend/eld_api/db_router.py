@@ -0,0 +1,99 @@
+"""Read replica routing with read-your-writes stickiness
+
+Reads go to one of settings.ELD_DB_REPLICAS and writes to 'default'.
+ReplicaPinningMiddleware keeps a request on the primary when it may write
+(unsafe methods) and, after a successful write, for the next
+ELD_REPLICA_STICKY_SECONDS of that client's requests, so a client sees the
+trip it just created even while the replicas lag.
+
+To try it locally with two SQLite files::
+
+    DATABASES['replica'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'replica.sqlite3',
+                            'TEST': {'MIRROR': 'default'}}
+    ELD_DB_REPLICAS = ['replica']
+
+then copy db.sqlite3 over replica.sqlite3 whenever the "replica" should
+catch up; migrations only ever run against the primary.
+
+Stickiness travels in a header rather than a cookie, so it works across
+origins without credentialed CORS: a successful write answers with
+X-ELD-Read-Primary-Until (epoch seconds), and the client echoes that
+header on its requests until then. A client can only ever use it to pin
+its own reads to the primary.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY = 'default'
+STICKY_HEADER = 'X-ELD-Read-Primary-Until'
+
+_pinned: ContextVar[bool] = ContextVar('eld_db_pinned', default=False)
+
+
+@contextmanager
+def use_primary():
+    """Route every read in the block to the primary"""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def replica_aliases():
+    return [alias for alias in getattr(settings, 'ELD_DB_REPLICAS', []) if alias in settings.DATABASES]
+
+
+class ReplicaRouter:
+    """Send reads to a random replica unless pinned to the primary; writes always go to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if _pinned.get():
+            return PRIMARY
+        replicas = replica_aliases()
+        return random.choice(replicas) if replicas else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {PRIMARY, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary, never from migrate
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """Pin unsafe requests, and a client's requests shortly after its writes, to the primary"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = request.method not in ('GET', 'HEAD', 'OPTIONS')
+        if not (writes or _sticky(request)) or not replica_aliases():
+            return self.get_response(request)
+
+        with use_primary():
+            response = self.get_response(request)
+        if writes and response.status_code < 400:
+            until = time.time() + getattr(settings, 'ELD_REPLICA_STICKY_SECONDS', 5)
+            response[STICKY_HEADER] = str(int(until) + 1)
+        return response
+
+
+def _sticky(request) -> bool:
+    """Whether the client echoed a stickiness deadline that has not passed yet"""
+    until = request.headers.get(STICKY_HEADER, '')
+    return until.isdigit() and int(until) > time.time()
@@ -0,0 +1,108 @@
+"""Route-stop ETA updates from GPS position pings
+
+A ping re-times only the trip's pending stops: the next stop's ETA is
+recomputed from the truck's position, and every later pending stop keeps
+its planned gap to it, so all of them shift by the same delay. Stops
+already reached are never touched, and a delay smaller than
+ELD_ETA_MIN_CHANGE_MINUTES writes nothing, so steady pings of a truck on
+schedule are read-only. Each ping costs one indexed read of the trip's
+stops and at most one bulk UPDATE.
+"""
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from .clock import from_datetime, to_datetime, to_iso
+from .events import ETAS_UPDATED, STOP_REACHED, publish_on_commit
+from .geo import Coordinate, haversine_miles
+from .models import RouteStop
+from .services import AVERAGE_SPEED_MPH
+
+# A ping this close to a stop counts as arriving there
+ARRIVAL_RADIUS_MILES = 1.0
+# Stops a driver may skip; pickup and dropoff must be reached
+SKIPPABLE_STOP_TYPES = {'fuel_stop', 'rest_stop', 'mandatory_break'}
+
+
+def _coords(stop: RouteStop) -> Optional[Coordinate]:
+    if stop.latitude is None or stop.longitude is None:
+        return None
+    return (stop.latitude, stop.longitude)
+
+
+def _passed(position: Coordinate, stop: RouteStop, following: Optional[RouteStop]) -> bool:
+    """A skippable stop is behind the truck once the truck is nearer the following stop than it is"""
+    if stop.stop_type not in SKIPPABLE_STOP_TYPES or following is None or _coords(following) is None:
+        return False
+    target = _coords(following)
+    return haversine_miles(position, target) < haversine_miles(_coords(stop), target) - ARRIVAL_RADIUS_MILES
+
+
+def _stop_data(stop: RouteStop) -> Dict:
+    return {
+        'id': stop.id,
+        'order': stop.order,
+        'stop_type': stop.stop_type,
+        'location': stop.location,
+        'estimated_arrival': to_iso(from_datetime(stop.estimated_arrival)),
+        'reached_at': to_iso(from_datetime(stop.reached_at)) if stop.reached_at else None,
+    }
+
+
+def record_position(trip_id, position: Coordinate, at: int) -> Optional[Dict]:
+    """Apply a ping taken at epoch minute `at`; None when the trip has no stops"""
+    stops: List[RouteStop] = list(RouteStop.objects.filter(trip_id=trip_id).only(
+        'id', 'order', 'stop_type', 'location', 'latitude', 'longitude',
+        'estimated_arrival', 'duration_minutes', 'reached_at',
+    ))
+    if not stops:
+        return None
+
+    pending = [stop for stop in stops if stop.reached_at is None]
+    last_reached = next((stop for stop in reversed(stops) if stop.reached_at is not None), None)
+    changed: Dict[int, RouteStop] = {}
+    reached = []
+
+    # Mark stops the truck has arrived at or driven past
+    while pending and _coords(pending[0]) is not None:
+        stop, following = pending[0], pending[1] if len(pending) > 1 else None
+        if haversine_miles(position, _coords(stop)) > ARRIVAL_RADIUS_MILES and not _passed(position, stop, following):
+            break
+        stop.reached_at = to_datetime(at)
+        changed[stop.id] = stop
+        reached.append(stop)
+        last_reached = pending.pop(0)
+
+    delay = 0
+    if pending and _coords(pending[0]) is not None:
+        next_stop = pending[0]
+        depart = at
+        # Still at the last stop: leave once its planned dwell is over
+        if last_reached is not None and _coords(last_reached) is not None and \
+                haversine_miles(position, _coords(last_reached)) <= ARRIVAL_RADIUS_MILES:
+            depart = max(at, from_datetime(last_reached.reached_at) + last_reached.duration_minutes)
+        eta = depart + round(haversine_miles(position, _coords(next_stop)) / AVERAGE_SPEED_MPH * 60)
+        delay = eta - from_datetime(next_stop.estimated_arrival)
+        if abs(delay) < getattr(settings, 'ELD_ETA_MIN_CHANGE_MINUTES', 2):
+            delay = 0
+        if delay:
+            for stop in pending:
+                stop.estimated_arrival = to_datetime(from_datetime(stop.estimated_arrival) + delay)
+                changed[stop.id] = stop
+
+    if changed:
+        # One UPDATE ... CASE over the changed rows, setting only the columns that moved
+        fields = (['estimated_arrival'] if delay else []) + (['reached_at'] if reached else [])
+        RouteStop.objects.bulk_update(list(changed.values()), fields)
+
+    reached_data = [_stop_data(stop) for stop in reached]
+    updated_data = [_stop_data(stop) for stop in pending] if delay else []
+    publish_on_commit(trip_id, STOP_REACHED, reached_data)
+    publish_on_commit(trip_id, ETAS_UPDATED, updated_data)
+    return {
+        'trip_id': str(trip_id),
+        'next_stop_id': pending[0].id if pending else None,
+        'delay_minutes': delay,
+        'reached': reached_data,
+        'updated': updated_data,
+    }
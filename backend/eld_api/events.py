@@ -0,0 +1,125 @@
+import asyncio
+import itertools
+import threading
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Delta event types pushed to trip subscribers
+STOPS_ADDED = 'stops_added'
+STOP_REACHED = 'stop_reached'
+ETAS_UPDATED = 'etas_updated'
+LOG_SEGMENTS_ADDED = 'log_segments_added'
+VIOLATIONS_ADDED = 'violations_added'
+
+
+class Subscription:
+    """One subscriber's queue of events for a trip"""
+
+    def __init__(self, broker: 'InProcessBroker', trip_id: str, loop: asyncio.AbstractEventLoop,
+                 max_queue: int):
+        self.broker = broker
+        self.trip_id = trip_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def deliver(self, event: Dict):
+        """Called from any thread; drops the event if this subscriber is too slow
+
+        A subscriber whose event loop has closed without the stream's cleanup
+        running is unsubscribed instead of raising into the publisher.
+        """
+        def put():
+            if not self.queue.full():
+                self.queue.put_nowait(event)
+        if self.loop.is_closed():
+            self.close()
+            return
+        try:
+            self.loop.call_soon_threadsafe(put)
+        except RuntimeError:
+            # The loop closed between the check and the call
+            self.close()
+
+    async def get(self, timeout: float) -> Optional[Dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Per-trip pub/sub inside one process
+
+    Keeps a short replay buffer per trip so a reconnecting client can send
+    Last-Event-ID and receive what it missed. Swap in another broker (for
+    example one backed by Redis) through settings.ELD_EVENT_BROKER; it only
+    needs publish, subscribe and unsubscribe.
+    """
+
+    def __init__(self, replay_size: int = 100, max_trips: int = 1000, max_queue: int = 1000):
+        self.replay_size = replay_size
+        self.max_trips = max_trips
+        self.max_queue = max_queue
+        self._ids = itertools.count(1)
+        self._subscribers: Dict[str, List[Subscription]] = {}
+        self._history: 'OrderedDict[str, deque]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def publish(self, trip_id, event_type: str, data):
+        trip_id = str(trip_id)
+        with self._lock:
+            event = {'id': next(self._ids), 'event': event_type, 'data': data}
+            history = self._history.get(trip_id)
+            if history is None:
+                history = self._history[trip_id] = deque(maxlen=self.replay_size)
+                while len(self._history) > self.max_trips:
+                    self._history.popitem(last=False)
+            else:
+                self._history.move_to_end(trip_id)
+            history.append(event)
+            subscribers = list(self._subscribers.get(trip_id, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, trip_id, last_event_id: int = None) -> Subscription:
+        """Must be called from the event loop that will consume the subscription"""
+        subscription = Subscription(self, str(trip_id), asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers.setdefault(subscription.trip_id, []).append(subscription)
+            if last_event_id is not None:
+                for event in self._history.get(subscription.trip_id, ()):
+                    if event['id'] > last_event_id:
+                        subscription.queue.put_nowait(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.trip_id, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.trip_id, None)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """Process-wide broker, class taken from settings.ELD_EVENT_BROKER"""
+    return import_string(getattr(settings, 'ELD_EVENT_BROKER', 'eld_api.events.InProcessBroker'))()
+
+
+def publish_on_commit(trip_id, event_type: str, data):
+    """Publish once the current transaction commits, so subscribers never see rolled-back rows
+
+    Robust: a failing broker is logged and never turns the committed write into an error.
+    """
+    if not data:
+        return
+    transaction.on_commit(lambda: get_broker().publish(trip_id, event_type, data), robust=True)
@@ -0,0 +1,217 @@
+"""Fleet dashboard totals kept in summary tables
+
+Writers call the record_* / refresh_* functions with the rows they just
+changed, so each write touches a handful of counter rows and
+GET /api/fleet/summary/ reads a constant number of rows however large the
+fleet grows. Changes that bypass the services (admin edits, deletes, logs
+rolling out of the cycle window) drift the totals until the periodic
+`refresh_fleet_summary` command rebuilds them from the source tables.
+"""
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .clock import today_in
+from .hos_rules import get_rule_engine
+from .models import CYCLE_DAYS, Driver, DriverCycleStat, ELDLog, FleetDailyStat, FleetStat, HOSViolation, Trip
+from .partitions import LogPartitionManager
+
+TRIPS = 'trips'
+TRIP_DISTANCE = 'trip_distance'
+DRIVERS_NEAR_CYCLE_LIMIT = 'drivers_near_cycle_limit'
+
+
+def _violation_key(severity: str, violation_type: str) -> str:
+    return f'{severity}:{violation_type}'
+
+
+def _add(model, lookup: Dict, deltas: Dict, using: str = 'default'):
+    """Atomically add deltas to a summary row, creating it on first use"""
+    manager = model.objects.using(using)
+    increments = {field: F(field) + delta for field, delta in deltas.items()}
+    if manager.filter(**lookup).update(**increments):
+        return
+    try:
+        with transaction.atomic(using=using):
+            manager.create(**lookup, **deltas)
+    except IntegrityError:
+        # Created concurrently since the update above
+        manager.filter(**lookup).update(**increments)
+
+
+def record_trip_distance(old_distance: float, new_distance: float, using: str = 'default'):
+    """Count a trip's routed distance, replacing its previous one if it was routed before"""
+    if old_distance == new_distance:
+        return
+    if old_distance is None:
+        _add(FleetStat, {'key': TRIPS}, {'value': 1}, using)
+    _add(FleetStat, {'key': TRIP_DISTANCE}, {'value': (new_distance or 0) - (old_distance or 0)}, using)
+
+
+def record_log_miles(miles_by_date: Dict[date, float], using: str = 'default'):
+    for log_date, miles in miles_by_date.items():
+        if miles:
+            _add(FleetDailyStat, {'date': log_date}, {'vehicle_miles': miles}, using)
+
+
+def record_violation_changes(old: Iterable[Tuple[str, str]], new: Iterable[Tuple[str, str]],
+                             using: str = 'default'):
+    """Move open violation counts from a trip's old (type, severity) pairs to its new ones"""
+    deltas = Counter(_violation_key(severity, violation_type) for violation_type, severity in new)
+    deltas.subtract(_violation_key(severity, violation_type) for violation_type, severity in old)
+    for key, delta in deltas.items():
+        if delta:
+            _add(FleetStat, {'key': key}, {'value': delta}, using)
+
+
+def cycle_threshold() -> float:
+    """Cycle hours at which a driver counts as near the limit: the rule set's warning level"""
+    return get_rule_engine().cycle_warning_at
+
+
+def _cycle_hours(as_of: date, using: str, driver_ids: Optional[Set] = None) -> Dict:
+    """On-duty hours per driver in the cycle window ending on as_of
+
+    One grouped query over the model table, plus any rows of the window
+    already rotated into cold partitions or archives.
+    """
+    date_from = as_of - timedelta(days=CYCLE_DAYS - 1)
+    queryset = ELDLog.objects.using(using).filter(date__range=(date_from, as_of), driver__isnull=False)
+    if driver_ids is not None:
+        queryset = queryset.filter(driver_id__in=driver_ids)
+    hours = Counter(dict(
+        queryset.values('driver_id').annotate(total=Sum('on_duty_time')).values_list('driver_id', 'total')
+    ))
+    for row in LogPartitionManager(using).stored_rows(date_from, as_of):
+        driver_id = row['driver_id'] and uuid.UUID(row['driver_id'])
+        if driver_id and (driver_ids is None or driver_id in driver_ids):
+            hours[driver_id] += row['on_duty_time']
+    return dict(hours)
+
+
+def cycle_hours_by_driver(as_of: date = None, using: str = 'default', driver_ids: Iterable = None) -> Dict:
+    """On-duty hours per driver in the cycle window ending on as_of
+
+    Without as_of each driver's window ends on today's date at their home
+    terminal, the date their logs are kept in; drivers sharing a local date
+    share one query.
+    """
+    if driver_ids is not None:
+        driver_ids = {uuid.UUID(str(driver_id)) for driver_id in driver_ids}
+    if as_of is not None:
+        return _cycle_hours(as_of, using, driver_ids)
+
+    drivers = Driver.objects.using(using)
+    if driver_ids is not None:
+        drivers = drivers.filter(id__in=driver_ids)
+    by_date: Dict[date, Set] = {}
+    for driver_id, zone_name in drivers.values_list('id', 'home_terminal_timezone'):
+        by_date.setdefault(today_in(zone_name), set()).add(driver_id)
+    hours = {}
+    for local_today, ids in by_date.items():
+        hours.update(_cycle_hours(local_today, using, ids))
+    return hours
+
+
+def refresh_driver_cycle(driver_ids: Iterable, as_of: date = None, using: str = 'default'):
+    """Recompute the drivers' cycle hours and adjust the near-limit count by those who crossed it
+
+    Counted as of as_of, or each driver's local today.
+    """
+    driver_ids = {uuid.UUID(str(driver_id)) for driver_id in driver_ids if driver_id}
+    if not driver_ids:
+        return
+    threshold = cycle_threshold()
+    hours = cycle_hours_by_driver(as_of, using, driver_ids)
+    with transaction.atomic(using=using):
+        was_near = set(
+            DriverCycleStat.objects.using(using).select_for_update()
+            .filter(driver_id__in=driver_ids, near_limit=True).values_list('driver_id', flat=True)
+        )
+        stats = [
+            DriverCycleStat(driver_id=driver_id, cycle_hours=hours.get(driver_id) or 0.0,
+                            near_limit=(hours.get(driver_id) or 0.0) >= threshold)
+            for driver_id in driver_ids
+        ]
+        DriverCycleStat.objects.using(using).bulk_create(
+            stats, update_conflicts=True, unique_fields=['driver'],
+            update_fields=['cycle_hours', 'near_limit', 'refreshed_at'],
+        )
+        delta = sum(stat.near_limit for stat in stats) - len(was_near)
+        if delta:
+            _add(FleetStat, {'key': DRIVERS_NEAR_CYCLE_LIMIT}, {'value': delta}, using)
+
+
+def rebuild(as_of: date = None, using: str = 'default') -> Dict:
+    """Recompute every summary row from Trip, ELDLog and HOSViolation
+
+    Cycle hours are counted as of as_of, or each driver's local today.
+    """
+    threshold = cycle_threshold()
+
+    routed = Trip.objects.using(using).filter(total_distance__isnull=False).aggregate(
+        trips=Count('id'), distance=Sum('total_distance')
+    )
+    stats = {TRIPS: routed['trips'], TRIP_DISTANCE: routed['distance'] or 0.0}
+    for row in HOSViolation.objects.using(using).values('severity', 'violation_type').annotate(n=Count('id')):
+        stats[_violation_key(row['severity'], row['violation_type'])] = row['n']
+
+    cycle_hours = cycle_hours_by_driver(as_of, using)
+    driver_stats = [
+        DriverCycleStat(driver_id=driver_id, cycle_hours=cycle_hours.get(driver_id) or 0.0,
+                        near_limit=(cycle_hours.get(driver_id) or 0.0) >= threshold)
+        for driver_id in Driver.objects.using(using).values_list('id', flat=True)
+    ]
+    stats[DRIVERS_NEAR_CYCLE_LIMIT] = sum(stat.near_limit for stat in driver_stats)
+
+    daily = Counter(dict(
+        ELDLog.objects.using(using).values('date').annotate(miles=Sum('vehicle_miles')).values_list('date', 'miles')
+    ))
+    for row in LogPartitionManager(using).stored_rows():
+        daily[date.fromisoformat(str(row['date']))] += row['vehicle_miles']
+
+    with transaction.atomic(using=using):
+        FleetStat.objects.using(using).all().delete()
+        FleetStat.objects.using(using).bulk_create([FleetStat(key=key, value=value) for key, value in stats.items()])
+        FleetDailyStat.objects.using(using).all().delete()
+        FleetDailyStat.objects.using(using).bulk_create(
+            [FleetDailyStat(date=log_date, vehicle_miles=miles) for log_date, miles in daily.items() if miles]
+        )
+        DriverCycleStat.objects.using(using).all().delete()
+        DriverCycleStat.objects.using(using).bulk_create(driver_stats)
+    return stats
+
+
+def summary(today: date = None, using: str = 'default') -> Dict:
+    """Dashboard totals from the summary tables: two primary-key-sized reads
+
+    today picks the log date miles_today is read for (default: today in settings.TIME_ZONE).
+    """
+    today = today or today_in()
+    stats = dict(FleetStat.objects.using(using).values_list('key', 'value'))
+    miles_today = (
+        FleetDailyStat.objects.using(using).filter(date=today).values_list('vehicle_miles', flat=True).first()
+    )
+
+    open_by_severity = {'violation': {}, 'warning': {}}
+    for key, value in stats.items():
+        severity, _, violation_type = key.partition(':')
+        if violation_type and severity in open_by_severity and value:
+            open_by_severity[severity][violation_type] = int(value)
+
+    trips = int(stats.get(TRIPS, 0))
+    return {
+        'date': today,
+        'miles_today': miles_today or 0.0,
+        'drivers_near_cycle_limit': int(stats.get(DRIVERS_NEAR_CYCLE_LIMIT, 0)),
+        'cycle_threshold_hours': cycle_threshold(),
+        'cycle_limit_hours': get_rule_engine().cycle_limit,
+        'open_violations_by_type': open_by_severity['violation'],
+        'open_warnings_by_type': open_by_severity['warning'],
+        'trips': trips,
+        'average_trip_distance': round(stats.get(TRIP_DISTANCE, 0.0) / trips, 1) if trips else None,
+    }
@@ -0,0 +1,136 @@
+import math
+from bisect import bisect_right
+from typing import List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_MILES = 3959
+
+Coordinate = Tuple[float, float]
+Vector = Tuple[float, float, float]
+
+
+def haversine_miles(coord1: Coordinate, coord2: Coordinate) -> float:
+    """Great-circle distance in miles between two (lat, lon) pairs"""
+    lat1, lon1 = coord1
+    lat2, lon2 = coord2
+
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    return EARTH_RADIUS_MILES * c
+
+
+def to_unit_vector(lat: float, lon: float) -> Vector:
+    """Project a (lat, lon) pair onto the unit sphere"""
+    phi = math.radians(lat)
+    lam = math.radians(lon)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi))
+
+
+def miles_to_chord(miles: float) -> float:
+    """Convert a surface distance into the matching unit-sphere chord length"""
+    return 2 * math.sin(min(miles, math.pi * EARTH_RADIUS_MILES) / (2 * EARTH_RADIUS_MILES))
+
+
+def chord_to_miles(chord: float) -> float:
+    """Convert a unit-sphere chord length back into surface miles"""
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, chord / 2))
+
+
+class KDTree:
+    """Static 3-d tree over unit-sphere vectors for nearest-neighbour lookups
+
+    Chord length is monotonic in great-circle distance, so the nearest point
+    in 3-d space is also the nearest point on the globe.
+    """
+
+    def __init__(self, points: Sequence[Vector]):
+        self._points = list(points)
+        # Flat node arrays: point index, split axis, left child, right child
+        self._index: List[int] = []
+        self._axis: List[int] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self._root = self._build(list(range(len(self._points))), 0)
+
+    def __len__(self):
+        return len(self._points)
+
+    def _build(self, indices: List[int], depth: int) -> int:
+        if not indices:
+            return -1
+        axis = depth % 3
+        indices.sort(key=lambda i: self._points[i][axis])
+        mid = len(indices) // 2
+
+        node = len(self._index)
+        self._index.append(indices[mid])
+        self._axis.append(axis)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._left[node] = self._build(indices[:mid], depth + 1)
+        self._right[node] = self._build(indices[mid + 1:], depth + 1)
+        return node
+
+    def nearest(self, target: Vector, max_distance: float = math.inf) -> Optional[Tuple[int, float]]:
+        """Return (point index, chord distance) of the closest point within max_distance"""
+        best_index = -1
+        best_sq = max_distance * max_distance
+        stack = [self._root] if self._root >= 0 else []
+
+        while stack:
+            node = stack.pop()
+            point = self._points[self._index[node]]
+            dx = point[0] - target[0]
+            dy = point[1] - target[1]
+            dz = point[2] - target[2]
+            dist_sq = dx*dx + dy*dy + dz*dz
+            if dist_sq <= best_sq:
+                best_sq = dist_sq
+                best_index = self._index[node]
+
+            axis = self._axis[node]
+            diff = target[axis] - point[axis]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+            # Visit the far side only if the splitting plane is closer than the best hit
+            if far >= 0 and diff * diff <= best_sq:
+                stack.append(far)
+            if near >= 0:
+                stack.append(near)
+
+        if best_index < 0:
+            return None
+        return best_index, math.sqrt(best_sq)
+
+
+class Polyline:
+    """Route polyline of (lat, lon) vertices addressable by cumulative mileage"""
+
+    def __init__(self, coords: Sequence[Coordinate]):
+        if not coords:
+            raise ValueError("Polyline needs at least one coordinate")
+        self.coords = [tuple(c) for c in coords]
+        self.cumulative = [0.0]
+        for a, b in zip(self.coords, self.coords[1:]):
+            self.cumulative.append(self.cumulative[-1] + haversine_miles(a, b))
+
+    @property
+    def length(self) -> float:
+        return self.cumulative[-1]
+
+    def point_at(self, mile: float) -> Coordinate:
+        """Interpolate the position reached after driving `mile` miles along the route"""
+        if mile <= 0 or len(self.coords) == 1:
+            return self.coords[0]
+        if mile >= self.length:
+            return self.coords[-1]
+
+        segment = bisect_right(self.cumulative, mile) - 1
+        start, end = self.coords[segment], self.coords[segment + 1]
+        seg_length = self.cumulative[segment + 1] - self.cumulative[segment]
+        fraction = (mile - self.cumulative[segment]) / seg_length if seg_length else 0.0
+        return (
+            start[0] + (end[0] - start[0]) * fraction,
+            start[1] + (end[1] - start[1]) * fraction,
+        )
@@ -0,0 +1,231 @@
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+# A duty period: (start hour offset, length in hours, duty status), in chronological order
+DutyPeriod = Tuple[float, float, str]
+
+REST_STATUSES = {'off_duty', 'sleeper_berth'}
+
+# Timeline quantities a rule can limit
+SHIFT_DRIVING = 'shift_driving'              # driving since the last 10-hour (or split) rest
+DUTY_WINDOW = 'duty_window'                  # elapsed shift time at the end of each driving period
+DRIVING_SINCE_BREAK = 'driving_since_break'  # driving since the last 30-minute interruption
+CYCLE_ON_DUTY = 'cycle_on_duty'              # on-duty hours in the rolling cycle window
+METRICS = (SHIFT_DRIVING, DUTY_WINDOW, DRIVING_SINCE_BREAK, CYCLE_ON_DUTY)
+
+SHIFT_RESET_HOURS = 10
+CYCLE_RESTART_HOURS = 34
+BREAK_HOURS = 0.5
+SPLIT_SLEEPER_HOURS = 7
+SPLIT_REST_HOURS = 2
+
+
+@dataclass(frozen=True)
+class HOSRule:
+    """One row of a rule table: a limit on a timeline metric"""
+    violation_type: str
+    metric: str
+    limit: float
+    warning_at: float
+    label: str
+    limit_label: str
+    severity: str = 'violation'
+    window_days: Optional[int] = None
+
+    def check(self, value: float) -> Optional[Dict]:
+        # Timelines are sums of minute-based hours; ignore float error at the limits
+        value = round(value, 6)
+        if value > self.limit:
+            return {
+                'violation_type': self.violation_type,
+                'description': f'{self.label} ({value:.1f} hours) exceeds {self.limit_label}',
+                'severity': self.severity,
+            }
+        if value > self.warning_at:
+            return {
+                'violation_type': self.violation_type,
+                'description': f'{self.label} ({value:.1f} hours) approaching {self.limit_label}',
+                'severity': 'warning',
+            }
+        return None
+
+
+def _property_carrying(cycle_hours: int, cycle_days: int) -> Tuple[HOSRule, ...]:
+    return (
+        HOSRule('cycle_limit', CYCLE_ON_DUTY, cycle_hours, cycle_hours - 10,
+                'Cycle on-duty time', f'{cycle_hours}-hour/{cycle_days}-day limit',
+                window_days=cycle_days),
+        HOSRule('daily_driving', SHIFT_DRIVING, 11, 10, 'Daily driving time', '11-hour limit'),
+        HOSRule('daily_duty', DUTY_WINDOW, 14, 12, 'Daily on-duty window', '14-hour limit'),
+        HOSRule('mandatory_break', DRIVING_SINCE_BREAK, 8, 7.5,
+                'Driving time without a 30-minute break', '8-hour limit'),
+    )
+
+
+RULE_SETS = {
+    '70_8': _property_carrying(70, 8),
+    '60_7': _property_carrying(60, 7),
+}
+
+
+class HOSRuleEngine:
+    """Evaluates a rule table over a duty timeline in one linear scan
+
+    Compiling the table fixes which metrics are tracked and the cycle
+    window, so evaluation is a single pass that records each metric's peak
+    followed by one threshold check per rule.
+    """
+
+    def __init__(self, rules: Sequence[HOSRule]):
+        for rule in rules:
+            if rule.metric not in METRICS:
+                raise ValueError(f"Unknown HOS rule metric: {rule.metric}")
+        self.rules = tuple(rules)
+        # Tightest limit per metric, for planners that lay out timelines within the rules
+        self.limits = {
+            metric: min(rule.limit for rule in self.rules if rule.metric == metric)
+            for metric in {rule.metric for rule in self.rules}
+        }
+        cycle_rules = [rule for rule in self.rules if rule.metric == CYCLE_ON_DUTY]
+        self.cycle_limit = min((rule.limit for rule in cycle_rules), default=None)
+        self.cycle_warning_at = min((rule.warning_at for rule in cycle_rules), default=None)
+        self.cycle_window_hours = max(rule.window_days or 0 for rule in cycle_rules) * 24 if cycle_rules else 0
+
+    def evaluate(self, timeline: Iterable[DutyPeriod], prior_cycle_hours: float = 0.0) -> List[Dict]:
+        """Violations and warnings for the timeline, at most one per rule
+
+        prior_cycle_hours are on-duty hours already used before the timeline
+        starts; their timing is unknown, so they count for the whole scan
+        unless a 34-hour restart clears them.
+        """
+        peaks = self.scan(timeline, prior_cycle_hours)
+        violations = []
+        for rule in self.rules:
+            violation = rule.check(peaks[rule.metric])
+            if violation:
+                violations.append(violation)
+        return violations
+
+    def scan(self, timeline: Iterable[DutyPeriod], prior_cycle_hours: float = 0.0) -> Dict[str, float]:
+        """Peak value of every metric over the timeline"""
+        peaks = dict.fromkeys(METRICS, 0.0)
+        peaks[CYCLE_ON_DUTY] = prior_cycle_hours
+
+        clock = None
+        in_shift = False
+        shift_driving = 0.0
+        window = 0.0
+        since_break = 0.0
+        # Current run of consecutive rest, of sleeper berth only, and of non-driving time
+        rest_run = sleeper_run = idle_run = 0.0
+        # Last split-sleeper candidate: (hours, was sleeper-only, driving after it, window after it)
+        split = None
+
+        cycle = deque()
+        cycle_hours = prior_cycle_hours
+        window_hours = self.cycle_window_hours
+
+        def end_rest():
+            nonlocal in_shift, shift_driving, window, split, cycle_hours
+            if rest_run >= CYCLE_RESTART_HOURS:
+                cycle.clear()
+                cycle_hours = 0.0
+            if rest_run >= SHIFT_RESET_HOURS:
+                shift_driving = window = 0.0
+                in_shift = False
+                split = None
+            elif rest_run >= SPLIT_REST_HOURS:
+                sleeper = sleeper_run >= SPLIT_SLEEPER_HOURS
+                if split is not None and (sleeper or split[1]) and split[0] + rest_run >= SHIFT_RESET_HOURS:
+                    # Paired split rest: the shift restarts at the end of the first period
+                    shift_driving, window = split[2], split[3]
+                elif sleeper and in_shift:
+                    # A 7-hour sleeper period pauses the 14-hour window
+                    window -= sleeper_run
+                split = (rest_run, sleeper, 0.0, 0.0)
+            elif split is not None:
+                split = split[:3] + (split[3] + rest_run,)
+
+        for start, hours, status in timeline:
+            if clock is not None and start > clock:
+                # Unlogged gaps are off duty
+                gap = start - clock
+                rest_run += gap
+                idle_run += gap
+                sleeper_run = 0.0
+                if in_shift:
+                    window += gap
+            clock = start + hours
+
+            if status in REST_STATUSES:
+                rest_run += hours
+                sleeper_run = sleeper_run + hours if status == 'sleeper_berth' else 0.0
+                idle_run += hours
+                if in_shift:
+                    window += hours
+                continue
+
+            if rest_run:
+                end_rest()
+                rest_run = sleeper_run = 0.0
+
+            if window_hours:
+                cycle.append((clock, hours))
+                cycle_hours += hours
+                while cycle and cycle[0][0] <= clock - window_hours:
+                    cycle_hours -= cycle.popleft()[1]
+                peaks[CYCLE_ON_DUTY] = max(peaks[CYCLE_ON_DUTY], cycle_hours)
+
+            in_shift = True
+            window += hours
+            if split is not None:
+                split = (split[0], split[1],
+                         split[2] + (hours if status == 'driving' else 0.0), split[3] + hours)
+
+            if status != 'driving':
+                idle_run += hours
+                continue
+
+            if idle_run >= BREAK_HOURS:
+                since_break = 0.0
+            idle_run = 0.0
+            shift_driving += hours
+            since_break += hours
+            peaks[SHIFT_DRIVING] = max(peaks[SHIFT_DRIVING], shift_driving)
+            peaks[DUTY_WINDOW] = max(peaks[DUTY_WINDOW], window)
+            peaks[DRIVING_SINCE_BREAK] = max(peaks[DRIVING_SINCE_BREAK], since_break)
+
+        return peaks
+
+
+def timeline_from_segments(segments: Iterable[Dict]) -> List[DutyPeriod]:
+    """Duty timeline of planned log segments (minute offsets from the trip start)"""
+    return [
+        (segment['start_offset_minutes'] / 60, segment['duration_minutes'] / 60, segment['duty_status'])
+        for segment in segments
+    ]
+
+
+def timeline_from_logs(logs: Sequence) -> List[DutyPeriod]:
+    """Duty timeline of stored ELD logs ordered by date and start time"""
+    if not logs:
+        return []
+    first_date = logs[0].date
+    return [
+        ((log.date - first_date).days * 24 + log.start_time.hour + log.start_time.minute / 60
+         + log.start_time.second / 3600, log.total_hours, log.duty_status)
+        for log in logs
+    ]
+
+
+@lru_cache(maxsize=None)
+def get_rule_engine(rule_set: str = None) -> HOSRuleEngine:
+    """Compiled engine for a named rule set (default: settings.HOS_RULE_SET)"""
+    rule_set = rule_set or getattr(settings, 'HOS_RULE_SET', '70_8')
+    if rule_set not in RULE_SETS:
+        raise ValueError(f"Unknown HOS rule set: {rule_set}")
+    return HOSRuleEngine(RULE_SETS[rule_set])
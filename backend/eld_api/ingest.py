@@ -0,0 +1,358 @@
+import codecs
+import csv
+import hashlib
+import io
+import json
+import uuid
+from datetime import date, time
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .events import LOG_SEGMENTS_ADDED, publish_on_commit
+from .fleet import record_log_miles, refresh_driver_cycle
+from .models import ELDLog, Trip
+from .partitions import LogPartitionManager, month_start
+
+DUTY_STATUSES = {choice for choice, _ in ELDLog.DUTY_STATUS_CHOICES}
+ON_DUTY_STATUSES = {'driving', 'on_duty_not_driving'}
+LOCATION_MAX_LENGTH = ELDLog._meta.get_field('location').max_length
+KEY_MAX_LENGTH = ELDLog._meta.get_field('idempotency_key').max_length
+MAX_REPORTED_ERRORS = 100
+
+# Column order used for bulk loading
+INGEST_COLUMNS = [
+    'trip_id', 'driver_id', 'date', 'start_time', 'end_time', 'duty_status', 'location',
+    'vehicle_miles', 'total_hours', 'driving_time', 'on_duty_time', 'idempotency_key',
+]
+
+
+class RecordError(ValueError):
+    pass
+
+
+def _require(record: Dict, name: str):
+    value = record.get(name)
+    if value is None or value == '':
+        raise RecordError(f"{name}: This field is required")
+    return value
+
+
+def _optional_float(record: Dict, name: str) -> Optional[float]:
+    value = record.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise RecordError(f"{name}: A valid number is required")
+    if value < 0:
+        raise RecordError(f"{name}: Must not be negative")
+    return value
+
+
+def validate_record(record: Dict) -> Tuple:
+    """Validate one raw record and return its values in INGEST_COLUMNS order (driver_id unset)
+
+    Plain Python checks instead of a DRF serializer: ingest validates
+    millions of rows and serializer field machinery dominates at that scale.
+    """
+    if not isinstance(record, dict):
+        raise RecordError("Expected an object")
+    try:
+        trip_id = uuid.UUID(str(_require(record, 'trip')))
+    except ValueError:
+        raise RecordError("trip: Must be a valid UUID")
+    try:
+        log_date = date.fromisoformat(_require(record, 'date'))
+    except (TypeError, ValueError):
+        raise RecordError("date: Expected YYYY-MM-DD")
+    try:
+        start_time = time.fromisoformat(_require(record, 'start_time'))
+        end_time = time.fromisoformat(_require(record, 'end_time'))
+    except (TypeError, ValueError):
+        raise RecordError("start_time/end_time: Expected HH:MM[:SS]")
+
+    duty_status = _require(record, 'duty_status')
+    if duty_status not in DUTY_STATUSES:
+        raise RecordError(f"duty_status: \"{duty_status}\" is not a valid choice")
+    location = str(record.get('location') or '')
+    if len(location) > LOCATION_MAX_LENGTH:
+        raise RecordError(f"location: Ensure this field has no more than {LOCATION_MAX_LENGTH} characters")
+
+    vehicle_miles = record.get('vehicle_miles') or 0
+    try:
+        vehicle_miles = int(vehicle_miles)
+    except (TypeError, ValueError):
+        raise RecordError("vehicle_miles: A valid integer is required")
+    if vehicle_miles < 0:
+        raise RecordError("vehicle_miles: Must not be negative")
+
+    total_hours = _optional_float(record, 'total_hours')
+    if total_hours is None:
+        minutes = (end_time.hour * 60 + end_time.minute) - (start_time.hour * 60 + start_time.minute)
+        total_hours = (minutes if minutes > 0 else minutes + 24 * 60) / 60
+    driving_time = _optional_float(record, 'driving_time')
+    if driving_time is None:
+        driving_time = total_hours if duty_status == 'driving' else 0.0
+    on_duty_time = _optional_float(record, 'on_duty_time')
+    if on_duty_time is None:
+        on_duty_time = total_hours if duty_status in ON_DUTY_STATUSES else 0.0
+
+    key = record.get('idempotency_key')
+    if key:
+        key = str(key)
+        if len(key) > KEY_MAX_LENGTH:
+            raise RecordError(f"idempotency_key: Ensure this field has no more than {KEY_MAX_LENGTH} characters")
+    else:
+        # Without a client key, the record's identity makes replays collide
+        key = hashlib.sha256(
+            f"{trip_id.hex}|{log_date}|{start_time}|{end_time}|{duty_status}".encode()
+        ).hexdigest()
+
+    return (trip_id, None, log_date, start_time, end_time, duty_status, location,
+            vehicle_miles, total_hours, driving_time, on_duty_time, key)
+
+
+def parse_ndjson(lines: Iterable[bytes]) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, record or RecordError) from newline-delimited JSON"""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, RecordError("Invalid JSON")
+
+
+def parse_json_array(lines: Iterable[bytes]) -> Iterator[Tuple[int, object]]:
+    """Yield (1-based array position, record) from a JSON array body
+
+    Unlike NDJSON and CSV the whole body is parsed at once.
+    """
+    try:
+        records = json.loads(b''.join(lines) or b'[]')
+    except ValueError:
+        yield 1, RecordError("Invalid JSON")
+        return
+    if not isinstance(records, list):
+        yield 1, RecordError("Expected a JSON array of records")
+        return
+    yield from enumerate(records, start=1)
+
+
+def parse_csv(lines: Iterable[bytes]) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, record) from CSV with a header row"""
+    reader = csv.DictReader(codecs.iterdecode(lines, 'utf-8'))
+    for record in reader:
+        yield reader.line_num, record
+
+
+PARSERS = {
+    'application/x-ndjson': parse_ndjson,
+    'application/jsonl': parse_ndjson,
+    'application/json': parse_json_array,
+    'text/csv': parse_csv,
+}
+
+
+class BulkLogIngestor:
+    """Validate and load ELD log records in chunks, skipping already-ingested keys"""
+
+    def __init__(self, using: str = 'default', chunk_size: int = None):
+        self.using = using
+        self.connection = connections[using]
+        self.chunk_size = chunk_size or getattr(settings, 'ELD_INGEST_CHUNK_SIZE', 5000)
+
+    def ingest(self, records: Iterable[Tuple[int, object]]) -> Dict:
+        result = {'received': 0, 'inserted': 0, 'duplicates': 0, 'rejected': 0, 'errors': []}
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                break
+            self._ingest_chunk(chunk, result)
+        return result
+
+    def _reject(self, result: Dict, line: int, message: str):
+        result['rejected'] += 1
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            result['errors'].append({'line': line, 'error': message})
+
+    def _ingest_chunk(self, chunk: List[Tuple[int, object]], result: Dict):
+        rows = []
+        for line, record in chunk:
+            result['received'] += 1
+            if isinstance(record, RecordError):
+                self._reject(result, line, str(record))
+                continue
+            try:
+                rows.append((line, validate_record(record)))
+            except RecordError as exc:
+                self._reject(result, line, str(exc))
+
+        # One lookup resolves every trip in the chunk and its driver
+        drivers = dict(
+            Trip.objects.using(self.using)
+            .filter(id__in={row[0] for _, row in rows})
+            .values_list('id', 'driver_id')
+        )
+        # Drop keys seen earlier in this chunk or already stored
+        existing = set(
+            ELDLog.objects.using(self.using)
+            .filter(idempotency_key__in=[row[-1] for _, row in rows])
+            .values_list('idempotency_key', 'date')
+        )
+        existing |= self._moved_identities([row for _, row in rows])
+
+        fresh = []
+        for line, row in rows:
+            if row[0] not in drivers:
+                self._reject(result, line, f"trip: Trip {row[0]} does not exist")
+                continue
+            identity = (row[-1], row[2])
+            if identity in existing:
+                result['duplicates'] += 1
+                continue
+            existing.add(identity)
+            fresh.append((row[0], drivers[row[0]]) + row[2:])
+
+        if fresh:
+            with transaction.atomic(using=self.using):
+                if self.connection.vendor == 'postgresql':
+                    stored = self._copy(fresh)
+                else:
+                    stored = self._insert_many(fresh)
+                # Rows a concurrent upload stored first were skipped by ON CONFLICT
+                inserted = [row for row in fresh if (row[-1], row[2]) in stored]
+                self._publish(inserted)
+                self._summarize(inserted)
+            result['inserted'] += len(inserted)
+            result['duplicates'] += len(fresh) - len(inserted)
+
+    def _moved_identities(self, rows: List[Tuple]) -> Set[Tuple[str, date]]:
+        """(idempotency_key, date) of the rows' keys already moved to cold partitions or archives
+
+        The model table's unique constraint only guards the rows it still
+        holds, so keys dated in moved months are looked up there; the scan
+        is limited to the date range of those records.
+        """
+        manager = LogPartitionManager(self.using)
+        moved = set(manager.archives())
+        if not manager.native:
+            moved |= set(manager.partitions())
+        dates = [row[2] for row in rows if month_start(row[2]) in moved]
+        if not dates:
+            return set()
+        keys = {row[-1] for row in rows}
+        return {
+            (stored['idempotency_key'], date.fromisoformat(str(stored['date'])))
+            for stored in manager.stored_rows(min(dates), max(dates))
+            if stored['idempotency_key'] in keys
+        }
+
+    def _publish(self, rows: List[Tuple]):
+        """Push the new segments to each trip's live subscribers"""
+        by_trip: Dict[uuid.UUID, List[Dict]] = {}
+        for row in rows:
+            segment = dict(zip(INGEST_COLUMNS, row))
+            segment['trip_id'] = str(row[0])
+            segment['driver_id'] = str(row[1]) if row[1] else None
+            for name in ('date', 'start_time', 'end_time'):
+                segment[name] = segment[name].isoformat()
+            by_trip.setdefault(row[0], []).append(segment)
+        for trip_id, segments in by_trip.items():
+            publish_on_commit(trip_id, LOG_SEGMENTS_ADDED, segments)
+
+    def _summarize(self, rows: List[Tuple]):
+        """Fold the new segments into the fleet summary tables"""
+        miles_by_date: Dict[date, int] = {}
+        for row in rows:
+            miles_by_date[row[2]] = miles_by_date.get(row[2], 0) + row[7]
+        record_log_miles(miles_by_date, using=self.using)
+        refresh_driver_cycle({row[1] for row in rows}, using=self.using)
+
+    def _insert_many(self, rows: List[Tuple]) -> Set[Tuple[str, date]]:
+        """Prepared multi-row INSERTs, bypassing model instances, ignoring key conflicts
+
+        Returns the (idempotency_key, date) of the rows actually inserted.
+        """
+        qn = self.connection.ops.quote_name
+        # Only UUID, date and time columns need backend-specific adaptation
+        adapted = [
+            (index, ELDLog._meta.get_field(column))
+            for index, column in enumerate(INGEST_COLUMNS)
+            if column in ('trip_id', 'driver_id', 'date', 'start_time', 'end_time')
+        ]
+        params = []
+        for row in rows:
+            row = list(row)
+            for index, field in adapted:
+                row[index] = field.get_db_prep_save(row[index], self.connection)
+            params.append(row)
+
+        insert = f'INSERT INTO {qn(ELDLog._meta.db_table)} ({", ".join(qn(c) for c in INGEST_COLUMNS)}) VALUES '
+        placeholders = f'({", ".join(["%s"] * len(INGEST_COLUMNS))})'
+        with self.connection.cursor() as cursor:
+            # Fast path: one prepared statement; its total row count shows whether any row conflicted
+            savepoint = transaction.savepoint(using=self.using)
+            cursor.executemany(insert + placeholders + ' ON CONFLICT DO NOTHING', params)
+            if cursor.rowcount == len(params):
+                transaction.savepoint_commit(savepoint, using=self.using)
+                return {(row[-1], row[2]) for row in rows}
+            transaction.savepoint_rollback(savepoint, using=self.using)
+
+            # Some keys were stored concurrently: insert again in batches that report which rows are new
+            batch_size = self.connection.ops.bulk_batch_size(INGEST_COLUMNS, rows)
+            stored = set()
+            for start in range(0, len(params), batch_size):
+                batch = params[start:start + batch_size]
+                cursor.execute(
+                    insert + ', '.join([placeholders] * len(batch)) +
+                    ' ON CONFLICT DO NOTHING RETURNING idempotency_key, date',
+                    [value for row in batch for value in row]
+                )
+                stored.update(_identities(cursor.fetchall()))
+        return stored
+
+    def _copy(self, rows: List[Tuple]) -> Set[Tuple[str, date]]:
+        """Load rows with COPY through a temp table, then merge ignoring key conflicts
+
+        Returns the (idempotency_key, date) of the rows actually inserted.
+        """
+        qn = self.connection.ops.quote_name
+        table = qn(ELDLog._meta.db_table)
+        columns = ', '.join(qn(column) for column in INGEST_COLUMNS)
+        nullable = ', '.join(qn(column) for column in INGEST_COLUMNS if ELDLog._meta.get_field(column).null)
+
+        # Every value is quoted, so an empty location stays an empty string; only
+        # the nullable columns turn an empty field into NULL
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row])
+        buffer.seek(0)
+
+        copy_sql = f"COPY eld_ingest ({columns}) FROM STDIN WITH (FORMAT csv, NULL '', FORCE_NULL ({nullable}))"
+        with self.connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS eld_ingest')
+            cursor.execute(
+                f'CREATE TEMP TABLE eld_ingest ON COMMIT DROP AS SELECT {columns} FROM {table} WITH NO DATA'
+            )
+            if hasattr(cursor.cursor, 'copy_expert'):  # psycopg2
+                cursor.cursor.copy_expert(copy_sql, buffer)
+            else:  # psycopg 3
+                with cursor.cursor.copy(copy_sql) as copy:
+                    copy.write(buffer.getvalue())
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) SELECT {columns} FROM eld_ingest '
+                'ON CONFLICT DO NOTHING RETURNING idempotency_key, date'
+            )
+            return _identities(cursor.fetchall())
+
+
+def _identities(returned: Iterable[Tuple]) -> Set[Tuple[str, date]]:
+    """(idempotency_key, date) pairs from RETURNING rows; SQLite returns dates as text"""
+    return {(key, date.fromisoformat(str(log_date))) for key, log_date in returned}
@@ -0,0 +1,356 @@
+import hashlib
+import struct
+import zlib
+from typing import Dict, Iterable, List, Tuple
+
+from django.core.cache import cache
+
+# Bump when the drawing changes so cached sheets are not reused
+RENDERER_VERSION = '1'
+
+MINUTES_PER_DAY = 24 * 60
+CACHE_TIMEOUT = 24 * 60 * 60
+
+# Grid rows, top to bottom, as on the paper log
+ROWS = [
+    ('off_duty', 'Off Duty', 'OFF'),
+    ('sleeper_berth', 'Sleeper Berth', 'SB'),
+    ('driving', 'Driving', 'D'),
+    ('on_duty_not_driving', 'On Duty', 'ON'),
+]
+ROW_INDEX = {status: i for i, (status, _, _) in enumerate(ROWS)}
+
+# Layout in pixels / points
+LEFT = 100
+TOP = 50
+HOUR_WIDTH = 32
+ROW_HEIGHT = 32
+GRID_WIDTH = 24 * HOUR_WIDTH
+GRID_HEIGHT = len(ROWS) * ROW_HEIGHT
+GRID_RIGHT = LEFT + GRID_WIDTH
+GRID_BOTTOM = TOP + GRID_HEIGHT
+WIDTH = GRID_RIGHT + 70
+HEIGHT = GRID_BOTTOM + 20
+
+Segment = Tuple[int, int, str]
+
+
+def _hour_label(hour: int) -> str:
+    if hour in (0, 24):
+        return 'M'
+    if hour == 12:
+        return 'N'
+    return str(hour % 12)
+
+
+def _x(minute: int) -> float:
+    return LEFT + minute * GRID_WIDTH / MINUTES_PER_DAY
+
+
+def _row_center(status: str) -> float:
+    return TOP + ROW_INDEX[status] * ROW_HEIGHT + ROW_HEIGHT / 2
+
+
+def _minutes(value) -> int:
+    return value.hour * 60 + value.minute
+
+
+def day_segments(logs: Iterable) -> List[Segment]:
+    """Turn a day's ELDLog rows into contiguous (start, end, status) minute ranges
+
+    Time not covered by any log is off duty, so the segments always span
+    the full 24 hours.
+    """
+    segments = []
+    cursor = 0
+    for log in sorted(logs, key=lambda log: log.start_time):
+        start = _minutes(log.start_time)
+        end = _minutes(log.end_time)
+        if end == 0 and start > 0:
+            end = MINUTES_PER_DAY  # Entry runs until midnight
+        if end <= start:
+            continue
+        if start > cursor:
+            segments.append((cursor, start, 'off_duty'))
+        start = max(start, cursor)
+        if end > start:
+            segments.append((start, end, log.duty_status))
+            cursor = end
+    if cursor < MINUTES_PER_DAY:
+        segments.append((cursor, MINUTES_PER_DAY, 'off_duty'))
+    return segments
+
+
+def status_totals(segments: List[Segment]) -> Dict[str, float]:
+    totals = {status: 0 for status, _, _ in ROWS}
+    for start, end, status in segments:
+        totals[status] += end - start
+    return {status: minutes / 60 for status, minutes in totals.items()}
+
+
+def content_hash(segments: List[Segment], title: str, fmt: str) -> str:
+    """Cache key for a rendered sheet: same segments and title render identically"""
+    digest = hashlib.sha256(f"{RENDERER_VERSION}|{fmt}|{title}|".encode())
+    for start, end, status in segments:
+        digest.update(f"{start},{end},{status};".encode())
+    return digest.hexdigest()
+
+
+def _duty_path(segments: List[Segment]) -> List[Tuple[float, float]]:
+    """Vertices of the continuous duty-status line"""
+    points = []
+    for start, end, status in segments:
+        y = _row_center(status)
+        points.append((_x(start), y))
+        points.append((_x(end), y))
+    return points
+
+
+def _escape(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+# SVG
+
+def _svg_static() -> str:
+    """Grid, tick marks and labels shared by every sheet"""
+    parts = [
+        f'<rect x="{LEFT}" y="{TOP}" width="{GRID_WIDTH}" height="{GRID_HEIGHT}" fill="#fff" stroke="#000"/>'
+    ]
+    ticks = []
+    for quarter in range(1, 24 * 4):
+        x = LEFT + quarter * HOUR_WIDTH / 4
+        if quarter % 4 == 0:
+            ticks.append(f'M{x:g} {TOP}V{GRID_BOTTOM}')
+        else:
+            length = ROW_HEIGHT / 2 if quarter % 2 == 0 else ROW_HEIGHT / 4
+            for row in range(len(ROWS)):
+                y = TOP + row * ROW_HEIGHT
+                ticks.append(f'M{x:g} {y}v{length:g}')
+    for row in range(1, len(ROWS)):
+        ticks.append(f'M{LEFT} {TOP + row * ROW_HEIGHT}H{GRID_RIGHT}')
+    parts.append(f'<path d="{"".join(ticks)}" stroke="#888" stroke-width="0.5" fill="none"/>')
+
+    for hour in range(25):
+        parts.append(
+            f'<text x="{LEFT + hour * HOUR_WIDTH}" y="{TOP - 6}" text-anchor="middle">{_hour_label(hour)}</text>'
+        )
+    for status, label, _ in ROWS:
+        parts.append(f'<text x="{LEFT - 8}" y="{_row_center(status) + 4:g}" text-anchor="end">{label}</text>')
+    parts.append(f'<text x="{GRID_RIGHT + 35}" y="{TOP - 6}" text-anchor="middle">Total</text>')
+    return ''.join(parts)
+
+
+SVG_HEAD = (
+    f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" '
+    f'viewBox="0 0 {WIDTH} {HEIGHT}" font-family="Helvetica,Arial,sans-serif" font-size="11">'
+)
+SVG_GRID = _svg_static()
+
+
+def render_svg(segments: List[Segment], title: str) -> bytes:
+    path = ''.join(
+        f'{"M" if i == 0 else "L"}{x:.1f} {y:g}' for i, (x, y) in enumerate(_duty_path(segments))
+    )
+    totals = status_totals(segments)
+    parts = [
+        SVG_HEAD,
+        f'<text x="{LEFT}" y="20" font-size="14" font-weight="bold">{_escape(title)}</text>',
+        SVG_GRID,
+        f'<path d="{path}" stroke="#0645ad" stroke-width="2.5" fill="none"/>',
+    ]
+    for status, _, _ in ROWS:
+        parts.append(
+            f'<text x="{GRID_RIGHT + 35}" y="{_row_center(status) + 4:g}" text-anchor="middle">{totals[status]:.2f}</text>'
+        )
+    parts.append('</svg>')
+    return ''.join(parts).encode()
+
+
+# PDF
+
+def _pdf_text(x: float, y: float, text: str, size: int = 9) -> str:
+    # y is flipped back so text reads upright inside the flipped page space
+    escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return f'BT /F1 {size} Tf 1 0 0 -1 {x:g} {y:g} Tm ({escaped}) Tj ET\n'
+
+
+def _pdf_static() -> str:
+    ops = [f'1 0 0 -1 0 {HEIGHT} cm\n', f'0 G 1 w {LEFT} {TOP} {GRID_WIDTH} {GRID_HEIGHT} re S\n', '0.55 G 0.5 w\n']
+    for quarter in range(1, 24 * 4):
+        x = LEFT + quarter * HOUR_WIDTH / 4
+        if quarter % 4 == 0:
+            ops.append(f'{x:g} {TOP} m {x:g} {GRID_BOTTOM} l\n')
+        else:
+            length = ROW_HEIGHT / 2 if quarter % 2 == 0 else ROW_HEIGHT / 4
+            for row in range(len(ROWS)):
+                y = TOP + row * ROW_HEIGHT
+                ops.append(f'{x:g} {y} m {x:g} {y + length:g} l\n')
+    for row in range(1, len(ROWS)):
+        ops.append(f'{LEFT} {TOP + row * ROW_HEIGHT} m {GRID_RIGHT} {TOP + row * ROW_HEIGHT} l\n')
+    ops.append('S 0 g\n')
+    for hour in range(25):
+        ops.append(_pdf_text(LEFT + hour * HOUR_WIDTH - 3, TOP - 6, _hour_label(hour)))
+    for status, label, _ in ROWS:
+        ops.append(_pdf_text(LEFT - 70, _row_center(status) + 3, label))
+    ops.append(_pdf_text(GRID_RIGHT + 24, TOP - 6, 'Total'))
+    return ''.join(ops)
+
+
+PDF_GRID = _pdf_static()
+
+
+def render_pdf(segments: List[Segment], title: str) -> bytes:
+    points = _duty_path(segments)
+    ops = [PDF_GRID, _pdf_text(LEFT, 20, title.encode('latin-1', 'replace').decode('latin-1'), 13)]
+    ops.append('0.02 0.27 0.68 RG 2.5 w\n')
+    ops.append(''.join(f'{x:.1f} {y:g} {"m" if i == 0 else "l"}\n' for i, (x, y) in enumerate(points)))
+    ops.append('S\n')
+    totals = status_totals(segments)
+    for status, _, _ in ROWS:
+        ops.append(_pdf_text(GRID_RIGHT + 22, _row_center(status) + 3, f'{totals[status]:.2f}'))
+    content = ''.join(ops).encode('latin-1')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {WIDTH} {HEIGHT}] '
+         f'/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>').encode(),
+        b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# PNG
+
+# 3x5 bitmap glyphs for the characters the raster sheet needs
+GLYPHS = {
+    '0': '111101101101111', '1': '010110010010111', '2': '111001111100111',
+    '3': '111001111001111', '4': '101101111001001', '5': '111100111001111',
+    '6': '111100111101111', '7': '111001001001001', '8': '111101111101111',
+    '9': '111101111001111', '.': '000000000000010', 'M': '101111111101101',
+    'N': '111101101101101', 'O': '111101101101111', 'F': '111100110100100',
+    'S': '111100111001111', 'B': '110101110101110', 'D': '110101101101110',
+}
+GLYPH_SCALE = 2
+
+
+class _Canvas:
+    """8-bit grayscale raster with axis-aligned fills, enough for the log grid"""
+
+    def __init__(self, width: int, height: int, pixels: bytearray = None):
+        self.width = width
+        self.height = height
+        self.pixels = pixels if pixels is not None else bytearray(b'\xff' * (width * height))
+
+    def copy(self) -> '_Canvas':
+        return _Canvas(self.width, self.height, bytearray(self.pixels))
+
+    def fill(self, x0: float, y0: float, x1: float, y1: float, shade: int):
+        x0, x1 = sorted((max(0, int(x0)), min(self.width, int(round(x1)))))
+        y0, y1 = sorted((max(0, int(y0)), min(self.height, int(round(y1)))))
+        if x1 <= x0 or y1 <= y0:
+            return
+        row = bytes([shade]) * (x1 - x0)
+        for y in range(y0, y1):
+            start = y * self.width + x0
+            self.pixels[start:start + len(row)] = row
+
+    def text(self, x: float, y: float, text: str, shade: int = 0):
+        """Draw text with its top-left corner at (x, y)"""
+        for char in text:
+            glyph = GLYPHS.get(char)
+            if glyph:
+                for i, bit in enumerate(glyph):
+                    if bit == '1':
+                        gx = x + (i % 3) * GLYPH_SCALE
+                        gy = y + (i // 3) * GLYPH_SCALE
+                        self.fill(gx, gy, gx + GLYPH_SCALE, gy + GLYPH_SCALE, shade)
+            x += 4 * GLYPH_SCALE
+
+    def to_png(self) -> bytes:
+        raw = bytearray()
+        for y in range(self.height):
+            raw.append(0)  # Filter type: none
+            raw += self.pixels[y * self.width:(y + 1) * self.width]
+
+        def chunk(kind: bytes, data: bytes) -> bytes:
+            return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+        return (
+            b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, self.height, 8, 0, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(bytes(raw), 6))
+            + chunk(b'IEND', b'')
+        )
+
+
+def _png_static() -> _Canvas:
+    canvas = _Canvas(WIDTH, HEIGHT)
+    for quarter in range(1, 24 * 4):
+        x = LEFT + quarter * HOUR_WIDTH / 4
+        if quarter % 4 == 0:
+            canvas.fill(x, TOP, x + 1, GRID_BOTTOM, 160)
+        else:
+            length = ROW_HEIGHT / 2 if quarter % 2 == 0 else ROW_HEIGHT / 4
+            for row in range(len(ROWS)):
+                y = TOP + row * ROW_HEIGHT
+                canvas.fill(x, y, x + 1, y + length, 160)
+    for row in range(1, len(ROWS)):
+        y = TOP + row * ROW_HEIGHT
+        canvas.fill(LEFT, y, GRID_RIGHT, y + 1, 160)
+    canvas.fill(LEFT, TOP, GRID_RIGHT + 1, TOP + 1, 0)
+    canvas.fill(LEFT, GRID_BOTTOM, GRID_RIGHT + 1, GRID_BOTTOM + 1, 0)
+    canvas.fill(LEFT, TOP, LEFT + 1, GRID_BOTTOM, 0)
+    canvas.fill(GRID_RIGHT, TOP, GRID_RIGHT + 1, GRID_BOTTOM, 0)
+    for hour in range(25):
+        label = _hour_label(hour)
+        canvas.text(LEFT + hour * HOUR_WIDTH - len(label) * 4, TOP - 16, label)
+    for status, _, short in ROWS:
+        canvas.text(LEFT - 12 - len(short) * 8, _row_center(status) - 5, short)
+    return canvas
+
+
+PNG_GRID = _png_static()
+
+
+def render_png(segments: List[Segment], title: str) -> bytes:
+    """Raster sheet; the title is omitted since the bitmap font has no full alphabet"""
+    canvas = PNG_GRID.copy()
+    points = _duty_path(segments)
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        canvas.fill(min(x0, x1) - 1, min(y0, y1) - 1, max(x0, x1) + 2, max(y0, y1) + 2, 40)
+    totals = status_totals(segments)
+    for status, _, _ in ROWS:
+        canvas.text(GRID_RIGHT + 14, _row_center(status) - 5, f'{totals[status]:.2f}')
+    return canvas.to_png()
+
+
+RENDERERS = {
+    'svg': (render_svg, 'image/svg+xml'),
+    'pdf': (render_pdf, 'application/pdf'),
+    'png': (render_png, 'image/png'),
+}
+
+
+def render_log_sheet(logs: Iterable, title: str, fmt: str) -> Tuple[bytes, str, str]:
+    """Render (or fetch from cache) a day's sheet; returns (body, content type, content hash)"""
+    renderer, content_type = RENDERERS[fmt]
+    segments = day_segments(logs)
+    key = content_hash(segments, title, fmt)
+    body = cache.get(f'log-sheet:{key}')
+    if body is None:
+        body = renderer(segments, title)
+        cache.set(f'log-sheet:{key}', body, CACHE_TIMEOUT)
+    return body, content_type, key
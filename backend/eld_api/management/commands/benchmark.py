@@ -0,0 +1,24 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from eld_api.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = "Run one or all eld_api micro-benchmarks and print their measurements as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help="Benchmarks to run (default: all)")
+        parser.add_argument('--count', type=int, help="Override the benchmark's iteration count")
+
+    def handle(self, *args, **options):
+        names = options['names'] or sorted(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Unknown benchmark(s): {', '.join(unknown)}. Available: {', '.join(sorted(BENCHMARKS))}")
+
+        for name in names:
+            kwargs = {'count': options['count']} if options['count'] else {}
+            result = BENCHMARKS[name](**kwargs)
+            self.stdout.write(f"{name}: {json.dumps(result)}")
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from eld_api.partitions import LogPartitionManager
+
+
+class Command(BaseCommand):
+    help = "Create upcoming ELD log partitions and archive months past the retention window"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help="Database alias to maintain")
+        parser.add_argument('--today', help="Run as of this date (YYYY-MM-DD) instead of today")
+        parser.add_argument('--no-archive', action='store_true', help="Only rotate partitions, do not archive")
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        if options['today']:
+            today = parse_date(options['today'])
+            if today is None:
+                raise CommandError("--today must be a date in YYYY-MM-DD format")
+
+        manager = LogPartitionManager(options['database'])
+        if options['no_archive']:
+            months = manager.rotate(today)
+            self.stdout.write(f"Rotated {len(months)} partition(s)")
+            return
+
+        for path in manager.archive(today):
+            self.stdout.write(f"Archived {path}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Partitions: {', '.join(m.strftime('%Y-%m') for m in manager.partitions()) or 'none'}"
+        ))
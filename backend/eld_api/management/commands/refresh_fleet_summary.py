@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from eld_api import fleet
+
+
+class Command(BaseCommand):
+    help = "Rebuild the fleet summary tables behind GET /api/fleet/summary/ from trips, logs and violations"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help="Database alias to rebuild")
+        parser.add_argument('--today', help="Count cycle hours as of this date (YYYY-MM-DD) "
+                                            "instead of each driver's home-terminal today")
+
+    def handle(self, *args, **options):
+        today = None
+        if options['today']:
+            today = parse_date(options['today'])
+            if today is None:
+                raise CommandError("--today must be a date in YYYY-MM-DD format")
+
+        stats = fleet.rebuild(today, using=options['database'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Fleet summary rebuilt: {int(stats[fleet.TRIPS])} trip(s), "
+            f"{int(stats[fleet.DRIVERS_NEAR_CYCLE_LIMIT])} driver(s) near the cycle limit"
+        ))
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:16
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eld_api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Driver',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('license_number', models.CharField(max_length=50, unique=True)),
+                ('license_state', models.CharField(blank=True, max_length=2)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Vehicle',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('unit_number', models.CharField(max_length=50, unique=True)),
+                ('vin', models.CharField(blank=True, max_length=17)),
+                ('license_plate', models.CharField(blank=True, max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['unit_number'],
+            },
+        ),
+        migrations.AddField(
+            model_name='eldlog',
+            name='driver',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='eld_logs', to='eld_api.driver'),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='driver',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trips', to='eld_api.driver'),
+        ),
+        migrations.AddIndex(
+            model_name='eldlog',
+            index=models.Index(fields=['driver', 'date', 'start_time'], name='eldlog_driver_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='vehicle',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trips', to='eld_api.vehicle'),
+        ),
+    ]
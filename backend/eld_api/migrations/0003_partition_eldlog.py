@@ -0,0 +1,57 @@
+from django.db import migrations
+
+TABLE = 'eld_api_eldlog'
+
+
+def partition_eldlog(apps, schema_editor):
+    """Rebuild eld_api_eldlog as a PostgreSQL table range-partitioned by month
+
+    Other backends keep a plain table; see eld_api.partitions for how
+    SQLite stores cold months in per-month tables instead.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        # Keep Django's index and FK names so later migrations still find them
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT LIKE %s",
+            [TABLE, '%_pkey']
+        )
+        index_defs = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [TABLE]
+        )
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(f'ALTER TABLE {TABLE} RENAME TO {TABLE}_unpartitioned')
+        cursor.execute(
+            f'CREATE TABLE {TABLE} (LIKE {TABLE}_unpartitioned INCLUDING DEFAULTS INCLUDING IDENTITY) '
+            'PARTITION BY RANGE (date)'
+        )
+        # The partition key has to be part of the primary key
+        cursor.execute(f'ALTER TABLE {TABLE} ADD PRIMARY KEY (id, date)')
+        cursor.execute(f'CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT')
+        cursor.execute(f'INSERT INTO {TABLE} OVERRIDING SYSTEM VALUE SELECT * FROM {TABLE}_unpartitioned')
+        cursor.execute(f'DROP TABLE {TABLE}_unpartitioned')
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {TABLE}"
+        )
+
+        for index_def in index_defs:
+            cursor.execute(index_def)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eld_api', '0002_driver_vehicle'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_eldlog, migrations.RunPython.noop),
+    ]
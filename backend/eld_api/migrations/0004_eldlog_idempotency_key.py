@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eld_api', '0003_partition_eldlog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eldlog',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='eldlog',
+            constraint=models.UniqueConstraint(fields=('idempotency_key', 'date'), name='eldlog_idempotency_key_date'),
+        ),
+    ]
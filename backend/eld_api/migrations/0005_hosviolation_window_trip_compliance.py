@@ -0,0 +1,61 @@
+from django.db import migrations, models
+from django.db.models import Max, Q
+
+
+def backfill(apps, schema_editor):
+    """Key existing violations by creation day, drop duplicates and roll up trip status"""
+    HOSViolation = apps.get_model('eld_api', 'HOSViolation')
+    Trip = apps.get_model('eld_api', 'Trip')
+    db = schema_editor.connection.alias
+
+    for violation in HOSViolation.objects.using(db).only('id', 'created_at').iterator():
+        HOSViolation.objects.using(db).filter(pk=violation.pk).update(window_start=violation.created_at.date())
+
+    # Keep the latest row of each (trip, type, window) group
+    keep = (
+        HOSViolation.objects.using(db)
+        .values('trip_id', 'violation_type', 'window_start')
+        .annotate(latest=Max('id'))
+        .values_list('latest', flat=True)
+    )
+    HOSViolation.objects.using(db).exclude(id__in=list(keep)).delete()
+
+    violating = HOSViolation.objects.using(db).filter(severity='violation').values('trip_id')
+    Trip.objects.using(db).filter(id__in=violating).update(compliance_status='violation')
+    # Trips with logs or only warnings have already been checked
+    checked = Trip.objects.using(db).filter(
+        Q(hos_violations__isnull=False) | Q(eld_logs__isnull=False)
+    ).values('id')
+    Trip.objects.using(db).filter(id__in=checked).exclude(
+        compliance_status='violation'
+    ).update(compliance_status='compliant')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eld_api', '0004_eldlog_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='compliance_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('compliant', 'Compliant'), ('violation', 'Violation')], default='pending', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='hosviolation',
+            name='window_start',
+            field=models.DateField(null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='hosviolation',
+            name='window_start',
+            field=models.DateField(),
+        ),
+        migrations.AddConstraint(
+            model_name='hosviolation',
+            constraint=models.UniqueConstraint(fields=('trip', 'violation_type', 'window_start'), name='hosviolation_trip_type_window'),
+        ),
+    ]
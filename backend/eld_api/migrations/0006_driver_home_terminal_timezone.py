@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:44
+
+import eld_api.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eld_api', '0005_hosviolation_window_trip_compliance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='driver',
+            name='home_terminal_timezone',
+            field=models.CharField(default='UTC', max_length=64, validators=[eld_api.models.validate_timezone]),
+        ),
+    ]
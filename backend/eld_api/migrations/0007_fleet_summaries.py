@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eld_api', '0006_driver_home_terminal_timezone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DriverCycleStat',
+            fields=[
+                ('driver', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cycle_stat', serialize=False, to='eld_api.driver')),
+                ('cycle_hours', models.FloatField(default=0)),
+                ('near_limit', models.BooleanField(default=False)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FleetDailyStat',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+                ('vehicle_miles', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FleetStat',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('value', models.FloatField(default=0)),
+            ],
+        ),
+    ]
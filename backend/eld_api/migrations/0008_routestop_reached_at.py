@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eld_api', '0007_fleet_summaries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='routestop',
+            name='reached_at',
+            field=models.DateTimeField(blank=True, help_text='When the truck arrived at or drove past the stop', null=True),
+        ),
+    ]
@@ -1,10 +1,66 @@
 from django.db import models
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import uuid
 
+CYCLE_DAYS = 8
+
+def validate_timezone(value):
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f"\"{value}\" is not a known IANA time zone")
+
+class Driver(models.Model):
+    """Model for drivers whose HOS history spans trips"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=255)
+    license_number = models.CharField(max_length=50, unique=True)
+    license_state = models.CharField(max_length=2, blank=True)
+    # Log dates and times are recorded in the home terminal's time zone
+    home_terminal_timezone = models.CharField(max_length=64, default='UTC', validators=[validate_timezone])
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} ({self.license_number})"
+
+    def cycle_hours(self, as_of=None) -> float:
+        """On-duty hours logged in the 8-day window ending on as_of (default: today at the home terminal)"""
+        # Partition-aware, so windows reaching into rotated months still count
+        from .fleet import cycle_hours_by_driver
+
+        # Logs are dated in the home terminal's time zone, so "today" is too
+        return cycle_hours_by_driver(as_of, driver_ids=[self.id]).get(self.id) or 0.0
+
+class Vehicle(models.Model):
+    """Model for tractors assigned to trips"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    unit_number = models.CharField(max_length=50, unique=True)
+    vin = models.CharField(max_length=17, blank=True)
+    license_plate = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['unit_number']
+
+    def __str__(self):
+        return f"Unit {self.unit_number}"
+
 class Trip(models.Model):
     """Model for storing trip information"""
+    COMPLIANCE_STATUSES = [
+        ('pending', 'Pending'),
+        ('compliant', 'Compliant'),
+        ('violation', 'Violation'),
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    driver = models.ForeignKey(Driver, on_delete=models.SET_NULL, null=True, blank=True, related_name='trips')
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.SET_NULL, null=True, blank=True, related_name='trips')
     current_location = models.CharField(max_length=255, help_text="Current location of the driver")
     pickup_location = models.CharField(max_length=255, help_text="Pickup location for the trip")
     dropoff_location = models.CharField(max_length=255, help_text="Dropoff location for the trip")
@@ -19,6 +75,9 @@ class Trip(models.Model):
     total_distance = models.FloatField(null=True, blank=True, help_text="Total trip distance in miles")
     estimated_duration = models.FloatField(null=True, blank=True, help_text="Estimated duration in hours")
 
+    # Rolled up from hos_violations whenever compliance is recalculated
+    compliance_status = models.CharField(max_length=10, choices=COMPLIANCE_STATUSES, default='pending')
+
     class Meta:
         ordering = ['-created_at']
 
@@ -43,6 +102,8 @@ class RouteStop(models.Model):
     estimated_arrival = models.DateTimeField()
     duration_minutes = models.IntegerField(help_text="Duration of stop in minutes")
     order = models.IntegerField(help_text="Order of stop in the route")
+    # Set from position pings (eld_api/eta.py); pending stops have none
+    reached_at = models.DateTimeField(null=True, blank=True, help_text="When the truck arrived at or drove past the stop")
 
     class Meta:
         ordering = ['order']
@@ -60,6 +121,8 @@ class ELDLog(models.Model):
     ]
 
     trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name='eld_logs')
+    # Denormalized from trip so per-driver lookbacks are one (driver, date) range scan
+    driver = models.ForeignKey(Driver, on_delete=models.SET_NULL, null=True, blank=True, related_name='eld_logs')
     date = models.DateField()
     start_time = models.TimeField()
     end_time = models.TimeField()
@@ -72,8 +135,18 @@ class ELDLog(models.Model):
     driving_time = models.FloatField(default=0, help_text="Driving time in hours")
     on_duty_time = models.FloatField(default=0, help_text="On duty time in hours")
 
+    # Set by bulk ingest so replayed telematics uploads are deduplicated
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
+
     class Meta:
         ordering = ['date', 'start_time']
+        indexes = [
+            models.Index(fields=['driver', 'date', 'start_time'], name='eldlog_driver_date_idx'),
+        ]
+        constraints = [
+            # Includes the partition key so it is enforceable on partitioned PostgreSQL tables
+            models.UniqueConstraint(fields=['idempotency_key', 'date'], name='eldlog_idempotency_key_date'),
+        ]
 
     def __str__(self):
         return f"{self.date} - {self.get_duty_status_display()}"
@@ -90,8 +163,43 @@ class HOSViolation(models.Model):
     trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name='hos_violations')
     violation_type = models.CharField(max_length=20, choices=VIOLATION_TYPES)
     description = models.TextField()
+    # First day of the duty window the violation was found in
+    window_start = models.DateField()
     severity = models.CharField(max_length=10, choices=[('warning', 'Warning'), ('violation', 'Violation')])
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # Recalculating compliance upserts instead of piling up duplicate rows
+            models.UniqueConstraint(fields=['trip', 'violation_type', 'window_start'],
+                                    name='hosviolation_trip_type_window'),
+        ]
+
     def __str__(self):
         return f"{self.get_violation_type_display()} - {self.severity}"
+
+class FleetStat(models.Model):
+    """Fleet-wide running total, updated incrementally on writes (see eld_api/fleet.py)"""
+    key = models.CharField(max_length=64, primary_key=True)
+    value = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+class FleetDailyStat(models.Model):
+    """Per-day fleet totals, keyed by log date"""
+    date = models.DateField(primary_key=True)
+    vehicle_miles = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.date}: {self.vehicle_miles} mi"
+
+class DriverCycleStat(models.Model):
+    """Last computed cycle hours per driver, so near-limit counts change only when a driver crosses the threshold"""
+    driver = models.OneToOneField(Driver, on_delete=models.CASCADE, primary_key=True, related_name='cycle_stat')
+    cycle_hours = models.FloatField(default=0)
+    near_limit = models.BooleanField(default=False)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.driver_id}: {self.cycle_hours}h"
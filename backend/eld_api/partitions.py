@@ -0,0 +1,430 @@
+import gzip
+import json
+import os
+import re
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+
+from .models import ELDLog
+
+LOG_TABLE = ELDLog._meta.db_table
+LOG_COLUMNS = [f.column for f in ELDLog._meta.concrete_fields]
+PARTITION_RE = re.compile(rf'^{LOG_TABLE}_y(\d{{4}})m(\d{{2}})$')
+ARCHIVE_RE = re.compile(r'^eld_logs_y(\d{4})m(\d{2})\.ndjson\.gz$')
+
+# Filters accepted by partition-routed reads, mapped to their columns
+FILTER_COLUMNS = {'id': 'id', 'trip_id': 'trip_id', 'driver_id': 'driver_id'}
+UUID_COLUMNS = ('trip_id', 'driver_id')
+
+
+def _clean_row(row: Dict) -> Dict:
+    """Normalize backend-specific UUID storage so rows read the same everywhere"""
+    for column in UUID_COLUMNS:
+        if row.get(column) is not None:
+            row[column] = str(uuid.UUID(str(row[column])))
+    return row
+
+
+def _log_from_row(row: Dict) -> ELDLog:
+    """Unsaved ELDLog from a cold-table or archived row"""
+    return ELDLog(**{
+        field.attname: field.to_python(row[field.column])
+        for field in ELDLog._meta.concrete_fields if field.column in row
+    })
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_table(month: date) -> str:
+    return f"{LOG_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def archive_path(month: date) -> Path:
+    return Path(settings.ELD_LOG_ARCHIVE_DIR) / f"eld_logs_y{month.year:04d}m{month.month:02d}.ndjson.gz"
+
+
+def _overlaps(month: date, date_from: Optional[date], date_to: Optional[date]) -> bool:
+    """Whether the calendar month intersects the [date_from, date_to] range"""
+    if date_to is not None and month > date_to:
+        return False
+    if date_from is not None and add_months(month, 1) <= date_from:
+        return False
+    return True
+
+
+class LogPartitionManager:
+    """Monthly partitioning, archival and date-routed reads for ELD logs
+
+    On PostgreSQL `eld_api_eldlog` is a natively range-partitioned table
+    (see migration 0003), so ORM queries are pruned by the planner and this
+    class only creates, detaches and archives monthly partitions.
+
+    On SQLite the model table is the hot partition holding the current and
+    previous month; older rows are moved into per-month cold tables that
+    reads are routed to by date range.
+    """
+
+    def __init__(self, using: str = 'default'):
+        self.using = using
+        self.connection = connections[using]
+        self.native = self.connection.vendor == 'postgresql'
+
+    @classmethod
+    def for_reads(cls) -> 'LogPartitionManager':
+        """Manager on the database the router picks for reads (a replica unless pinned)"""
+        return cls(router.db_for_read(ELDLog))
+
+    def hot_start(self, today: date) -> date:
+        """First day still kept in the SQLite hot table"""
+        return add_months(month_start(today), -1)
+
+    def partitions(self) -> List[date]:
+        """Months that currently have a physical partition table, oldest first"""
+        months = []
+        with self.connection.cursor() as cursor:
+            tables = self.connection.introspection.table_names(cursor)
+        for table in tables:
+            match = PARTITION_RE.match(table)
+            if match:
+                months.append(date(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    def archives(self) -> List[date]:
+        """Months that have been archived to NDJSON, oldest first"""
+        archive_dir = Path(settings.ELD_LOG_ARCHIVE_DIR)
+        if not archive_dir.is_dir():
+            return []
+        months = []
+        for entry in archive_dir.iterdir():
+            match = ARCHIVE_RE.match(entry.name)
+            if match:
+                months.append(date(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    # Maintenance
+
+    def ensure_partition(self, month: date):
+        """Create the partition for `month` if missing"""
+        table = partition_table(month)
+        qn = self.connection.ops.quote_name
+        if month in self.partitions():
+            return
+
+        with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+            if self.native:
+                # Rows for the month may already sit in the default partition
+                bounds = [month, add_months(month, 1)]
+                literal_bounds = tuple(f"'{bound.isoformat()}'" for bound in bounds)
+                cursor.execute(f'CREATE TABLE {qn(table)} (LIKE {qn(LOG_TABLE)} INCLUDING DEFAULTS)')
+                cursor.execute(
+                    f'INSERT INTO {qn(table)} SELECT * FROM {qn(LOG_TABLE + "_default")} '
+                    f'WHERE date >= %s AND date < %s', bounds
+                )
+                cursor.execute(f'DELETE FROM {qn(LOG_TABLE + "_default")} WHERE date >= %s AND date < %s', bounds)
+                cursor.execute(
+                    f'ALTER TABLE {qn(LOG_TABLE)} ATTACH PARTITION {qn(table)} '
+                    f'FOR VALUES FROM ({literal_bounds[0]}) TO ({literal_bounds[1]})'
+                )
+            else:
+                cursor.execute(f'CREATE TABLE {qn(table)} AS SELECT * FROM {qn(LOG_TABLE)} WHERE 0')
+                cursor.execute(f'CREATE INDEX {qn(table + "_driver_date")} ON {qn(table)} (driver_id, date, start_time)')
+                cursor.execute(f'CREATE INDEX {qn(table + "_trip")} ON {qn(table)} (trip_id)')
+
+    def rotate(self, today: date) -> List[date]:
+        """Bring partitions up to date for `today`; returns the months touched
+
+        PostgreSQL: create this and next month's partitions ahead of writes
+        and split any rows that landed in the default partition.
+        SQLite: move rows older than the hot window into monthly cold tables.
+        """
+        qn = self.connection.ops.quote_name
+        if self.native:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT DISTINCT date_trunc('month', date)::date FROM {qn(LOG_TABLE + '_default')}"
+                )
+                months = {row[0] for row in cursor.fetchall()}
+            months.update({month_start(today), add_months(month_start(today), 1)})
+            for month in sorted(months):
+                self.ensure_partition(month)
+            return sorted(months)
+
+        cutoff = self.hot_start(today)
+        months = list(
+            ELDLog.objects.using(self.using).filter(date__lt=cutoff).dates('date', 'month')
+        )
+        columns = ', '.join(qn(column) for column in LOG_COLUMNS)
+        for month in months:
+            self.ensure_partition(month)
+            table = partition_table(month)
+            self._add_missing_columns(table)
+            bounds = [month, add_months(month, 1)]
+            with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {qn(table)} ({columns}) SELECT {columns} FROM {qn(LOG_TABLE)} '
+                    f'WHERE date >= %s AND date < %s', bounds
+                )
+                cursor.execute(f'DELETE FROM {qn(LOG_TABLE)} WHERE date >= %s AND date < %s', bounds)
+        return months
+
+    def _add_missing_columns(self, table: str):
+        """Cold SQLite tables predate later schema changes; add any new columns"""
+        qn = self.connection.ops.quote_name
+        with self.connection.cursor() as cursor:
+            existing = {
+                column.name for column in self.connection.introspection.get_table_description(cursor, table)
+            }
+            for field in ELDLog._meta.concrete_fields:
+                if field.column not in existing:
+                    cursor.execute(
+                        f'ALTER TABLE {qn(table)} ADD COLUMN {qn(field.column)} {field.db_type(self.connection)}'
+                    )
+
+    def archive(self, today: date) -> List[Path]:
+        """Move partitions older than the retention window into gzipped NDJSON files"""
+        self.rotate(today)
+        cutoff = add_months(month_start(today), -settings.ELD_LOG_RETENTION_MONTHS)
+        qn = self.connection.ops.quote_name
+        written = []
+
+        for month in self.partitions():
+            if month >= cutoff:
+                continue
+            table = partition_table(month)
+            path = archive_path(month)
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write to a temp file and rename so readers never see partial archives.
+            # Rows already archived are skipped by id, so rerunning after a crash
+            # between the rename and the DROP below does not duplicate them.
+            tmp_path = path.with_suffix('.tmp')
+            archived_ids = set()
+            with self.connection.cursor() as cursor, gzip.open(tmp_path, 'wt', encoding='utf-8') as out:
+                for row in self._iter_archived(path):
+                    archived_ids.add(row['id'])
+                    out.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+                cursor.execute(f'SELECT * FROM {qn(table)} ORDER BY date, start_time')
+                columns = [col[0] for col in cursor.description]
+                for values in cursor:
+                    row = _clean_row(dict(zip(columns, values)))
+                    if row['id'] not in archived_ids:
+                        out.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            os.replace(tmp_path, path)
+            self._drop_partition(table)
+            written.append(path)
+
+        return written
+
+    def _drop_partition(self, table: str):
+        qn = self.connection.ops.quote_name
+        with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+            if self.native:
+                cursor.execute(f'ALTER TABLE {qn(LOG_TABLE)} DETACH PARTITION {qn(table)}')
+            cursor.execute(f'DROP TABLE {qn(table)}')
+
+    def reassign_trip(self, trip_id, driver_id) -> int:
+        """Point all of a trip's logs at driver_id: model table, cold tables and archives
+
+        Returns the number of rows changed.
+        """
+        qn = self.connection.ops.quote_name
+        trip_field, driver_field = ELDLog._meta.get_field('trip'), ELDLog._meta.get_field('driver')
+        params = [driver_field.get_db_prep_value(driver_id, self.connection),
+                  trip_field.get_db_prep_value(trip_id, self.connection)]
+        with transaction.atomic(using=self.using):
+            changed = ELDLog.objects.using(self.using).filter(trip_id=trip_id).update(driver_id=driver_id)
+            if not self.native:
+                with self.connection.cursor() as cursor:
+                    for month in self.partitions():
+                        cursor.execute(
+                            f'UPDATE {qn(partition_table(month))} SET driver_id = %s WHERE trip_id = %s', params
+                        )
+                        changed += cursor.rowcount
+        trip_id, driver_id = str(uuid.UUID(str(trip_id))), str(uuid.UUID(str(driver_id))) if driver_id else None
+        for month in self.archives():
+            changed += self._rewrite_archived(archive_path(month), lambda row: row['trip_id'] == trip_id,
+                                              lambda row: {**row, 'driver_id': driver_id})
+        return changed
+
+    def purge_trip(self, trip_id) -> int:
+        """Delete a deleted trip's logs from cold tables and archives, as the model table cascades
+
+        Returns the number of rows removed.
+        """
+        qn = self.connection.ops.quote_name
+        params = [ELDLog._meta.get_field('trip').get_db_prep_value(trip_id, self.connection)]
+        removed = 0
+        if not self.native:
+            with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+                for month in self.partitions():
+                    cursor.execute(f'DELETE FROM {qn(partition_table(month))} WHERE trip_id = %s', params)
+                    removed += cursor.rowcount
+        trip_id = str(uuid.UUID(str(trip_id)))
+        for month in self.archives():
+            removed += self._rewrite_archived(archive_path(month), lambda row: row['trip_id'] == trip_id,
+                                              lambda row: None)
+        return removed
+
+    def detach_driver(self, driver_id) -> int:
+        """Clear a deleted driver from logs in cold tables and archives, as the model table does
+
+        Returns the number of rows changed.
+        """
+        qn = self.connection.ops.quote_name
+        params = [ELDLog._meta.get_field('driver').get_db_prep_value(driver_id, self.connection)]
+        changed = 0
+        if not self.native:
+            with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+                for month in self.partitions():
+                    cursor.execute(f'UPDATE {qn(partition_table(month))} SET driver_id = NULL WHERE driver_id = %s',
+                                   params)
+                    changed += cursor.rowcount
+        driver_id = str(uuid.UUID(str(driver_id)))
+        for month in self.archives():
+            changed += self._rewrite_archived(archive_path(month), lambda row: row['driver_id'] == driver_id,
+                                              lambda row: {**row, 'driver_id': None})
+        return changed
+
+    def _rewrite_archived(self, path: Path, match, change) -> int:
+        """Replace each archived row that match()es by change(row), or drop it when that is None"""
+        rows = list(self._iter_archived(path))
+        matching = sum(1 for row in rows if match(row))
+        if not matching:
+            return 0
+        tmp_path = path.with_suffix('.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as out:
+            for row in rows:
+                if match(row):
+                    row = change(row)
+                if row is not None:
+                    out.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+        os.replace(tmp_path, path)
+        return matching
+
+    # Date-routed reads
+
+    def query(self, date_from: Optional[date] = None, date_to: Optional[date] = None, **filters) -> List[ELDLog]:
+        """ELDLog rows in the date range across the hot table, cold partitions and archives
+
+        Rows read from cold tables and archives are unsaved ELDLog instances.
+        """
+        logs = [_log_from_row(row) for row in self._iter_stored(date_from, date_to, filters)]
+        logs.extend(self._live(date_from, date_to, filters))
+        logs.sort(key=lambda log: (log.date, log.start_time))
+        return logs
+
+    def iter_rows(self, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                  **filters) -> Iterator[Dict]:
+        """Raw log rows in the date range, including archived months, oldest first"""
+        yield from self._iter_stored(date_from, date_to, filters)
+        for row in self._live(date_from, date_to, filters).values(*LOG_COLUMNS).iterator():
+            yield _clean_row(row)
+
+    def stored_rows(self, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                    **filters) -> Iterator[Dict]:
+        """Raw rows in the date range that the ELDLog model table no longer holds
+
+        For aggregates that run over the model table in SQL and add these on top.
+        """
+        return self._iter_stored(date_from, date_to, filters)
+
+    def _live(self, date_from, date_to, filters):
+        """Rows the ORM reaches: the hot table, or every attached partition on PostgreSQL"""
+        queryset = ELDLog.objects.using(self.using).filter(**filters)
+        if date_from is not None:
+            queryset = queryset.filter(date__gte=date_from)
+        if date_to is not None:
+            queryset = queryset.filter(date__lte=date_to)
+        return queryset
+
+    def _iter_stored(self, date_from, date_to, filters) -> Iterator[Dict]:
+        """Rows of SQLite cold tables and of archives in the range, month by month
+
+        A month archived but not yet dropped (interrupted maintenance) sits in
+        both places; its archived copies of rows still in the table are skipped.
+        """
+        tables = set(self.partitions())
+        archived = set(self.archives())
+        months = archived if self.native else archived | tables
+        for month in sorted(months):
+            if not _overlaps(month, date_from, date_to):
+                continue
+            table_ids = set()
+            if month in tables and self.native:
+                if month in archived:
+                    table_ids = self._table_ids(month)
+            elif month in tables:
+                for row in self._iter_table(month, date_from, date_to, filters):
+                    table_ids.add(row['id'])
+                    yield row
+            if month in archived:
+                for row in self._iter_archived(archive_path(month)):
+                    if row['id'] not in table_ids and self._row_matches(row, date_from, date_to, filters):
+                        yield row
+
+    def _iter_table(self, month: date, date_from, date_to, filters) -> Iterator[Dict]:
+        sql, params = self._cold_select(month, date_from, date_to, filters)
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            columns = [col[0] for col in cursor.description]
+            for values in cursor:
+                yield _clean_row(dict(zip(columns, values)))
+
+    def _table_ids(self, month: date) -> set:
+        qn = self.connection.ops.quote_name
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'SELECT id FROM {qn(partition_table(month))}')
+            return {row[0] for row in cursor.fetchall()}
+
+    def _cold_select(self, month: date, date_from, date_to, filters):
+        qn = self.connection.ops.quote_name
+        clauses, params = [], []
+        if date_from is not None:
+            clauses.append('date >= %s')
+            params.append(date_from)
+        if date_to is not None:
+            clauses.append('date <= %s')
+            params.append(date_to)
+        for name, value in filters.items():
+            if name not in FILTER_COLUMNS:
+                raise ValueError(f"Unsupported partition filter: {name}")
+            field = ELDLog._meta.get_field(name)
+            clauses.append(f'{qn(FILTER_COLUMNS[name])} = %s')
+            params.append(field.get_db_prep_value(value, self.connection))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        return f'SELECT * FROM {qn(partition_table(month))}{where} ORDER BY date, start_time', params
+
+    @staticmethod
+    def _iter_archived(path: Path) -> Iterator[Dict]:
+        if not path.exists():
+            return
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    @staticmethod
+    def _row_matches(row: Dict, date_from, date_to, filters) -> bool:
+        row_date = date.fromisoformat(row['date'])
+        if date_from is not None and row_date < date_from:
+            return False
+        if date_to is not None and row_date > date_to:
+            return False
+        for name, value in filters.items():
+            field = ELDLog._meta.get_field(name)
+            if field.to_python(row.get(FILTER_COLUMNS[name])) != field.to_python(value):
+                return False
+        return True
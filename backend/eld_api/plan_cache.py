@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Sequence, Tuple
+
+from django.conf import settings
+
+
+def normalize_location(value: str) -> str:
+    """Canonical form of a free-text location used in cache keys"""
+    return ' '.join(value.casefold().replace(',', ' ').split())
+
+
+def lane_key(current_location: str, pickup_location: str, dropoff_location: str,
+             via: Sequence[str] = ()) -> Tuple:
+    """Cache key for a lane: the normalized (current, pickup, dropoff) triple plus any waypoints"""
+    key = (
+        normalize_location(current_location),
+        normalize_location(pickup_location),
+        normalize_location(dropoff_location),
+    )
+    if via:
+        key += (tuple(normalize_location(waypoint) for waypoint in via),)
+    return key
+
+
+class PlanCache:
+    """Thread-safe LRU cache with TTL expiry and hit/latency statistics"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 6 * 60 * 60,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._build_seconds = 0.0
+        self._hit_seconds = 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any]) -> Any:
+        """Return the cached value for key, building and storing it on a miss"""
+        started = time.perf_counter()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    self._hit_seconds += time.perf_counter() - started
+                    return value
+                del self._entries[key]
+                self._expirations += 1
+
+        # Build outside the lock; concurrent misses on one key may both build
+        value = builder()
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._misses += 1
+            self._build_seconds += elapsed
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit rate and estimated latency saved by serving hits instead of rebuilding"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            avg_build = self._build_seconds / self._misses if self._misses else 0.0
+            avg_hit = self._hit_seconds / self._hits if self._hits else 0.0
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'avg_build_ms': avg_build * 1000,
+                'avg_hit_ms': avg_hit * 1000,
+                'time_saved_ms': max(0.0, avg_build - avg_hit) * self._hits * 1000,
+            }
+
+
+def _configured_cache(setting: str, max_entries: int, ttl_seconds: float) -> PlanCache:
+    config = getattr(settings, setting, {})
+    return PlanCache(
+        max_entries=config.get('MAX_ENTRIES', max_entries),
+        ttl_seconds=config.get('TTL_SECONDS', ttl_seconds),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_trip_plan_cache() -> PlanCache:
+    """Process-wide trip plan cache configured from settings.TRIP_PLAN_CACHE"""
+    return _configured_cache('TRIP_PLAN_CACHE', 1024, 6 * 60 * 60)
+
+
+@lru_cache(maxsize=None)
+def get_simulation_plan_cache() -> PlanCache:
+    """Plans of what-if lanes, kept apart so simulations never evict the plans of real trips
+
+    Configured from settings.SIMULATION_PLAN_CACHE.
+    """
+    return _configured_cache('SIMULATION_PLAN_CACHE', 256, 60 * 60)
@@ -0,0 +1,177 @@
+"""Compact response formats for log-heavy endpoints, chosen by content negotiation
+
+* application/vnd.eld.columnar+json (?format=columnar): every list of
+  same-shaped objects becomes {"$rows": n, "$columns": {key: column}}, so
+  each key is sent once. A column is a plain array of values, or an object
+  naming its encoding:
+
+      {"constant": v}        every row has v (e.g. the trip UUID)
+      {"delta": [...]}       ascending integers, first value then differences
+      {"date_delta": [...]}  YYYY-MM-DD as days since 1970-01-01, delta-encoded
+      {"time_delta": [...]}  HH:MM:SS as seconds since midnight, delta-encoded
+      {"datetime_delta": [...]}  UTC ISO 8601 ('...Z') as epoch microseconds, delta-encoded
+
+  from_columnar() is the reference decoder.
+* application/msgpack (?format=msgpack): the regular JSON structure in
+  MessagePack; needs the `msgpack` package (in requirements.txt) and is
+  not offered when it is missing.
+
+Responses are compressed separately by eld_api.compression.
+"""
+import re
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from itertools import accumulate
+from typing import Callable, List, Tuple
+
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .clock import EPOCH_ORDINAL
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ROWS = '$rows'
+COLUMNS = '$columns'
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+TIME_RE = re.compile(r'\d{2}:\d{2}:\d{2}')
+DATETIME_RE = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{6})?Z')
+
+
+def _date_to_days(value: str) -> int:
+    return date.fromisoformat(value).toordinal() - EPOCH_ORDINAL
+
+
+def _days_to_date(days: int) -> str:
+    return date.fromordinal(EPOCH_ORDINAL + days).isoformat()
+
+
+def _time_to_seconds(value: str) -> int:
+    return int(value[:2]) * 3600 + int(value[3:5]) * 60 + int(value[6:8])
+
+
+def _seconds_to_time(seconds: int) -> str:
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _datetime_to_micros(value: str) -> int:
+    delta = datetime.fromisoformat(value) - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _micros_to_datetime(micros: int) -> str:
+    return (EPOCH + timedelta(microseconds=micros)).isoformat().replace('+00:00', 'Z')
+
+
+# Delta encodings of string columns: (name, pattern every value must match, to int, from int).
+# The patterns only accept the canonical forms DRF renders, so decoding restores the same strings.
+STRING_ENCODINGS: Tuple[Tuple[str, re.Pattern, Callable, Callable], ...] = (
+    ('date_delta', DATE_RE, _date_to_days, _days_to_date),
+    ('time_delta', TIME_RE, _time_to_seconds, _seconds_to_time),
+    ('datetime_delta', DATETIME_RE, _datetime_to_micros, _micros_to_datetime),
+)
+DECODERS = {name: decode for name, _, _, decode in STRING_ENCODINGS}
+
+
+def _deltas(numbers: List[int]) -> List[int]:
+    return [numbers[0]] + [b - a for a, b in zip(numbers, numbers[1:])]
+
+
+def _encode_column(values: List):
+    first = values[0]
+    if len(values) > 1 and all(value == first for value in values):
+        return {'constant': first}
+    if all(type(value) is int for value in values):
+        # Only ascending integers (ids, counters) shrink when delta-encoded
+        if all(a <= b for a, b in zip(values, values[1:])):
+            return {'delta': _deltas(values)}
+        return values
+    if all(type(value) is str for value in values):
+        for name, pattern, encode, _ in STRING_ENCODINGS:
+            if all(pattern.fullmatch(value) for value in values):
+                return {name: _deltas([encode(value) for value in values])}
+    return values
+
+
+def _decode_column(column, count: int) -> List:
+    if isinstance(column, list):
+        return column
+    (name, values), = column.items()
+    if name == 'constant':
+        return [values] * count
+    numbers = list(accumulate(values))
+    return numbers if name == 'delta' else [DECODERS[name](number) for number in numbers]
+
+
+def to_columnar(data, default: Callable = None):
+    """Recursively turn lists of same-keyed objects into column blocks
+
+    default converts leaves that are not JSON types (UUIDs, dates) first,
+    so columns see the strings the plain JSON response would carry.
+    """
+    if isinstance(data, dict):
+        return {key: to_columnar(value, default) for key, value in data.items()}
+    if not isinstance(data, (list, tuple)):
+        if default is None or data is None or isinstance(data, (str, int, float, bool)):
+            return data
+        return to_columnar(default(data), default)
+    rows = [to_columnar(item, default) for item in data]
+    if not rows or not all(isinstance(row, dict) for row in rows):
+        return rows
+    keys = list(rows[0])
+    if any(len(row) != len(keys) or list(row) != keys for row in rows):
+        return rows
+    return {
+        ROWS: len(rows),
+        COLUMNS: {key: _encode_column([row[key] for row in rows]) for key in keys},
+    }
+
+
+def from_columnar(data):
+    """Inverse of to_columnar on the decoded JSON"""
+    if isinstance(data, list):
+        return [from_columnar(item) for item in data]
+    if not isinstance(data, dict):
+        return data
+    if ROWS in data and COLUMNS in data:
+        count = data[ROWS]
+        columns = {key: _decode_column(column, count) for key, column in data[COLUMNS].items()}
+        return [from_columnar({key: values[i] for key, values in columns.items()}) for i in range(count)]
+    return {key: from_columnar(value) for key, value in data.items()}
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    media_type = 'application/vnd.eld.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        columnar = to_columnar(data, self.encoder_class().default)
+        return super().render(columnar, accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    available = msgpack is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=JSONEncoder().default)
+
+
+class CompactContentNegotiation(DefaultContentNegotiation):
+    """Default negotiation, skipping renderers whose optional dependency is missing"""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        renderers = [renderer for renderer in renderers if getattr(renderer, 'available', True)]
+        return super().select_renderer(request, renderers, format_suffix)
@@ -1,5 +1,16 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Trip, RouteStop, ELDLog, HOSViolation
+from .models import Driver, Vehicle, Trip, RouteStop, ELDLog, HOSViolation
+
+class DriverSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Driver
+        fields = '__all__'
+
+class VehicleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Vehicle
+        fields = '__all__'
 
 class RouteStopSerializer(serializers.ModelSerializer):
     class Meta:
@@ -24,13 +35,57 @@ class TripSerializer(serializers.ModelSerializer):
     class Meta:
         model = Trip
         fields = '__all__'
+        read_only_fields = ['compliance_status']
 
 class TripCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Trip
-        fields = ['current_location', 'pickup_location', 'dropoff_location', 'current_cycle_hours']
+        fields = ['driver', 'vehicle', 'current_location', 'pickup_location', 'dropoff_location', 'current_cycle_hours']
+        extra_kwargs = {'current_cycle_hours': {'required': False}}
 
     def validate_current_cycle_hours(self, value):
         if value < 0 or value > 70:
             raise serializers.ValidationError("Current cycle hours must be between 0 and 70")
         return value
+
+    def validate(self, attrs):
+        # With a known driver, cycle hours come from their logged history
+        if attrs.get('current_cycle_hours') is None:
+            driver = attrs.get('driver')
+            if driver is None:
+                raise serializers.ValidationError(
+                    {'current_cycle_hours': "Required when no driver is given"}
+                )
+            attrs['current_cycle_hours'] = min(70, driver.cycle_hours())
+        return attrs
+
+class TripVariantSerializer(serializers.Serializer):
+    current_location = serializers.CharField(max_length=255)
+    pickup_location = serializers.CharField(max_length=255)
+    dropoff_location = serializers.CharField(max_length=255)
+    current_cycle_hours = serializers.FloatField(min_value=0, max_value=70)
+    via = serializers.ListField(child=serializers.CharField(max_length=255), required=False, max_length=10)
+
+class TripSimulationSerializer(serializers.Serializer):
+    """Variants are merged over `base`, so each only lists what it changes"""
+    base = serializers.DictField(required=False, default=dict)
+    variants = serializers.ListField(child=serializers.DictField(), min_length=1)
+
+    def validate_variants(self, value):
+        limit = getattr(settings, 'TRIP_SIMULATION_MAX_VARIANTS', 500)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} variants per request")
+        return value
+
+    def validate(self, attrs):
+        merged = TripVariantSerializer(data=[{**attrs['base'], **v} for v in attrs['variants']], many=True)
+        if not merged.is_valid():
+            raise serializers.ValidationError({'variants': merged.errors})
+        attrs['variants'] = merged.validated_data
+        return attrs
+
+class PositionSerializer(serializers.Serializer):
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    # When the fix was taken (default: when it is received)
+    recorded_at = serializers.DateTimeField(required=False)
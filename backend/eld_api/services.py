@@ -1,7 +1,224 @@
-import requests
-from datetime import datetime, timedelta, time
-from typing import List, Dict, Tuple
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from time import perf_counter
+from types import SimpleNamespace
+from typing import List, Dict, Sequence, Tuple
+from django.db import transaction
 from .models import Trip, RouteStop, ELDLog, HOSViolation
+from .clock import (
+    MINUTES_PER_DAY, LocalClock, clock_string, get_zone, local_date, local_day_start, local_time, now_minutes,
+    to_datetime, to_iso
+)
+from .events import LOG_SEGMENTS_ADDED, STOPS_ADDED, VIOLATIONS_ADDED, publish_on_commit
+from .fleet import record_log_miles, record_trip_distance, record_violation_changes, refresh_driver_cycle
+from .geo import Polyline, haversine_miles
+from .hos_rules import (
+    BREAK_HOURS, DRIVING_SINCE_BREAK, DUTY_WINDOW, REST_STATUSES, SHIFT_DRIVING, SHIFT_RESET_HOURS, DutyPeriod,
+    get_rule_engine, timeline_from_segments
+)
+from .plan_cache import PlanCache, get_simulation_plan_cache, get_trip_plan_cache, lane_key
+from .truck_stops import StopPlacementEngine, get_truck_stop_index
+
+AVERAGE_SPEED_MPH = 55
+# Miles driven in one minute: shorter legs round to no log time at all
+MIN_LEG_MILES = AVERAGE_SPEED_MPH / 60
+
+
+@dataclass(frozen=True)
+class TripPlan:
+    """Cycle-independent plan for a lane, shared by every trip on that lane
+
+    Stop arrivals and log segments are stored as integer minute offsets from
+    the trip start; locations may reference the trip's own {current}, {pickup} and
+    {dropoff} strings so one plan serves any spelling of the same lane.
+    """
+    current_coords: Tuple[float, float]
+    pickup_coords: Tuple[float, float]
+    dropoff_coords: Tuple[float, float]
+    total_distance: float
+    estimated_duration: float
+    stops: Tuple[Dict, ...]
+    route_geometry: Tuple[Tuple[float, float], ...]
+    eld_logs: Tuple[Dict, ...]
+    duty_timeline: Tuple[DutyPeriod, ...]
+
+
+def _format_location(template: str, trip) -> str:
+    return template.format(
+        current=trip.current_location,
+        pickup=trip.pickup_location,
+        dropoff=trip.dropoff_location,
+    )
+
+
+def _split_at_midnight(start: int, end: int) -> List[Tuple[int, int]]:
+    """Split the local-minute span [start, end) at local midnights"""
+    pieces = []
+    while end > (start // MINUTES_PER_DAY + 1) * MINUTES_PER_DAY:
+        midnight = (start // MINUTES_PER_DAY + 1) * MINUTES_PER_DAY
+        pieces.append((start, midnight))
+        start = midnight
+    pieces.append((start, end))
+    return pieces
+
+
+def build_trip_plan(current_location: str, pickup_location: str, dropoff_location: str,
+                    via: Sequence[str] = ()) -> TripPlan:
+    """Compute geocoding, distance, stop layout and log skeleton for a lane"""
+    route_service = get_route_service()
+    hos_service = get_hos_service()
+
+    current_coords = route_service.get_coordinates(current_location)
+    pickup_coords = route_service.get_coordinates(pickup_location)
+    dropoff_coords = route_service.get_coordinates(dropoff_location)
+    via_coords = [route_service.get_coordinates(waypoint) for waypoint in via]
+    loaded_route = [pickup_coords, *via_coords, dropoff_coords]
+
+    # Calculate distance and duration (simplified calculation)
+    total_distance = sum(
+        route_service._calculate_distance(a, b) for a, b in zip(loaded_route, loaded_route[1:])
+    )
+    driving_duration = total_distance / AVERAGE_SPEED_MPH
+
+    stops, eld_logs = hos_service._plan_itinerary(loaded_route)
+    geometry = route_service._generate_route_geometry(current_coords, pickup_coords, dropoff_coords)
+    geometry[2:2] = [[lon, lat] for lat, lon in via_coords]
+
+    return TripPlan(
+        current_coords=current_coords,
+        pickup_coords=pickup_coords,
+        dropoff_coords=dropoff_coords,
+        total_distance=total_distance,
+        estimated_duration=driving_duration,
+        stops=tuple(stops),
+        route_geometry=tuple(tuple(point) for point in geometry),
+        eld_logs=tuple(eld_logs),
+        duty_timeline=tuple(timeline_from_segments(eld_logs)),
+    )
+
+
+def get_lane_plan(current_location: str, pickup_location: str, dropoff_location: str,
+                  via: Sequence[str] = (), cache: PlanCache = None) -> TripPlan:
+    """Return the memoized plan for a lane, building it on a cache miss (default: the trip plan cache)"""
+    if cache is None:
+        cache = get_trip_plan_cache()
+    return cache.get_or_build(
+        lane_key(current_location, pickup_location, dropoff_location, via),
+        lambda: build_trip_plan(current_location, pickup_location, dropoff_location, via),
+    )
+
+
+def get_trip_plan(trip: Trip) -> TripPlan:
+    """Return the memoized plan for the trip's lane"""
+    return get_lane_plan(trip.current_location, trip.pickup_location, trip.dropoff_location)
+
+
+def simulate_trips(variants: List[Dict], budget_seconds: float = None) -> Dict:
+    """Plan trip variants in memory and rank them, without writing to the database
+
+    Variants on the same lane share one plan from the simulation cache, so
+    only the HOS rule scan runs per variant. Variants not reached within
+    the latency budget are reported as skipped.
+    """
+    started = perf_counter()
+    hos_service = get_hos_service()
+    cache = get_simulation_plan_cache()
+    now = now_minutes()
+    results = []
+
+    for index, variant in enumerate(variants):
+        if budget_seconds is not None and perf_counter() - started > budget_seconds:
+            results.append({'index': index, 'input': variant, 'status': 'skipped',
+                            'reason': 'Latency budget exceeded'})
+            continue
+
+        via = variant.get('via') or ()
+        plan = get_lane_plan(variant['current_location'], variant['pickup_location'],
+                             variant['dropoff_location'], via, cache)
+        names = SimpleNamespace(
+            current_location=variant['current_location'],
+            pickup_location=variant['pickup_location'],
+            dropoff_location=variant['dropoff_location'],
+        )
+        violations = hos_service.check_violations(plan, variant['current_cycle_hours'])
+        severe = sum(1 for v in violations if v['severity'] == 'violation')
+        last_stop = plan.stops[-1]
+        trip_hours = (last_stop['arrival_offset_minutes'] + last_stop['duration_minutes']) / 60
+
+        results.append({
+            'index': index,
+            'input': variant,
+            'status': 'planned',
+            'total_distance': plan.total_distance,
+            'estimated_duration': plan.estimated_duration,
+            'total_trip_hours': trip_hours,
+            'stops': [{
+                'stop_type': stop['stop_type'],
+                'location': _format_location(stop['location'], names),
+                'latitude': stop['latitude'],
+                'longitude': stop['longitude'],
+                'estimated_arrival': to_iso(now + stop['arrival_offset_minutes']),
+                'duration_minutes': stop['duration_minutes'],
+            } for stop in plan.stops],
+            'route_geometry': [list(point) for point in plan.route_geometry],
+            'violations': violations,
+            'remaining_hours': hos_service.remaining_cycle_hours(variant['current_cycle_hours']),
+            'can_complete_trip': severe == 0,
+            # Lower sorts first: feasible, fewest violations and warnings, then fastest
+            'score': [severe, len(violations) - severe, round(trip_hours, 3)],
+        })
+
+    ranked = sorted((r for r in results if r['status'] == 'planned'), key=lambda r: r['score'])
+    for rank, result in enumerate(ranked, start=1):
+        result['rank'] = rank
+
+    return {
+        'plans': ranked + [r for r in results if r['status'] != 'planned'],
+        'elapsed_ms': (perf_counter() - started) * 1000,
+    }
+
+
+# Mock geocoder: (lowercased city, (lat, lon)), matched in order as substrings of the address.
+# A module-level tuple, so it is built once per process and shared by forked workers.
+GAZETTEER: Tuple[Tuple[str, Tuple[float, float]], ...] = tuple((city.lower(), coords) for city, coords in (
+    ("New York", (40.7128, -74.0060)),
+    ("Los Angeles", (34.0522, -118.2437)),
+    ("Chicago", (41.8781, -87.6298)),
+    ("Houston", (29.7604, -95.3698)),
+    ("Phoenix", (33.4484, -112.0740)),
+    ("Philadelphia", (39.9526, -75.1652)),
+    ("San Antonio", (29.4241, -98.4936)),
+    ("San Diego", (32.7157, -117.1611)),
+    ("Dallas", (32.7767, -96.7970)),
+    ("San Jose", (37.3382, -121.8863)),
+    ("Detroit", (42.3314, -83.0458)),
+    ("Atlanta", (33.7490, -84.3880)),
+    ("Boston", (42.3601, -71.0589)),
+    ("Miami", (25.7617, -80.1918)),
+    ("Seattle", (47.6062, -122.3321)),
+    ("Denver", (39.7392, -104.9903)),
+    ("Las Vegas", (36.1699, -115.1398)),
+    ("Nashville", (36.1627, -86.7816)),
+    ("Memphis", (35.1495, -90.0490)),
+    ("Milwaukee", (43.0389, -87.9065)),
+    ("Orlando", (28.5383, -81.3792)),
+    ("Jacksonville", (30.3322, -81.6557)),
+    ("Tampa", (27.9506, -82.4572)),
+    ("Austin", (30.2672, -97.7431)),
+))
+US_CENTER = (39.8283, -98.5795)
+
+
+@lru_cache(maxsize=4096)
+def geocode(address: str) -> Tuple[float, float]:
+    """Coordinates of the first gazetteer city named in the address, else the center of the US"""
+    address = address.lower()
+    for city, coords in GAZETTEER:
+        if city in address:
+            return coords
+    return US_CENTER
+
 
 class RouteService:
     """Service for calculating routes and stops using OpenRouteService API"""
@@ -14,170 +231,64 @@ class RouteService:
     def get_coordinates(self, address: str) -> Tuple[float, float]:
         """Get latitude and longitude for an address"""
         # In a real implementation, you'd use a geocoding service
-        # For demo, returning mock coordinates
-        mock_coords = {
-            "New York": (40.7128, -74.0060),
-            "Los Angeles": (34.0522, -118.2437),
-            "Chicago": (41.8781, -87.6298),
-            "Houston": (29.7604, -95.3698),
-            "Phoenix": (33.4484, -112.0740),
-            "Philadelphia": (39.9526, -75.1652),
-            "San Antonio": (29.4241, -98.4936),
-            "San Diego": (32.7157, -117.1611),
-            "Dallas": (32.7767, -96.7970),
-            "San Jose": (37.3382, -121.8863),
-            "Detroit": (42.3314, -83.0458),
-            "Atlanta": (33.7490, -84.3880),
-            "Boston": (42.3601, -71.0589),
-            "Miami": (25.7617, -80.1918),
-            "Seattle": (47.6062, -122.3321),
-            "Denver": (39.7392, -104.9903),
-            "Las Vegas": (36.1699, -115.1398),
-            "Nashville": (36.1627, -86.7816),
-            "Memphis": (35.1495, -90.0490),
-            "Milwaukee": (43.0389, -87.9065),
-            "Orlando": (28.5383, -81.3792),
-            "Jacksonville": (30.3322, -81.6557),
-            "Tampa": (27.9506, -82.4572),
-            "Austin": (30.2672, -97.7431),
-        }
-
-        # Simple matching - in production you'd use proper geocoding
-        for city, coords in mock_coords.items():
-            if city.lower() in address.lower():
-                return coords
+        return geocode(address)
 
-        # Default coordinates if not found
-        return (39.8283, -98.5795)  # Geographic center of US
-
-    def calculate_route(self, trip: Trip) -> Dict:
+    def calculate_route(self, trip: Trip, plan: TripPlan = None) -> Dict:
         """Calculate route with stops and breaks"""
-        # Get coordinates for locations
-        current_coords = self.get_coordinates(trip.current_location)
-        pickup_coords = self.get_coordinates(trip.pickup_location)
-        dropoff_coords = self.get_coordinates(trip.dropoff_location)
-
-        # Calculate distance and duration (simplified calculation)
-        total_distance = self._calculate_distance(pickup_coords, dropoff_coords)
-        driving_duration = total_distance / 55  # Assuming 55 mph average speed
+        plan = plan or get_trip_plan(trip)
 
         # Update trip with calculated values
-        trip.total_distance = total_distance
-        trip.estimated_duration = driving_duration
+        previous_distance = trip.total_distance
+        trip.total_distance = plan.total_distance
+        trip.estimated_duration = plan.estimated_duration
         trip.save()
+        record_trip_distance(previous_distance, trip.total_distance)
 
         # Create route stops
-        stops = self._generate_route_stops(trip, current_coords, pickup_coords, dropoff_coords, total_distance, driving_duration)
+        stops = self._generate_route_stops(trip, plan)
 
         return {
-            'total_distance': total_distance,
-            'estimated_duration': driving_duration,
+            'total_distance': plan.total_distance,
+            'estimated_duration': plan.estimated_duration,
             'stops': stops,
-            'route_geometry': self._generate_route_geometry(current_coords, pickup_coords, dropoff_coords)
+            'route_geometry': [list(point) for point in plan.route_geometry]
         }
 
     def _calculate_distance(self, coord1: Tuple[float, float], coord2: Tuple[float, float]) -> float:
-        """Calculate distance between two coordinates (simplified)"""
-        import math
-
-        lat1, lon1 = coord1
-        lat2, lon2 = coord2
-
-        # Haversine formula
-        R = 3959  # Earth's radius in miles
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = R * c
-
-        return distance
-
-    def _generate_route_stops(self, trip: Trip, current_coords, pickup_coords, dropoff_coords, total_distance, driving_duration) -> List[Dict]:
-        """Generate required stops based on HOS regulations"""
-        stops = []
-        current_time = datetime.now()
-        order = 0
-
-        # Pickup stop
-        stops.append({
-            'trip': trip,
-            'stop_type': 'pickup',
-            'location': trip.pickup_location,
-            'latitude': pickup_coords[0],
-            'longitude': pickup_coords[1],
-            'estimated_arrival': current_time + timedelta(hours=1),  # 1 hour to get to pickup
-            'duration_minutes': 60,  # 1 hour for pickup
-            'order': order
-        })
-        order += 1
-
-        # Calculate mandatory breaks and fuel stops
-        current_time = current_time + timedelta(hours=2)  # After pickup
-        distance_covered = 0
-
-        # Add fuel stops every 1000 miles
-        fuel_intervals = int(total_distance / 1000)
-        for i in range(fuel_intervals):
-            distance_covered += 1000
-            fuel_time = current_time + timedelta(hours=(distance_covered / 55))
+        """Calculate great-circle distance between two coordinates in miles"""
+        return haversine_miles(coord1, coord2)
 
-            stops.append({
-                'trip': trip,
-                'stop_type': 'fuel_stop',
-                'location': f"Fuel Stop {i+1}",
-                'latitude': pickup_coords[0] + (dropoff_coords[0] - pickup_coords[0]) * (distance_covered / total_distance),
-                'longitude': pickup_coords[1] + (dropoff_coords[1] - pickup_coords[1]) * (distance_covered / total_distance),
-                'estimated_arrival': fuel_time,
-                'duration_minutes': 30,
-                'order': order
-            })
-            order += 1
-
-        # Add mandatory rest breaks based on HOS regulations
-        if driving_duration > 8:  # Need mandatory 30-min break after 8 hours
-            break_time = current_time + timedelta(hours=8)
-            stops.append({
-                'trip': trip,
-                'stop_type': 'mandatory_break',
-                'location': "Mandatory Rest Break",
-                'latitude': pickup_coords[0] + (dropoff_coords[0] - pickup_coords[0]) * 0.6,
-                'longitude': pickup_coords[1] + (dropoff_coords[1] - pickup_coords[1]) * 0.6,
-                'estimated_arrival': break_time,
-                'duration_minutes': 30,
-                'order': order
-            })
-            order += 1
-
-        # Dropoff stop
-        final_arrival = current_time + timedelta(hours=driving_duration + 1)  # Include breaks
-        stops.append({
-            'trip': trip,
-            'stop_type': 'dropoff',
-            'location': trip.dropoff_location,
-            'latitude': dropoff_coords[0],
-            'longitude': dropoff_coords[1],
-            'estimated_arrival': final_arrival,
-            'duration_minutes': 60,  # 1 hour for dropoff
-            'order': order
-        })
+    def _generate_route_stops(self, trip: Trip, plan: TripPlan) -> List[Dict]:
+        """Create the trip's RouteStop rows from the planned stop layout"""
+        start = now_minutes()
 
         # Create RouteStop objects and return serializable data
         created_stops = []
-        for stop_data in stops:
-            route_stop = RouteStop.objects.create(**stop_data)
+        for order, stop_plan in enumerate(plan.stops):
+            arrival = start + stop_plan['arrival_offset_minutes']
+            route_stop = RouteStop.objects.create(
+                trip=trip,
+                stop_type=stop_plan['stop_type'],
+                location=_format_location(stop_plan['location'], trip),
+                latitude=stop_plan['latitude'],
+                longitude=stop_plan['longitude'],
+                estimated_arrival=to_datetime(arrival),
+                duration_minutes=stop_plan['duration_minutes'],
+                order=order
+            )
             created_stops.append({
                 'id': route_stop.id,
-                'trip_id': str(route_stop.trip.id),
+                'trip_id': str(trip.id),
                 'stop_type': route_stop.stop_type,
                 'location': route_stop.location,
                 'latitude': route_stop.latitude,
                 'longitude': route_stop.longitude,
-                'estimated_arrival': route_stop.estimated_arrival.isoformat(),
+                'estimated_arrival': to_iso(arrival),
                 'duration_minutes': route_stop.duration_minutes,
                 'order': route_stop.order
             })
 
+        publish_on_commit(trip.id, STOPS_ADDED, created_stops)
         return created_stops
 
     def _generate_route_geometry(self, current_coords, pickup_coords, dropoff_coords) -> List[List[float]]:
@@ -191,294 +302,243 @@ class RouteService:
 class HOSService:
     """Service for Hours of Service calculations and compliance"""
 
-    def calculate_hos_compliance(self, trip: Trip) -> Dict:
+    def __init__(self, rule_set: str = None):
+        self.rule_engine = get_rule_engine(rule_set)
+
+    def calculate_hos_compliance(self, trip: Trip, plan: TripPlan = None) -> Dict:
         """Calculate HOS compliance and generate ELD logs"""
-        violations = []
+        plan = plan or get_trip_plan(trip)
         eld_logs = []
 
-        # Check current cycle hours
-        if trip.current_cycle_hours >= 70:
-            violations.append({
-                'trip': trip,
-                'violation_type': 'cycle_limit',
-                'description': 'Driver has reached 70-hour limit for 8-day cycle',
-                'severity': 'violation'
-            })
-        elif trip.current_cycle_hours >= 60:
-            violations.append({
-                'trip': trip,
-                'violation_type': 'cycle_limit',
-                'description': 'Driver approaching 70-hour limit for 8-day cycle',
-                'severity': 'warning'
-            })
+        # Logs start at 8 AM on today's date in the driver's home-terminal time zone
+        zone = get_zone(trip.driver.home_terminal_timezone if trip.driver_id else None)
+        day_start = local_day_start(now_minutes(), zone, hour=8)
+        last = plan.eld_logs[-1]
+        clock = LocalClock(zone, day_start, day_start + last['start_offset_minutes'] + last['duration_minutes'])
+        window_start = local_date(clock.local(day_start))
 
-        # Generate ELD logs based on trip
-        self._generate_eld_logs(trip, eld_logs)
-
-        # Check for violations in generated logs
-        self._check_daily_violations(eld_logs, violations, trip)
-
-        # Create violation records and prepare serializable response
-        created_violations = []
-        for violation_data in violations:
-            violation = HOSViolation.objects.create(**violation_data)
-            created_violations.append({
-                'id': violation.id,
-                'trip_id': str(violation.trip.id),
-                'violation_type': violation.violation_type,
-                'description': violation.description,
-                'severity': violation.severity,
-                'created_at': violation.created_at.isoformat()
-            })
+        # Generate ELD logs from the planned skeleton
+        self._generate_eld_logs(trip, eld_logs, plan, day_start, clock)
+
+        publish_on_commit(trip.id, LOG_SEGMENTS_ADDED, eld_logs)
+
+        # One rule-engine pass over the planned duty timeline, on top of the cycle hours already used
+        violations = self.check_violations(plan, trip.current_cycle_hours)
+        stored_violations = self._store_violations(trip, window_start, violations)
+        publish_on_commit(trip.id, VIOLATIONS_ADDED, stored_violations)
 
         return {
-            'violations': created_violations,
+            'violations': stored_violations,
             'eld_logs': eld_logs,
-            'remaining_hours': 70 - trip.current_cycle_hours,
-            'can_complete_trip': len([v for v in created_violations if v['severity'] == 'violation']) == 0
+            'remaining_hours': self.remaining_cycle_hours(trip.current_cycle_hours),
+            'can_complete_trip': trip.compliance_status == 'compliant'
         }
 
-    def _generate_eld_logs(self, trip: Trip, eld_logs: List[Dict]):
-        """Generate clean, simple ELD log entries"""
-        current_date = datetime.now().date()
-        current_time = datetime.combine(current_date, time(8, 0))  # Start at 8 AM
-        total_distance = trip.total_distance or 1000
-        total_driving_hours = min(11, total_distance / 55)
-
-        # 1. Pre-trip inspection (30 minutes)
-        end_time = current_time + timedelta(minutes=30)
-        eld_logs.append({
-            'trip': trip,
-            'date': current_date,
-            'start_time': current_time.time(),
-            'end_time': end_time.time(),
-            'duty_status': 'on_duty_not_driving',
-            'location': trip.current_location,
-            'vehicle_miles': 0,
-            'total_hours': 0.5,
-            'driving_time': 0,
-            'on_duty_time': 0.5
-        })
-        current_time = end_time
-
-        # 2. Travel to pickup (1 hour)
-        end_time = current_time + timedelta(hours=1)
-        eld_logs.append({
-            'trip': trip,
-            'date': current_date,
-            'start_time': current_time.time(),
-            'end_time': end_time.time(),
-            'duty_status': 'driving',
-            'location': f"En route to {trip.pickup_location}",
-            'vehicle_miles': 50,
-            'total_hours': 1.0,
-            'driving_time': 1.0,
-            'on_duty_time': 1.0
-        })
-        current_time = end_time
-
-        # 3. Pickup (1 hour)
-        end_time = current_time + timedelta(hours=1)
-        eld_logs.append({
-            'trip': trip,
-            'date': current_date,
-            'start_time': current_time.time(),
-            'end_time': end_time.time(),
-            'duty_status': 'on_duty_not_driving',
-            'location': trip.pickup_location,
-            'vehicle_miles': 0,
-            'total_hours': 1.0,
-            'driving_time': 0,
-            'on_duty_time': 1.0
-        })
-        current_time = end_time
-
-        # 4. Main driving leg (8-10 hours, broken up by fuel stops and breaks)
-        # For long trips, we'll add fuel stops and mandatory breaks
-        if total_distance > 1000:
-            # First driving segment (4 hours to Fuel Stop 1)
-            end_time = current_time + timedelta(hours=4)
-            eld_logs.append({
-                'trip': trip,
-                'date': current_date,
-                'start_time': current_time.time(),
-                'end_time': end_time.time(),
-                'duty_status': 'driving',
-                'location': "En route to Fuel Stop 1",
-                'vehicle_miles': 220,  # 4 hours * 55 mph
-                'total_hours': 4.0,
-                'driving_time': 4.0,
-                'on_duty_time': 4.0
+    def _store_violations(self, trip: Trip, window_start, violations: List[Dict]) -> List[Dict]:
+        """Upsert the window's violations and roll the trip's compliance status up in one transaction
+
+        Rows are keyed by (trip, type, window), so recalculating replaces
+        rather than duplicates them; the trip's violations no longer found,
+        in this window or any earlier one, are resolved.
+        """
+        compliance_status = 'violation' if any(v['severity'] == 'violation' for v in violations) else 'compliant'
+        found = [v['violation_type'] for v in violations]
+        with transaction.atomic():
+            previous = list(HOSViolation.objects.filter(trip=trip).values_list('violation_type', 'severity'))
+            HOSViolation.objects.bulk_create(
+                [HOSViolation(trip=trip, window_start=window_start, **violation) for violation in violations],
+                update_conflicts=True,
+                unique_fields=['trip', 'violation_type', 'window_start'],
+                update_fields=['description', 'severity'],
+            )
+            HOSViolation.objects.filter(trip=trip).exclude(window_start=window_start, violation_type__in=found).delete()
+            # Re-read: an upsert that updated a row returns neither its id nor its original created_at
+            stored = sorted(
+                HOSViolation.objects.filter(trip=trip, window_start=window_start),
+                key=lambda violation: found.index(violation.violation_type)
+            )
+            Trip.objects.filter(pk=trip.pk).update(compliance_status=compliance_status)
+            record_violation_changes(previous, [(v['violation_type'], v['severity']) for v in violations])
+        trip.compliance_status = compliance_status
+
+        return [{
+            'id': violation.id,
+            'trip_id': str(trip.id),
+            'violation_type': violation.violation_type,
+            'description': violation.description,
+            'severity': violation.severity,
+            'window_start': window_start.isoformat(),
+            'created_at': violation.created_at.isoformat()
+        } for violation in stored]
+
+    def check_violations(self, plan: TripPlan, current_cycle_hours: float) -> List[Dict]:
+        """Evaluate the HOS rule set over the plan's duty timeline"""
+        return self.rule_engine.evaluate(plan.duty_timeline, current_cycle_hours)
+
+    def remaining_cycle_hours(self, current_cycle_hours: float) -> float:
+        return self.rule_engine.cycle_limit - current_cycle_hours
+
+    def _plan_itinerary(self, loaded_route: Sequence[Tuple[float, float]]) -> Tuple[List[Dict], List[Dict]]:
+        """Lay out the stops and log segments of a lane as minute offsets from the 8 AM start
+
+        Driving from pickup to dropoff follows the rule set's limits: it stops
+        at the placement engine's fuel stops, takes a 30-minute break before
+        driving since the last break reaches the break limit, and a 10-hour
+        sleeper-berth rest before the shift's driving or duty-window limit.
+        Breaks and rests are placed at real rest areas and truck stops, at
+        least a minute's drive past the stop the truck is at. A leg that
+        rounds to under a minute gets no driving segment; its miles go to
+        the stop it leads to.
+        """
+        limits = {metric: round(limit * 60) for metric, limit in self.rule_engine.limits.items()}
+        route = Polyline(loaded_route)
+        engine = StopPlacementEngine(get_truck_stop_index())
+        fuel_stops = deque(engine.place(loaded_route))
+        stops, segments = [], []
+        # Whole minutes throughout, so legs planned up to a limit never round past it
+        offset = shift_driving = window = since_break = 0
+
+        def add(duty_status, location, minutes, vehicle_miles=0):
+            nonlocal offset, shift_driving, window, since_break
+            hours = minutes / 60
+            segments.append({
+                'start_offset_minutes': offset,
+                'duration_minutes': minutes,
+                'duty_status': duty_status,
+                'location': location,
+                'vehicle_miles': vehicle_miles,
+                'total_hours': hours,
+                'driving_time': hours if duty_status == 'driving' else 0,
+                'on_duty_time': hours if duty_status in ('driving', 'on_duty_not_driving') else 0
             })
-            current_time = end_time
-
-            # Fuel Stop 1 (30 minutes)
-            end_time = current_time + timedelta(minutes=30)
-            eld_logs.append({
-                'trip': trip,
-                'date': current_date,
-                'start_time': current_time.time(),
-                'end_time': end_time.time(),
-                'duty_status': 'on_duty_not_driving',
-                'location': "Fuel Stop 1",
-                'vehicle_miles': 0,
-                'total_hours': 0.5,
-                'driving_time': 0,
-                'on_duty_time': 0.5
-            })
-            current_time = end_time
-
-            # Second driving segment (4 hours to Fuel Stop 2)
-            end_time = current_time + timedelta(hours=4)
-            eld_logs.append({
-                'trip': trip,
-                'date': current_date,
-                'start_time': current_time.time(),
-                'end_time': end_time.time(),
-                'duty_status': 'driving',
-                'location': "En route to Fuel Stop 2",
-                'vehicle_miles': 220,
-                'total_hours': 4.0,
-                'driving_time': 4.0,
-                'on_duty_time': 4.0
-            })
-            current_time = end_time
-
-            # Fuel Stop 2 (30 minutes)
-            end_time = current_time + timedelta(minutes=30)
-            eld_logs.append({
-                'trip': trip,
-                'date': current_date,
-                'start_time': current_time.time(),
-                'end_time': end_time.time(),
-                'duty_status': 'on_duty_not_driving',
-                'location': "Fuel Stop 2",
-                'vehicle_miles': 0,
-                'total_hours': 0.5,
-                'driving_time': 0,
-                'on_duty_time': 0.5
+            offset += minutes
+
+            if duty_status == 'driving':
+                shift_driving += minutes
+                since_break += minutes
+            elif minutes >= BREAK_HOURS * 60:
+                since_break = 0
+            if duty_status in REST_STATUSES and minutes >= SHIFT_RESET_HOURS * 60:
+                shift_driving = window = 0
+            else:
+                window += minutes
+
+        def add_stop(stop_type, location, coords, duration_minutes):
+            stops.append({
+                'stop_type': stop_type,
+                'location': location,
+                'latitude': coords[0],
+                'longitude': coords[1],
+                'arrival_offset_minutes': offset,
+                'duration_minutes': duration_minutes,
             })
-            current_time = end_time
 
-            # Mandatory break (30 minutes sleeper berth)
-            if total_driving_hours > 8:
-                end_time = current_time + timedelta(minutes=30)
+        # Pre-trip inspection, travel to pickup and loading
+        add('on_duty_not_driving', '{current}', 30)
+        add('driving', 'En route to {pickup}', 60, 50)
+        add_stop('pickup', '{pickup}', loaded_route[0], 60)
+        add('on_duty_not_driving', '{pickup}', 60)
+
+        mile = 0.0
+        here = None
+        folded_miles = 0
+        while route.length - mile > 0.01:
+            shift_minutes = min(limits[SHIFT_DRIVING] - shift_driving, limits[DUTY_WINDOW] - window)
+            break_minutes = limits[DRIVING_SINCE_BREAK] - since_break
+            allowed = min(shift_minutes, break_minutes)
+            reach = mile + allowed / 60 * AVERAGE_SPEED_MPH
+            if fuel_stops and fuel_stops[0].route_mile <= min(reach, route.length):
+                stop, duty_status, minutes = fuel_stops.popleft(), 'on_duty_not_driving', 30
+            elif reach >= route.length:
+                stop = None
+            elif break_minutes < shift_minutes:
+                stop = engine.place_rest(route, mile + MIN_LEG_MILES, reach, 'mandatory_break', 'Mandatory Rest Break',
+                                         here)
+                duty_status, minutes = 'off_duty', round(BREAK_HOURS * 60)
+            else:
+                stop = engine.place_rest(route, mile + MIN_LEG_MILES, reach, 'rest_stop', '10-Hour Rest', here)
+                duty_status, minutes = 'sleeper_berth', SHIFT_RESET_HOURS * 60
+
+            target = stop.route_mile if stop else route.length
+            # Escape braces so real stop names survive location formatting
+            location = stop.location.replace('{', '{{').replace('}', '}}') if stop else '{dropoff}'
+            driving = min(allowed, round(max(target - mile, 0) / AVERAGE_SPEED_MPH * 60))
+            leg_miles = round(max(target - mile, 0))
+            if driving > 0:
+                add('driving', f'En route to {location}', driving, leg_miles)
+                leg_miles = 0
+            mile = max(mile, target)
+            if stop:
+                here = (stop.latitude, stop.longitude)
+                add_stop(stop.stop_type, location, here, minutes)
+                add(duty_status, location, minutes, leg_miles)
+            else:
+                folded_miles = leg_miles
+
+        add_stop('dropoff', '{dropoff}', loaded_route[-1], 60)
+        add('on_duty_not_driving', '{dropoff}', 60, folded_miles)
+        return stops, segments
+
+    def _generate_eld_logs(self, trip: Trip, eld_logs: List[Dict], plan: TripPlan, day_start: int,
+                           clock: LocalClock):
+        """Create the trip's ELDLog rows from the planned log skeleton
+
+        Segment bounds stay integer minutes until they are split into the
+        home-terminal date and times the rows and response carry; a segment
+        running past local midnight becomes one row per log date.
+        """
+        trip_id = str(trip.id)
+        miles_by_date = {}
+        for segment in plan.eld_logs:
+            start = clock.local(day_start + segment['start_offset_minutes'])
+            pieces = _split_at_midnight(start, start + segment['duration_minutes'])
+            miles_left = segment['vehicle_miles']
+            for index, (start, end) in enumerate(pieces):
+                hours = (end - start) / 60 if len(pieces) > 1 else segment['total_hours']
+                miles = miles_left if index == len(pieces) - 1 else round(
+                    segment['vehicle_miles'] * (end - start) / segment['duration_minutes']
+                )
+                miles_left -= miles
+                log_date = local_date(start)
+                eld_log = ELDLog.objects.create(
+                    trip=trip,
+                    driver_id=trip.driver_id,
+                    date=log_date,
+                    start_time=local_time(start),
+                    end_time=local_time(end),
+                    duty_status=segment['duty_status'],
+                    location=_format_location(segment['location'], trip),
+                    vehicle_miles=miles,
+                    total_hours=hours,
+                    driving_time=hours if segment['driving_time'] else 0,
+                    on_duty_time=hours if segment['on_duty_time'] else 0
+                )
+                miles_by_date[log_date] = miles_by_date.get(log_date, 0) + eld_log.vehicle_miles
                 eld_logs.append({
-                    'trip': trip,
-                    'date': current_date,
-                    'start_time': current_time.time(),
-                    'end_time': end_time.time(),
-                    'duty_status': 'sleeper_berth',
-                    'location': "Mandatory Rest Break",
-                    'vehicle_miles': 0,
-                    'total_hours': 0.5,
-                    'driving_time': 0,
-                    'on_duty_time': 0
+                    'id': eld_log.id,
+                    'trip_id': trip_id,
+                    'date': log_date.isoformat(),
+                    'start_time': clock_string(start),
+                    'end_time': clock_string(end),
+                    'duty_status': eld_log.duty_status,
+                    'location': eld_log.location,
+                    'vehicle_miles': eld_log.vehicle_miles,
+                    'total_hours': eld_log.total_hours,
+                    'driving_time': eld_log.driving_time,
+                    'on_duty_time': eld_log.on_duty_time
                 })
-                current_time = end_time
-
-            # Final driving segment to dropoff
-            remaining_hours = max(1, total_driving_hours - 8)  # At least 1 hour
-            end_time = current_time + timedelta(hours=remaining_hours)
-            eld_logs.append({
-                'trip': trip,
-                'date': current_date,
-                'start_time': current_time.time(),
-                'end_time': end_time.time(),
-                'duty_status': 'driving',
-                'location': f"En route to {trip.dropoff_location}",
-                'vehicle_miles': int(remaining_hours * 55),
-                'total_hours': remaining_hours,
-                'driving_time': remaining_hours,
-                'on_duty_time': remaining_hours
-            })
-            current_time = end_time
-        else:
-            # Short trip - single driving segment
-            end_time = current_time + timedelta(hours=total_driving_hours)
-            eld_logs.append({
-                'trip': trip,
-                'date': current_date,
-                'start_time': current_time.time(),
-                'end_time': end_time.time(),
-                'duty_status': 'driving',
-                'location': f"En route to {trip.dropoff_location}",
-                'vehicle_miles': int(total_distance),
-                'total_hours': total_driving_hours,
-                'driving_time': total_driving_hours,
-                'on_duty_time': total_driving_hours
-            })
-            current_time = end_time
-
-        # 5. Dropoff (1 hour)
-        end_time = current_time + timedelta(hours=1)
-        eld_logs.append({
-            'trip': trip,
-            'date': current_date,
-            'start_time': current_time.time(),
-            'end_time': end_time.time(),
-            'duty_status': 'on_duty_not_driving',
-            'location': trip.dropoff_location,
-            'vehicle_miles': 0,
-            'total_hours': 1.0,
-            'driving_time': 0,
-            'on_duty_time': 1.0
-        })
-        current_time = end_time
-
-        # Create ELD log records and update eld_logs with serializable data
-        temp_logs = eld_logs.copy()  # Keep the original data for database creation
-        eld_logs.clear()  # Clear to rebuild with serializable data
-
-        for log_data in temp_logs:
-            eld_log = ELDLog.objects.create(**log_data)
-            eld_logs.append({
-                'id': eld_log.id,
-                'trip_id': str(eld_log.trip.id),
-                'date': eld_log.date.isoformat(),
-                'start_time': eld_log.start_time.strftime('%H:%M:%S'),
-                'end_time': eld_log.end_time.strftime('%H:%M:%S'),
-                'duty_status': eld_log.duty_status,
-                'location': eld_log.location,
-                'vehicle_miles': eld_log.vehicle_miles,
-                'total_hours': eld_log.total_hours,
-                'driving_time': eld_log.driving_time,
-                'on_duty_time': eld_log.on_duty_time
-            })
 
-    def _check_daily_violations(self, eld_logs: List[Dict], violations: List[Dict], trip: Trip):
-        """Check for daily HOS violations"""
-        total_driving = sum(log['driving_time'] for log in eld_logs)
-        total_on_duty = sum(log['on_duty_time'] for log in eld_logs)
-
-        # 11-hour driving rule
-        if total_driving > 11:
-            violations.append({
-                'trip': trip,
-                'violation_type': 'daily_driving',
-                'description': f'Daily driving time ({total_driving:.1f} hours) exceeds 11-hour limit',
-                'severity': 'violation'
-            })
-        elif total_driving > 10:
-            violations.append({
-                'trip': trip,
-                'violation_type': 'daily_driving',
-                'description': f'Daily driving time ({total_driving:.1f} hours) approaching 11-hour limit',
-                'severity': 'warning'
-            })
+        record_log_miles(miles_by_date)
+        refresh_driver_cycle([trip.driver_id])
 
-        # 14-hour duty rule
-        if total_on_duty > 14:
-            violations.append({
-                'trip': trip,
-                'violation_type': 'daily_duty',
-                'description': f'Daily on-duty time ({total_on_duty:.1f} hours) exceeds 14-hour limit',
-                'severity': 'violation'
-            })
-        elif total_on_duty > 12:
-            violations.append({
-                'trip': trip,
-                'violation_type': 'daily_duty',
-                'description': f'Daily on-duty time ({total_on_duty:.1f} hours) approaching 14-hour limit',
-                'severity': 'warning'
-            })
+
+@lru_cache(maxsize=None)
+def get_route_service() -> RouteService:
+    """Process-wide RouteService; it holds no per-request state"""
+    return RouteService()
+
+
+@lru_cache(maxsize=None)
+def get_hos_service(rule_set: str = None) -> HOSService:
+    """Process-wide HOSService for a rule set (default: settings.HOS_RULE_SET)"""
+    return HOSService(rule_set)
@@ -0,0 +1,15 @@
+from eld_api.models import Driver, Trip
+
+
+def make_driver(**fields) -> Driver:
+    fields.setdefault('name', 'Test Driver')
+    fields.setdefault('license_number', f"TEST-{Driver.objects.count() + 1}")
+    return Driver.objects.create(**fields)
+
+
+def make_trip(**fields) -> Trip:
+    fields.setdefault('current_location', 'Chicago, IL')
+    fields.setdefault('pickup_location', 'Chicago, IL')
+    fields.setdefault('dropoff_location', 'Indianapolis, IN')
+    fields.setdefault('current_cycle_hours', 0)
+    return Trip.objects.create(**fields)
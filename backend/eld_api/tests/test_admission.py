@@ -0,0 +1,81 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from eld_api.admission import ConcurrencyLimiter, Overloaded, get_limiter
+
+SIMULATION = {'base': {'current_location': 'Chicago, IL', 'pickup_location': 'Chicago, IL',
+                       'dropoff_location': 'Dallas, TX', 'current_cycle_hours': 0},
+              'variants': [{}]}
+
+
+class ConcurrencyLimiterTests(SimpleTestCase):
+
+    def test_sheds_when_the_queue_is_full(self):
+        limiter = ConcurrencyLimiter('test', max_concurrent=1, max_queue=0, queue_timeout=1)
+        with limiter.slot():
+            with self.assertRaises(Overloaded):
+                with limiter.slot():
+                    pass
+        self.assertEqual((limiter.stats()['admitted'], limiter.stats()['shed_queue_full']), (1, 1))
+
+    def test_sheds_after_waiting_too_long(self):
+        limiter = ConcurrencyLimiter('test', max_concurrent=1, max_queue=1, queue_timeout=0.05)
+        with limiter.slot():
+            with self.assertRaises(Overloaded) as raised:
+                with limiter.slot():
+                    pass
+        self.assertEqual(raised.exception.wait, 1)
+        self.assertEqual(limiter.stats()['shed_timeout'], 1)
+
+    def test_queued_request_runs_once_a_slot_frees(self):
+        limiter = ConcurrencyLimiter('test', max_concurrent=1, max_queue=1, queue_timeout=5)
+        holding, ran = threading.Event(), []
+
+        def hold():
+            with limiter.slot():
+                holding.set()
+                while not limiter.queued:
+                    time.sleep(0.001)
+
+        worker = threading.Thread(target=hold)
+        worker.start()
+        holding.wait()
+        with limiter.slot():
+            ran.append(True)
+        worker.join()
+        stats = limiter.stats()
+        self.assertEqual((ran, stats['admitted'], stats['peak_queue_depth'], stats['active']), ([True], 2, 1, 0))
+
+
+@override_settings(
+    ELD_TOKEN_BUCKETS={'batch': {'CAPACITY': 2, 'REFILL_PER_SECOND': 0.01}},
+    ELD_ADMISSION_POOLS={'batch': {'MAX_CONCURRENT': 1, 'MAX_QUEUE': 0, 'QUEUE_TIMEOUT': 3}},
+)
+class AdmissionApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        get_limiter.cache_clear()
+        self.addCleanup(get_limiter.cache_clear)
+
+    def simulate(self):
+        return self.client.post('/api/trips/simulate/', SIMULATION, content_type='application/json')
+
+    def test_empty_bucket_answers_429(self):
+        self.assertEqual([self.simulate().status_code for _ in range(2)], [200, 200])
+        response = self.simulate()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 99)
+        self.assertGreaterEqual(self.client.get('/api/admission-stats/').json()['throttled']['batch'], 1)
+
+    def test_full_pool_answers_503(self):
+        with get_limiter('batch').slot():
+            response = self.simulate()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '3')
+        self.assertEqual(self.simulate().status_code, 200)
+        pool = self.client.get('/api/admission-stats/').json()['pools']['batch']
+        self.assertEqual((pool['shed_queue_full'], pool['admitted'], pool['active']), (1, 2, 0))
@@ -0,0 +1,24 @@
+import importlib
+import sys
+from unittest import mock
+
+from django.apps import apps
+from django.test import SimpleTestCase
+
+from eld_api.apps import _reference_loaders
+
+
+class ReferenceDataTests(SimpleTestCase):
+
+    def test_warmup_loads_services_without_freezing(self):
+        with mock.patch('gc.freeze') as freeze:
+            timings = apps.get_app_config('eld_api').warm_reference_data()
+        freeze.assert_not_called()
+        self.assertEqual(set(timings), set(_reference_loaders()))
+        self.assertNotIn('gazetteer', timings)
+
+    def test_wsgi_entry_point_freezes(self):
+        sys.modules.pop('config.wsgi', None)
+        with mock.patch('gc.freeze') as freeze:
+            importlib.import_module('config.wsgi')
+        freeze.assert_called_once_with()
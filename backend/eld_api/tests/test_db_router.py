@@ -0,0 +1,75 @@
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from eld_api.db_router import PRIMARY, STICKY_HEADER, ReplicaPinningMiddleware, ReplicaRouter, use_primary
+
+REPLICA_SETTINGS = {
+    'DATABASES': {**settings.DATABASES, 'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+    'ELD_DB_REPLICAS': ['replica'],
+}
+
+
+@override_settings(**REPLICA_SETTINGS)
+class ReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_replica_unless_pinned(self):
+        self.assertEqual(self.router.db_for_read(None), 'replica')
+        self.assertEqual(self.router.db_for_write(None), PRIMARY)
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(None), PRIMARY)
+
+    def test_migrations_skip_replicas(self):
+        self.assertIs(self.router.allow_migrate('replica', 'eld_api'), False)
+        self.assertIsNone(self.router.allow_migrate(PRIMARY, 'eld_api'))
+
+    @override_settings(ELD_DB_REPLICAS=[])
+    def test_no_replicas_configured(self):
+        self.assertEqual(self.router.db_for_read(None), PRIMARY)
+        self.assertIsNone(self.router.allow_migrate('replica', 'eld_api'))
+
+
+@override_settings(**REPLICA_SETTINGS)
+class ReplicaPinningMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.routed = []
+
+        def get_response(request):
+            self.routed.append(ReplicaRouter().db_for_read(None))
+            return HttpResponse(status=201 if request.method == 'POST' else 200)
+
+        self.middleware = ReplicaPinningMiddleware(get_response)
+
+    def test_write_pins_and_names_a_deadline(self):
+        before = time.time()
+        response = self.middleware(self.factory.post('/api/trips/'))
+        self.assertEqual(self.routed, [PRIMARY])
+        self.assertGreater(int(response[STICKY_HEADER]), before + 5)
+        self.assertFalse(response.cookies)
+
+    def test_echoed_deadline_pins_reads_until_it_passes(self):
+        self.middleware(self.factory.get('/api/trips/'))
+        self.middleware(self.factory.get('/api/trips/', HTTP_X_ELD_READ_PRIMARY_UNTIL=str(int(time.time()) + 5)))
+        self.middleware(self.factory.get('/api/trips/', HTTP_X_ELD_READ_PRIMARY_UNTIL=str(int(time.time()) - 1)))
+        self.middleware(self.factory.get('/api/trips/', HTTP_X_ELD_READ_PRIMARY_UNTIL='soon'))
+        self.assertEqual(self.routed, ['replica', PRIMARY, 'replica', 'replica'])
+
+
+class CorsTests(SimpleTestCase):
+
+    def test_stickiness_header_crosses_origins_without_credentials(self):
+        response = self.client.options('/api/trips/', HTTP_ORIGIN='https://eld.example.com',
+                                       HTTP_ACCESS_CONTROL_REQUEST_METHOD='GET',
+                                       HTTP_ACCESS_CONTROL_REQUEST_HEADERS='x-eld-read-primary-until')
+        self.assertIn('x-eld-read-primary-until', response['Access-Control-Allow-Headers'])
+        self.assertFalse(response.has_header('Access-Control-Allow-Credentials'))
+
+        response = self.client.get('/api/', HTTP_ORIGIN='https://eld.example.com')
+        self.assertIn(STICKY_HEADER, response['Access-Control-Expose-Headers'])
@@ -0,0 +1,88 @@
+import uuid
+
+from django.test import TestCase
+
+from eld_api.clock import from_datetime, to_datetime
+from eld_api.eta import record_position
+from eld_api.geo import haversine_miles
+from eld_api.models import RouteStop
+from eld_api.services import AVERAGE_SPEED_MPH
+
+from .factories import make_trip
+
+CHICAGO = (41.8781, -87.6298)
+INDIANAPOLIS = (39.7684, -86.1581)
+NASHVILLE = (36.1627, -86.7816)
+START = 29_000_000
+
+
+def drive(a, b) -> int:
+    return round(haversine_miles(a, b) / AVERAGE_SPEED_MPH * 60)
+
+
+class RecordPositionTests(TestCase):
+
+    def setUp(self):
+        self.trip = make_trip(dropoff_location='Nashville, TN')
+        fuel_eta = START + 60 + drive(CHICAGO, INDIANAPOLIS)
+        layout = [
+            ('pickup', CHICAGO, START, 60),
+            ('fuel_stop', INDIANAPOLIS, fuel_eta, 30),
+            ('dropoff', NASHVILLE, fuel_eta + 30 + drive(INDIANAPOLIS, NASHVILLE), 60),
+        ]
+        self.planned = [eta for _, _, eta, _ in layout]
+        for order, (stop_type, (lat, lon), eta, duration) in enumerate(layout):
+            RouteStop.objects.create(trip=self.trip, stop_type=stop_type, location=stop_type, latitude=lat,
+                                     longitude=lon, estimated_arrival=to_datetime(eta), duration_minutes=duration,
+                                     order=order)
+
+    def etas(self):
+        return [from_datetime(stop.estimated_arrival) for stop in RouteStop.objects.filter(trip=self.trip)]
+
+    def test_on_schedule_marks_the_stop_reached_only(self):
+        result = record_position(self.trip.id, CHICAGO, START)
+        self.assertEqual(result['delay_minutes'], 0)
+        self.assertEqual([stop['stop_type'] for stop in result['reached']], ['pickup'])
+        self.assertEqual(self.etas(), self.planned)
+
+        # Later pings while still loading are read-only
+        with self.assertNumQueries(1):
+            result = record_position(self.trip.id, CHICAGO, START + 20)
+        self.assertEqual((result['delay_minutes'], result['reached'], result['updated']), (0, [], []))
+
+    def test_late_arrival_shifts_every_pending_stop(self):
+        result = record_position(self.trip.id, CHICAGO, START + 45)
+        self.assertEqual(result['delay_minutes'], 45)
+        self.assertEqual([stop['stop_type'] for stop in result['updated']], ['fuel_stop', 'dropoff'])
+        self.assertEqual(self.etas(), [self.planned[0], self.planned[1] + 45, self.planned[2] + 45])
+
+    def test_small_delays_are_ignored(self):
+        result = record_position(self.trip.id, CHICAGO, START + 1)
+        self.assertEqual(result['delay_minutes'], 0)
+        self.assertEqual(self.etas(), self.planned)
+
+    def test_skipped_fuel_stop_counts_as_passed(self):
+        record_position(self.trip.id, CHICAGO, START)
+        position = (38.0, -86.5)
+        at = self.planned[1] + 60
+        result = record_position(self.trip.id, position, at)
+
+        self.assertEqual([stop['stop_type'] for stop in result['reached']], ['fuel_stop'])
+        expected = at + drive(position, NASHVILLE)
+        self.assertEqual(result['delay_minutes'], expected - self.planned[2])
+        self.assertEqual(self.etas(), [self.planned[0], self.planned[1], expected])
+        self.assertEqual(result['next_stop_id'], RouteStop.objects.get(trip=self.trip, stop_type='dropoff').id)
+
+    def test_position_endpoint(self):
+        response = self.client.post(f'/api/trips/{self.trip.id}/position/',
+                                    {'latitude': CHICAGO[0], 'longitude': CHICAGO[1],
+                                     'recorded_at': to_datetime(START + 45).isoformat()},
+                                    content_type='application/json')
+        self.assertEqual(response.json()['delay_minutes'], 45)
+
+        response = self.client.post(f'/api/trips/{uuid.uuid4()}/position/', {'latitude': 0, 'longitude': 0},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(f'/api/trips/{make_trip().id}/position/', {'latitude': 0, 'longitude': 0},
+                                    content_type='application/json')
+        self.assertEqual((response.status_code, response.json()['next_stop_id']), (200, None))
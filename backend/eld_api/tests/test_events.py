@@ -0,0 +1,111 @@
+import asyncio
+from unittest import mock
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from eld_api.events import InProcessBroker, get_broker, publish_on_commit
+from eld_api.models import RouteStop, Trip
+
+from .factories import make_trip
+
+
+class InProcessBrokerTests(TestCase):
+
+    def test_subscriber_receives_published_events(self):
+        broker = InProcessBroker()
+
+        async def receive():
+            subscription = broker.subscribe('trip-1')
+            broker.publish('trip-1', 'stops_added', [{'order': 1}])
+            return await subscription.get(timeout=1)
+
+        event = asyncio.run(receive())
+        self.assertEqual(event['event'], 'stops_added')
+        self.assertEqual(event['data'], [{'order': 1}])
+
+    def test_replays_events_after_last_event_id(self):
+        broker = InProcessBroker()
+        for order in range(3):
+            broker.publish('trip-1', 'stops_added', [{'order': order}])
+
+        async def receive():
+            subscription = broker.subscribe('trip-1', last_event_id=1)
+            return [await subscription.get(timeout=1), await subscription.get(timeout=0.01)]
+
+        first, second = asyncio.run(receive())
+        self.assertEqual([first['id'], second['id']], [2, 3])
+
+    def test_publish_after_subscriber_loop_closed(self):
+        broker = InProcessBroker()
+        loop = asyncio.new_event_loop()
+
+        async def subscribe():
+            return broker.subscribe('trip-1')
+
+        loop.run_until_complete(subscribe())
+        loop.close()
+
+        broker.publish('trip-1', 'stops_added', [{'order': 1}])
+        self.assertNotIn('trip-1', broker._subscribers)
+
+    def test_publish_on_commit_does_not_fail_the_write(self):
+        broker = mock.Mock()
+        broker.publish.side_effect = RuntimeError('Event loop is closed')
+        with mock.patch('eld_api.events.get_broker', return_value=broker), \
+                self.assertLogs('django.test', level='ERROR'), \
+                self.captureOnCommitCallbacks(execute=True) as callbacks:
+            publish_on_commit('trip-1', 'stops_added', [{'order': 1}])
+        self.assertEqual(len(callbacks), 1)
+        broker.publish.assert_called_once()
+
+
+class TripEventsViewTests(TestCase):
+
+    def test_wsgi_answers_not_implemented(self):
+        trip = make_trip()
+        response = self.client.get(f'/api/trips/{trip.id}/events/')
+        self.assertEqual(response.status_code, 501)
+
+    def test_position_ping_after_subscriber_loop_closed(self):
+        trip = make_trip()
+        RouteStop.objects.create(
+            trip=trip, stop_type='dropoff', location='Indianapolis, IN', latitude=39.77, longitude=-86.16,
+            estimated_arrival=timezone.now() - timedelta(days=1), duration_minutes=60, order=1,
+        )
+        broker = InProcessBroker()
+        loop = asyncio.new_event_loop()
+
+        async def subscribe():
+            return broker.subscribe(trip.id)
+
+        loop.run_until_complete(subscribe())
+        loop.close()
+
+        with mock.patch('eld_api.events.get_broker', return_value=broker), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/trips/{trip.id}/position/', {'latitude': 41.88, 'longitude': -87.63},
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['updated'])
+        self.assertNotIn(str(trip.id), broker._subscribers)
+
+    async def test_asgi_streams_events(self):
+        trip = await Trip.objects.acreate(
+            current_location='Chicago, IL', pickup_location='Chicago, IL',
+            dropoff_location='Indianapolis, IN', current_cycle_hours=0,
+        )
+        response = await self.async_client.get(f'/api/trips/{trip.id}/events/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b'retry: 3000\n\n')
+
+        get_broker().publish(trip.id, 'stops_added', [{'order': 1}])
+        event = await anext(chunks)
+        self.assertIn(b'event: stops_added\n', event)
+        self.assertIn(b'data: [{"order": 1}]\n\n', event)
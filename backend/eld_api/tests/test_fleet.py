@@ -0,0 +1,71 @@
+from datetime import time, timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from eld_api import fleet
+from eld_api.clock import today_in
+from eld_api.models import DriverCycleStat, ELDLog, Trip
+
+from .factories import make_driver, make_trip
+
+
+class FleetSummaryTests(TestCase):
+
+    def setUp(self):
+        # Token buckets live in the default cache
+        cache.clear()
+        self.today = today_in()
+        self.driver = make_driver()
+        self.idle = make_driver()
+        # 50 on-duty hours earlier in the cycle, logged outside the services
+        history = make_trip(driver=self.driver)
+        for days_ago in range(1, 6):
+            ELDLog.objects.create(trip=history, driver=self.driver, date=self.today - timedelta(days=days_ago),
+                                  start_time=time(6), end_time=time(16), duty_status='on_duty', location='Yard',
+                                  total_hours=10, on_duty_time=10)
+        fleet.rebuild()
+
+    def create_trip(self, **fields):
+        response = self.client.post('/api/trips/', {
+            'current_location': 'Chicago, IL', 'pickup_location': 'Chicago, IL', 'dropoff_location': 'Dallas, TX',
+            **fields,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def summary(self):
+        return self.client.get('/api/fleet/summary/', {'date': self.today.isoformat()}).json()
+
+    def test_incremental_totals_match_a_rebuild(self):
+        self.create_trip(driver=str(self.driver.id))
+        self.create_trip(current_cycle_hours=65, dropoff_location='Denver, CO')
+        incremental = self.summary()
+
+        call_command('refresh_fleet_summary', stdout=StringIO())
+        self.assertEqual(self.summary(), incremental)
+
+        routed = Trip.objects.filter(total_distance__isnull=False)
+        self.assertEqual(incremental['trips'], 2)
+        self.assertEqual(incremental['average_trip_distance'],
+                         round(routed.aggregate(total=Sum('total_distance'))['total'] / 2, 1))
+        miles_today = ELDLog.objects.filter(date=self.today).aggregate(miles=Sum('vehicle_miles'))['miles']
+        self.assertAlmostEqual(incremental['miles_today'], miles_today)
+        self.assertEqual(incremental['drivers_near_cycle_limit'], 1)
+        self.assertIn('cycle_limit', incremental['open_violations_by_type'])
+
+    def test_driver_cycle_stats_follow_new_logs(self):
+        self.assertFalse(DriverCycleStat.objects.get(driver=self.driver).near_limit)
+        self.create_trip(driver=str(self.driver.id))
+        stat = DriverCycleStat.objects.get(driver=self.driver)
+        self.assertTrue(stat.near_limit)
+        self.assertEqual(stat.cycle_hours, self.driver.cycle_hours())
+        self.assertEqual(DriverCycleStat.objects.get(driver=self.idle).cycle_hours, 0)
+
+    def test_summary_date_param(self):
+        response = self.client.get('/api/fleet/summary/', {'date': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/api/fleet/summary/', {'date': '2020-01-01'}).json()['miles_today'], 0)
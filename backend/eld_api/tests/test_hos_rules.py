@@ -0,0 +1,80 @@
+from django.test import SimpleTestCase
+
+from eld_api.hos_rules import get_rule_engine
+
+
+def timeline(*periods):
+    """DutyPeriods from consecutive (hours, status) pairs"""
+    clock, result = 0.0, []
+    for hours, status in periods:
+        result.append((clock, hours, status))
+        clock += hours
+    return result
+
+
+def severities(violations):
+    return {violation['violation_type']: violation['severity'] for violation in violations}
+
+
+class HOSRuleEngineTests(SimpleTestCase):
+
+    def test_break_rule(self):
+        engine = get_rule_engine('70_8')
+        found = severities(engine.evaluate(timeline((8.5, 'driving'))))
+        self.assertEqual(found['mandatory_break'], 'violation')
+
+        with_break = timeline((4, 'driving'), (0.5, 'off_duty'), (4.5, 'driving'))
+        self.assertNotIn('mandatory_break', severities(engine.evaluate(with_break)))
+
+        # Any 30 consecutive minutes off the wheel count, on duty included
+        fueling = timeline((4, 'driving'), (0.5, 'on_duty_not_driving'), (4.5, 'driving'))
+        self.assertNotIn('mandatory_break', severities(engine.evaluate(fueling)))
+
+    def test_limits_are_inclusive(self):
+        engine = get_rule_engine('70_8')
+        found = severities(engine.evaluate(timeline(
+            (8, 'driving'), (0.5, 'off_duty'), (3, 'driving'),
+        )))
+        self.assertEqual(found, {'daily_driving': 'warning', 'mandatory_break': 'warning'})
+
+    def test_cycle_rule_sets(self):
+        day = timeline((1, 'on_duty_not_driving'), (7, 'driving'))
+        self.assertEqual(severities(get_rule_engine('70_8').evaluate(day, 55))['cycle_limit'], 'warning')
+        self.assertEqual(severities(get_rule_engine('60_7').evaluate(day, 55))['cycle_limit'], 'violation')
+        self.assertEqual(get_rule_engine('60_7').cycle_window_hours, 7 * 24)
+        self.assertEqual(get_rule_engine('70_8').cycle_limit, 70)
+
+    def test_34_hour_restart_clears_cycle(self):
+        engine = get_rule_engine('70_8')
+        restarted = timeline((34, 'off_duty'), (1, 'on_duty_not_driving'), (7, 'driving'))
+        self.assertEqual(severities(engine.evaluate(restarted, 65)).get('cycle_limit'), 'warning')
+        self.assertEqual(engine.scan(restarted, 65)['cycle_on_duty'], 65)
+
+        short = timeline((33, 'off_duty'), (1, 'on_duty_not_driving'), (7, 'driving'))
+        self.assertEqual(severities(engine.evaluate(short, 65))['cycle_limit'], 'violation')
+
+    def test_cycle_window_drops_old_hours(self):
+        engine = get_rule_engine('70_8')
+        days = []
+        for _ in range(10):
+            days += [(8, 'driving'), (0.5, 'off_duty'), (2, 'driving'), (13.5, 'off_duty')]
+        # 10 hours a day: the rolling 8-day window peaks at 80, never the 100 logged
+        self.assertEqual(engine.scan(timeline(*days))['cycle_on_duty'], 80)
+
+    def test_split_sleeper_pairs_restart_the_shift(self):
+        engine = get_rule_engine('70_8')
+        split = timeline((5, 'driving'), (7, 'sleeper_berth'), (6, 'driving'), (3, 'off_duty'), (5, 'driving'))
+        self.assertEqual(engine.scan(split)['shift_driving'], 11)
+        self.assertEqual(severities(engine.evaluate(split))['daily_driving'], 'warning')
+
+        # 6 hours in the berth is not a qualifying split period
+        unpaired = timeline((5, 'driving'), (6, 'sleeper_berth'), (6, 'driving'), (3, 'off_duty'), (5, 'driving'))
+        self.assertEqual(severities(engine.evaluate(unpaired))['daily_driving'], 'violation')
+
+    def test_ten_hour_rest_resets_shift(self):
+        engine = get_rule_engine('70_8')
+        two_days = timeline((8, 'driving'), (0.5, 'off_duty'), (3, 'driving'), (10, 'sleeper_berth'),
+                            (8, 'driving'), (0.5, 'off_duty'), (3, 'driving'))
+        peaks = engine.scan(two_days)
+        self.assertEqual(peaks['shift_driving'], 11)
+        self.assertEqual(peaks['duty_window'], 11.5)
@@ -0,0 +1,107 @@
+import json
+import shutil
+import tempfile
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from eld_api.ingest import BulkLogIngestor, parse_json_array, parse_ndjson, validate_record
+from eld_api.models import ELDLog, FleetDailyStat
+from eld_api.partitions import LogPartitionManager
+
+from .factories import make_driver, make_trip
+
+
+class BulkIngestTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.driver = make_driver()
+        self.trip = make_trip(driver=self.driver)
+
+    def record(self, start_time, **fields):
+        return {
+            'trip': str(self.trip.id), 'date': '2026-10-19', 'start_time': start_time, 'end_time': '23:00',
+            'duty_status': 'driving', 'location': 'Joliet, IL', 'vehicle_miles': 50, **fields,
+        }
+
+    def post(self, body, content_type):
+        return self.client.post('/api/eld-logs/bulk/', body, content_type=content_type)
+
+    def test_replayed_ndjson_records_are_duplicates(self):
+        body = '\n'.join(json.dumps(self.record(f'{hour:02d}:00')) for hour in range(6, 9))
+        first = self.post(body, 'application/x-ndjson').json()
+        self.assertEqual((first['inserted'], first['duplicates']), (3, 0))
+
+        replay = self.post(body + '\n' + json.dumps(self.record('10:00')), 'application/x-ndjson').json()
+        self.assertEqual((replay['inserted'], replay['duplicates']), (1, 3))
+        self.assertEqual(ELDLog.objects.filter(trip=self.trip).count(), 4)
+        self.assertEqual(FleetDailyStat.objects.get().vehicle_miles, 200)
+        self.assertTrue(all(log.driver_id == self.driver.id for log in ELDLog.objects.all()))
+
+    def test_json_array_body(self):
+        body = json.dumps([self.record('06:00'), self.record('07:00'), {'trip': 'nope'}])
+        result = self.post(body, 'application/json').json()
+        self.assertEqual((result['inserted'], result['rejected']), (2, 1))
+        self.assertEqual(result['errors'][0]['line'], 3)
+
+        result = self.post(json.dumps(self.record('08:00')), 'application/json')
+        self.assertEqual(result.status_code, 400)
+
+    def test_csv_with_empty_location(self):
+        body = (
+            'trip,date,start_time,end_time,duty_status,location\n'
+            f'{self.trip.id},2026-10-19,06:00,07:00,on_duty_not_driving,\n'
+        )
+        result = self.post(body, 'text/csv').json()
+        self.assertEqual(result['inserted'], 1)
+        self.assertEqual(ELDLog.objects.get().location, '')
+
+    def test_insert_counts_only_rows_actually_stored(self):
+        ingestor = BulkLogIngestor()
+        row = validate_record(self.record('06:00'))
+        row = (row[0], self.driver.id) + row[2:]
+        self.assertEqual(ingestor._insert_many([row]), {(row[-1], row[2])})
+        # A concurrent upload got there first: ON CONFLICT skips it and it is not reported
+        self.assertEqual(ingestor._insert_many([row]), set())
+        self.assertEqual(ELDLog.objects.count(), 1)
+
+    def test_parsers_report_invalid_input(self):
+        self.assertEqual(str(next(parse_ndjson([b'{oops']))[1]), 'Invalid JSON')
+        self.assertEqual(str(next(parse_json_array([b'{"a": 1}']))[1]), 'Expected a JSON array of records')
+
+
+class ReplayAfterRotationTests(TestCase):
+
+    def setUp(self):
+        # Token buckets live in the default cache
+        cache.clear()
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+        settings_override = override_settings(ELD_LOG_ARCHIVE_DIR=archive_dir, ELD_LOG_RETENTION_MONTHS=3)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.trip = make_trip()
+        self.manager = LogPartitionManager()
+
+    def ingest(self, *log_dates):
+        body = '\n'.join(json.dumps({
+            'trip': str(self.trip.id), 'date': log_date, 'start_time': '06:00', 'end_time': '08:00',
+            'duty_status': 'driving', 'location': 'Joliet, IL', 'idempotency_key': 'k1',
+        }) for log_date in log_dates)
+        return self.client.post('/api/eld-logs/bulk/', body, content_type='application/x-ndjson').json()
+
+    def test_keys_in_cold_and_archived_months_are_duplicates(self):
+        self.assertEqual(self.ingest('2026-05-04', '2026-08-10')['inserted'], 2)
+        self.manager.rotate(date(2026, 10, 19))
+        self.assertEqual(self.manager.partitions(), [date(2026, 5, 1), date(2026, 8, 1)])
+
+        result = self.ingest('2026-05-04', '2026-08-10')
+        self.assertEqual((result['inserted'], result['duplicates']), (0, 2))
+
+        self.manager.archive(date(2026, 10, 19))
+        self.assertEqual(self.manager.archives(), [date(2026, 5, 1)])
+        result = self.ingest('2026-05-04', '2026-08-10', '2026-08-11')
+        self.assertEqual((result['inserted'], result['duplicates']), (1, 2))
+        self.assertEqual(len(self.manager.query(trip_id=self.trip.id)), 3)
@@ -0,0 +1,56 @@
+from datetime import date, datetime, time, timezone as dt_timezone
+from unittest import mock
+
+from django.test import TestCase
+
+from eld_api import fleet
+from eld_api.clock import today_in
+from eld_api.models import DriverCycleStat, ELDLog
+
+from .factories import make_driver, make_trip
+
+# 20:00 UTC on 2026-10-19 is already 2026-10-20 in Kiritimati (UTC+14)
+NOW = datetime(2026, 10, 19, 20, 0, tzinfo=dt_timezone.utc)
+
+
+@mock.patch('django.utils.timezone.now', return_value=NOW)
+class HomeTerminalDateTests(TestCase):
+
+    def setUp(self):
+        self.east = make_driver(home_terminal_timezone='Pacific/Kiritimati')
+        self.west = make_driver(home_terminal_timezone='Pacific/Pago_Pago')
+        trip = make_trip()
+        for driver, log_date, hours in ((self.east, date(2026, 10, 20), 4), (self.east, date(2026, 10, 12), 5),
+                                        (self.west, date(2026, 10, 19), 3), (self.west, date(2026, 10, 11), 6)):
+            ELDLog.objects.create(trip=trip, driver=driver, date=log_date, start_time=time(8), end_time=time(8 + hours),
+                                  duty_status='driving', location='Somewhere', total_hours=hours,
+                                  driving_time=hours, on_duty_time=hours)
+
+    def test_today_in_zone(self, _now):
+        self.assertEqual(today_in('Pacific/Kiritimati'), date(2026, 10, 20))
+        self.assertEqual(today_in('Pacific/Pago_Pago'), date(2026, 10, 19))
+        self.assertEqual(today_in(), date(2026, 10, 19))
+
+    def test_driver_cycle_hours_use_home_terminal_date(self, _now):
+        # Kiritimati's window is Oct 13-20; a UTC window (Oct 12-19) would count the wrong log
+        self.assertEqual(self.east.cycle_hours(), 4)
+        self.assertEqual(self.west.cycle_hours(), 3)
+        self.assertEqual(self.east.cycle_hours(date(2026, 10, 19)), 5)
+
+    def test_fleet_cycle_hours_per_driver_date(self, _now):
+        self.assertEqual(fleet.cycle_hours_by_driver(), {self.east.id: 4, self.west.id: 3})
+        fleet.refresh_driver_cycle([self.east.id, str(self.west.id)])
+        stats = dict(DriverCycleStat.objects.values_list('driver_id', 'cycle_hours'))
+        self.assertEqual(stats, {self.east.id: 4, self.west.id: 3})
+
+        fleet.rebuild()
+        stats = dict(DriverCycleStat.objects.values_list('driver_id', 'cycle_hours'))
+        self.assertEqual(stats, {self.east.id: 4, self.west.id: 3})
+
+    def test_trip_defaults_cycle_hours_from_driver(self, _now):
+        response = self.client.post('/api/trips/', {
+            'driver': str(self.east.id), 'current_location': 'Chicago, IL', 'pickup_location': 'Chicago, IL',
+            'dropoff_location': 'Nashville, TN',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['trip']['current_cycle_hours'], 4)
@@ -0,0 +1,70 @@
+from datetime import date, time
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, TestCase
+
+from eld_api.log_sheet import day_segments, status_totals
+from eld_api.models import ELDLog
+
+from .factories import make_trip
+
+SIGNATURES = {
+    'svg': ('image/svg+xml', b'<svg'),
+    'png': ('image/png', b'\x89PNG'),
+    'pdf': ('application/pdf', b'%PDF'),
+}
+
+
+class LogSheetTests(TestCase):
+
+    def setUp(self):
+        self.trip = make_trip()
+        for start, end, status in ((time(6), time(8), 'on_duty_not_driving'), (time(8), time(16), 'driving')):
+            ELDLog.objects.create(trip=self.trip, date=date(2026, 10, 19), start_time=start, end_time=end,
+                                  duty_status=status, location='Chicago, IL', total_hours=2)
+
+    def url(self, fmt, day='2026-10-19'):
+        return f'/api/trips/{self.trip.id}/log-sheet/{day}.{fmt}'
+
+    def test_each_format_at_documented_url(self):
+        for fmt, (content_type, signature) in SIGNATURES.items():
+            with self.subTest(fmt=fmt):
+                response = self.client.get(self.url(fmt))
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['Content-Type'].startswith(content_type))
+                self.assertIn(signature, response.content[:200])
+
+    def test_etag_revalidation(self):
+        response = self.client.get(self.url('svg'))
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.url('svg'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(self.url('svg'), HTTP_IF_NONE_MATCH=f'W/{etag}').status_code, 304)
+
+    def test_bad_urls(self):
+        self.assertEqual(self.client.get(self.url('svg') + '/').status_code, 404)
+        self.assertEqual(self.client.get(self.url('gif')).status_code, 404)
+        self.assertEqual(self.client.get(self.url('svg', day='2026-13-40')).status_code, 400)
+        other = '00000000-0000-0000-0000-000000000000'
+        self.assertEqual(self.client.get(f'/api/trips/{other}/log-sheet/2026-10-19.svg').status_code, 404)
+
+
+def log(start, end, duty_status):
+    return SimpleNamespace(start_time=start, end_time=end, duty_status=duty_status)
+
+
+class DaySegmentsTests(SimpleTestCase):
+
+    def test_entry_ending_at_midnight_runs_to_the_end_of_the_day(self):
+        segments = day_segments([log(time(6), time(18), 'driving'), log(time(18), time(0), 'sleeper_berth')])
+        self.assertEqual(segments, [(0, 360, 'off_duty'), (360, 1080, 'driving'), (1080, 1440, 'sleeper_berth')])
+
+    def test_zero_length_entries_are_dropped(self):
+        segments = day_segments([
+            log(time(8), time(16, 26), 'driving'),
+            log(time(18, 26), time(18, 26), 'driving'),
+            log(time(18, 26), time(0), 'sleeper_berth'),
+        ])
+        totals = status_totals(segments)
+        self.assertAlmostEqual(totals['driving'], 8.4333, places=3)
+        self.assertAlmostEqual(totals['sleeper_berth'], 5.5667, places=3)
+        self.assertEqual(sum(end - start for start, end, _ in segments), 1440)
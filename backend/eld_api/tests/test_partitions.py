@@ -0,0 +1,158 @@
+import json
+import shutil
+import tempfile
+from datetime import date, datetime, time, timezone as dt_timezone
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from eld_api import fleet
+from eld_api.models import DriverCycleStat, ELDLog, FleetDailyStat
+from eld_api.partitions import LogPartitionManager
+
+from .factories import make_driver, make_trip
+
+TODAY = date(2026, 10, 19)
+# Archived (before the 6-month retention), cold (rotated) and hot months
+LOG_DATES = [date(2026, 1, 5), date(2026, 2, 10), date(2026, 5, 3), date(2026, 6, 20),
+             date(2026, 9, 14), date(2026, 10, 12), date(2026, 10, 14)]
+
+
+class PartitionedReadTests(TestCase):
+
+    def setUp(self):
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+        settings_override = override_settings(ELD_LOG_ARCHIVE_DIR=archive_dir, ELD_LOG_RETENTION_MONTHS=6)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.driver = make_driver()
+        self.trip = make_trip(driver=self.driver)
+        self.logs = [
+            ELDLog.objects.create(
+                trip=self.trip, driver=self.driver, date=log_date, start_time=time(8), end_time=time(10),
+                duty_status='driving', location='Somewhere', vehicle_miles=110, total_hours=2,
+                driving_time=2, on_duty_time=2,
+            )
+            for log_date in LOG_DATES
+        ]
+        self.manager = LogPartitionManager()
+
+    def assertAllLogs(self, logs):
+        self.assertEqual([log.date for log in logs], LOG_DATES)
+
+    def test_rotate_moves_old_months_out_of_the_model_table(self):
+        self.manager.rotate(TODAY)
+        self.assertEqual(ELDLog.objects.count(), 3)
+        self.assertAllLogs(self.manager.query(trip_id=self.trip.id))
+
+    def test_archive_keeps_rows_readable(self):
+        self.manager.archive(TODAY)
+        self.assertEqual(self.manager.archives(), [date(2026, 1, 1), date(2026, 2, 1)])
+        self.assertEqual(self.manager.partitions(), [date(2026, 5, 1), date(2026, 6, 1)])
+
+        logs = self.manager.query(trip_id=self.trip.id)
+        self.assertAllLogs(logs)
+        self.assertEqual([log.id for log in logs], [log.id for log in self.logs])
+        self.assertEqual(logs[0].trip_id, self.trip.id)
+        self.assertEqual(logs[0].start_time, time(8))
+        self.assertEqual(len(list(self.manager.iter_rows(trip_id=self.trip.id))), len(LOG_DATES))
+        self.assertEqual([log.date for log in self.manager.query(date(2026, 2, 1), date(2026, 5, 31))],
+                         [date(2026, 2, 10), date(2026, 5, 3)])
+
+    def test_archive_is_idempotent_after_interrupted_drop(self):
+        # Crash after the first archive file is renamed into place, before its partition is dropped
+        with mock.patch.object(LogPartitionManager, '_drop_partition', side_effect=RuntimeError('Interrupted')):
+            with self.assertRaises(RuntimeError):
+                self.manager.archive(TODAY)
+        self.assertEqual(self.manager.archives(), [date(2026, 1, 1)])
+        self.assertIn(date(2026, 1, 1), self.manager.partitions())
+        self.assertAllLogs(self.manager.query(trip_id=self.trip.id))
+
+        self.manager.archive(TODAY)
+        self.assertEqual(self.manager.archives(), [date(2026, 1, 1), date(2026, 2, 1)])
+        self.assertNotIn(date(2026, 1, 1), self.manager.partitions())
+        self.assertAllLogs(self.manager.query(trip_id=self.trip.id))
+        self.assertEqual(len(list(self.manager.iter_rows(date(2026, 1, 1), date(2026, 1, 31)))), 1)
+
+    def test_api_reads_rotated_and_archived_months(self):
+        self.manager.archive(TODAY)
+
+        response = self.client.get('/api/eld-logs/', {'trip_id': str(self.trip.id)})
+        self.assertEqual(len(response.json()), len(LOG_DATES))
+
+        response = self.client.get(f'/api/trips/{self.trip.id}/eld_logs/')
+        self.assertEqual(len(response.json()['logs']), len(LOG_DATES))
+
+        response = self.client.get(f'/api/drivers/{self.driver.id}/logs/', {'from': '2026-01-01', 'to': '2026-06-30'})
+        self.assertEqual(len(response.json()['logs']), 4)
+
+        response = self.client.get(f'/api/eld-logs/{self.logs[0].id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['date'], '2026-01-05')
+
+    def test_export_streams_every_month_and_rejects_bad_ids(self):
+        self.manager.archive(TODAY)
+        response = self.client.get('/api/eld-logs/export/', {'trip_id': str(self.trip.id)})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(sorted(row['date'] for row in rows), [log_date.isoformat() for log_date in LOG_DATES])
+
+        for name in ('trip_id', 'driver_id'):
+            response = self.client.get('/api/eld-logs/export/', {name: 'bad'})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(name, response.json())
+
+    def test_fleet_rebuild_counts_archived_miles(self):
+        self.manager.archive(TODAY)
+        fleet.rebuild(TODAY)
+        self.assertEqual(FleetDailyStat.objects.get(date=date(2026, 1, 5)).vehicle_miles, 110)
+        self.assertEqual(FleetDailyStat.objects.count(), len(LOG_DATES))
+
+    def test_cycle_hours_include_rotated_rows(self):
+        self.manager.rotate(TODAY)
+        self.assertEqual(self.driver.cycle_hours(date(2026, 6, 22)), 2)
+        self.assertEqual(fleet.cycle_hours_by_driver(date(2026, 10, 14)), {self.driver.id: 4})
+
+    @mock.patch('django.utils.timezone.now', return_value=datetime(2026, 10, 19, 12, tzinfo=dt_timezone.utc))
+    def test_trip_driver_change_reaches_every_partition(self, _now):
+        self.manager.archive(TODAY)
+        other = make_driver()
+
+        response = self.client.patch(f'/api/trips/{self.trip.id}/', {'driver': str(other.id)},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertAllLogs(self.manager.query(driver_id=other.id))
+        self.assertEqual(self.manager.query(driver_id=self.driver.id), [])
+        response = self.client.get(f'/api/drivers/{other.id}/logs/', {'from': '2026-01-01', 'to': '2026-10-31'})
+        self.assertEqual(len(response.json()['logs']), len(LOG_DATES))
+        stats = dict(DriverCycleStat.objects.values_list('driver_id', 'cycle_hours'))
+        self.assertEqual(stats, {self.driver.id: 0, other.id: 4})
+
+    def test_deleting_a_trip_removes_its_rotated_and_archived_logs(self):
+        self.manager.archive(TODAY)
+        kept = make_trip(driver=self.driver)
+        ELDLog.objects.create(trip=kept, driver=self.driver, date=date(2026, 1, 6), start_time=time(8),
+                              end_time=time(9), duty_status='driving', location='Somewhere', total_hours=1,
+                              driving_time=1, on_duty_time=1)
+        self.manager.archive(TODAY)
+        self.assertFalse(ELDLog.objects.filter(trip=kept).exists())
+
+        response = self.client.delete(f'/api/trips/{self.trip.id}/')
+        self.assertEqual(response.status_code, 204)
+
+        self.assertEqual(self.manager.query(trip_id=self.trip.id), [])
+        self.assertEqual([log.trip_id for log in self.manager.query(driver_id=self.driver.id)], [kept.id])
+        response = self.client.get(f'/api/drivers/{self.driver.id}/logs/', {'from': '2026-01-01', 'to': '2026-10-31'})
+        self.assertEqual(len(response.json()['logs']), 1)
+
+    def test_deleting_a_driver_clears_them_from_rotated_and_archived_logs(self):
+        self.manager.archive(TODAY)
+
+        response = self.client.delete(f'/api/drivers/{self.driver.id}/')
+        self.assertEqual(response.status_code, 204)
+
+        self.assertEqual(self.manager.query(driver_id=self.driver.id), [])
+        self.assertEqual([log.driver_id for log in self.manager.query(trip_id=self.trip.id)], [None] * len(LOG_DATES))
+        self.assertEqual(fleet.cycle_hours_by_driver(date(2026, 6, 22)), {})
@@ -0,0 +1,65 @@
+from django.test import SimpleTestCase, TestCase
+
+from eld_api.plan_cache import PlanCache, get_simulation_plan_cache, get_trip_plan_cache, lane_key
+from eld_api.services import get_trip_plan, simulate_trips
+
+from .factories import make_trip
+
+
+class FakeClock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class PlanCacheTests(SimpleTestCase):
+
+    def test_lane_key_normalizes_locations(self):
+        self.assertEqual(lane_key('Chicago, IL', ' chicago  il', 'DALLAS,TX'),
+                         lane_key('chicago il', 'Chicago, IL', 'Dallas TX'))
+        self.assertNotEqual(lane_key('Chicago, IL', 'Chicago, IL', 'Dallas, TX', via=['Denver, CO']),
+                            lane_key('Chicago, IL', 'Chicago, IL', 'Dallas, TX'))
+
+    def test_hits_evictions_and_expiry(self):
+        clock = FakeClock()
+        cache = PlanCache(max_entries=2, ttl_seconds=10, clock=clock)
+        builds = []
+
+        def build(key):
+            return lambda: builds.append(key) or key
+
+        for key in ('a', 'b', 'a', 'c', 'b'):
+            cache.get_or_build(key, build(key))
+        # 'b' was least recently used when 'c' arrived
+        self.assertEqual(builds, ['a', 'b', 'c', 'b'])
+
+        clock.now = 11
+        cache.get_or_build('c', build('c'))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['expirations']), (1, 5, 2, 1))
+        self.assertEqual(len(cache), 2)
+
+
+class SeparateCachesTests(TestCase):
+
+    def setUp(self):
+        get_trip_plan_cache.cache_clear()
+        get_simulation_plan_cache.cache_clear()
+        self.addCleanup(get_trip_plan_cache.cache_clear)
+        self.addCleanup(get_simulation_plan_cache.cache_clear)
+
+    def test_simulations_do_not_touch_the_trip_plan_cache(self):
+        variant = {'current_location': 'Chicago, IL', 'pickup_location': 'Chicago, IL',
+                   'dropoff_location': 'Dallas, TX', 'current_cycle_hours': 0}
+        simulate_trips([variant, {**variant, 'current_cycle_hours': 60}])
+
+        self.assertEqual(len(get_trip_plan_cache()), 0)
+        stats = get_simulation_plan_cache().stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_trips_share_the_trip_plan_cache(self):
+        trip = make_trip(dropoff_location='Dallas, TX')
+        self.assertIs(get_trip_plan(trip), get_trip_plan(trip))
+        self.assertEqual(get_trip_plan_cache().stats()['hits'], 1)
+        self.assertEqual(len(get_simulation_plan_cache()), 0)
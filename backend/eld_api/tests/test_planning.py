@@ -0,0 +1,86 @@
+from datetime import time
+
+from django.test import TestCase
+
+from eld_api.hos_rules import get_rule_engine
+from eld_api.models import ELDLog, HOSViolation, Trip
+from eld_api.services import GAZETTEER, build_trip_plan
+
+
+class TripPlanTests(TestCase):
+
+    def assertContiguous(self, segments):
+        for previous, segment in zip(segments, segments[1:]):
+            self.assertEqual(previous['start_offset_minutes'] + previous['duration_minutes'],
+                             segment['start_offset_minutes'])
+
+    def test_mid_length_trip_breaks_before_eight_hours(self):
+        # About 800 miles: more than 8 hours of driving, less than two shifts
+        plan = build_trip_plan('Chicago, IL', 'Chicago, IL', 'Dallas, TX')
+        self.assertContiguous(plan.eld_logs)
+        violations = get_rule_engine().evaluate(plan.duty_timeline)
+        self.assertFalse([v for v in violations if v['severity'] == 'violation'], violations)
+
+        stop_types = [stop['stop_type'] for stop in plan.stops]
+        self.assertEqual(stop_types, ['pickup', 'mandatory_break', 'rest_stop', 'dropoff'])
+        driven = sum(s['vehicle_miles'] for s in plan.eld_logs if s['duty_status'] == 'driving')
+        self.assertAlmostEqual(driven, plan.total_distance + 50, delta=len(plan.eld_logs))
+
+    def test_short_trip_has_no_breaks(self):
+        plan = build_trip_plan('Chicago, IL', 'Chicago, IL', 'Nashville, TN')
+        self.assertEqual([stop['stop_type'] for stop in plan.stops], ['pickup', 'dropoff'])
+        self.assertEqual(get_rule_engine().evaluate(plan.duty_timeline), [])
+
+    def test_long_trip_uses_placed_stops(self):
+        plan = build_trip_plan('Chicago, IL', 'Chicago, IL', 'Los Angeles, CA')
+        self.assertContiguous(plan.eld_logs)
+        violations = get_rule_engine().evaluate(plan.duty_timeline)
+        self.assertFalse([v for v in violations if v['severity'] == 'violation'], violations)
+
+        stop_types = [stop['stop_type'] for stop in plan.stops]
+        self.assertIn('fuel_stop', stop_types)
+        self.assertEqual(stop_types.count('rest_stop'), 2)
+        # Every stop's arrival is where the log skeleton reaches it
+        starts = {(s['start_offset_minutes'], s['location']) for s in plan.eld_logs}
+        for stop in plan.stops:
+            self.assertIn((stop['arrival_offset_minutes'], stop['location']), starts)
+
+    def test_every_gazetteer_lane_logs_whole_minutes(self):
+        cities = [city.title() for city, _ in GAZETTEER]
+        for origin in cities:
+            for destination in cities:
+                if origin == destination:
+                    continue
+                plan = build_trip_plan(origin, origin, destination)
+                with self.subTest(lane=(origin, destination)):
+                    self.assertTrue(all(s['duration_minutes'] > 0 for s in plan.eld_logs))
+                    self.assertContiguous(plan.eld_logs)
+                    # Miles of legs too short to log still count, on the stop they lead to
+                    self.assertAlmostEqual(sum(s['vehicle_miles'] for s in plan.eld_logs),
+                                           plan.total_distance + 50, delta=len(plan.eld_logs))
+
+    def test_rest_is_not_taken_where_the_break_was(self):
+        plan = build_trip_plan('Memphis, TN', 'Memphis, TN', 'Phoenix, AZ')
+        for stop, following in zip(plan.stops, plan.stops[1:]):
+            if following['stop_type'] == 'rest_stop':
+                self.assertGreater(following['arrival_offset_minutes'],
+                                   stop['arrival_offset_minutes'] + stop['duration_minutes'])
+                self.assertNotEqual(following['location'], stop['location'])
+
+    def test_stored_logs_are_split_at_midnight(self):
+        response = self.client.post('/api/trips/', {
+            'current_location': 'Chicago, IL', 'pickup_location': 'Chicago, IL',
+            'dropoff_location': 'Los Angeles, CA', 'current_cycle_hours': 0,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        trip = Trip.objects.get()
+        self.assertEqual(trip.compliance_status, 'compliant')
+        self.assertFalse(HOSViolation.objects.filter(severity='violation').exists())
+
+        logs = list(ELDLog.objects.filter(trip=trip))
+        for log in logs:
+            self.assertTrue(log.end_time > log.start_time or log.end_time == time(0), log)
+        plan = build_trip_plan('Chicago, IL', 'Chicago, IL', 'Los Angeles, CA')
+        self.assertAlmostEqual(sum(log.driving_time for log in logs),
+                               sum(s['driving_time'] for s in plan.eld_logs))
+        self.assertEqual(sum(log.vehicle_miles for log in logs), sum(s['vehicle_miles'] for s in plan.eld_logs))
@@ -0,0 +1,86 @@
+import gzip
+import json
+from unittest import mock
+
+import brotli
+import msgpack
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from eld_api.compression import CompressionMiddleware
+from eld_api.renderers import MessagePackRenderer, from_columnar, to_columnar
+
+
+class ColumnarTests(SimpleTestCase):
+
+    def test_round_trip(self):
+        data = {'trip_id': 'a', 'logs': [
+            {'id': 7, 'date': '2026-10-19', 'start_time': '08:00:00', 'trip': 'x', 'status': 'driving',
+             'created_at': '2026-10-19T08:00:00.000001Z'},
+            {'id': 9, 'date': '2026-10-20', 'start_time': '07:30:00', 'trip': 'x', 'status': 'off_duty',
+             'created_at': '2026-10-20T07:30:00Z'},
+        ]}
+        columnar = to_columnar(data)
+        columns = columnar['logs']['$columns']
+        self.assertEqual(columns['id'], {'delta': [7, 2]})
+        self.assertEqual(columns['trip'], {'constant': 'x'})
+        self.assertEqual(columns['date'], {'date_delta': [20745, 1]})
+        self.assertEqual(from_columnar(json.loads(json.dumps(columnar))), data)
+
+
+class ContentNegotiationTests(TestCase):
+
+    def setUp(self):
+        response = self.client.post('/api/trips/', {
+            'current_location': 'Chicago, IL', 'pickup_location': 'Chicago, IL',
+            'dropoff_location': 'Dallas, TX', 'current_cycle_hours': 0,
+        }, content_type='application/json')
+        self.url = f"/api/trips/{response.json()['trip']['id']}/eld_logs/"
+        self.expected = self.client.get(self.url).json()
+
+    def test_columnar_by_format_and_accept(self):
+        for kwargs in ({'data': {'format': 'columnar'}}, {'HTTP_ACCEPT': 'application/vnd.eld.columnar+json'}):
+            response = self.client.get(self.url, **kwargs)
+            self.assertEqual(response['Content-Type'], 'application/vnd.eld.columnar+json')
+            self.assertEqual(from_columnar(json.loads(response.content)), self.expected)
+
+    def test_msgpack(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), self.expected)
+
+    def test_msgpack_not_offered_without_the_package(self):
+        with mock.patch.object(MessagePackRenderer, 'available', False):
+            self.assertEqual(self.client.get(self.url, HTTP_ACCEPT='application/msgpack').status_code, 406)
+            response = self.client.get(self.url, HTTP_ACCEPT='application/msgpack, application/json;q=0.5')
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_brotli_when_accepted(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(brotli.decompress(response.content)), self.expected)
+
+    def test_gzip_without_brotli(self):
+        with mock.patch('eld_api.compression.brotli', None):
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content)), self.expected)
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+
+    def compress(self, response):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip, br')
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_small_responses_are_not_compressed(self):
+        self.assertFalse(self.compress(HttpResponse('x' * 50)).has_header('Content-Encoding'))
+
+    def test_event_streams_are_not_compressed(self):
+        response = self.compress(HttpResponse('data: x\n\n' * 100, content_type='text/event-stream'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_brotli_weakens_etag(self):
+        response = self.compress(HttpResponse('{"a": 1}' * 100, headers={'ETag': '"abc"'}))
+        self.assertEqual((response['Content-Encoding'], response['ETag']), ('br', 'W/"abc"'))
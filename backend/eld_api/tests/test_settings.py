@@ -0,0 +1,13 @@
+import importlib
+import sys
+
+from django.test import SimpleTestCase
+
+
+class ServerlessSettingsTests(SimpleTestCase):
+
+    def test_profile_does_not_block_imports(self):
+        module = importlib.import_module('config.settings_serverless')
+        self.assertFalse([name for name, value in sys.modules.items() if value is None and '.' not in name])
+        self.assertNotIn('django.contrib.admin', module.INSTALLED_APPS)
+        self.assertFalse(module.ELD_PREWARM_REFERENCE_DATA)
@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from eld_api.models import ELDLog, RouteStop, Trip
+from eld_api.services import simulate_trips
+
+LANE = {'current_location': 'Chicago, IL', 'pickup_location': 'Chicago, IL', 'dropoff_location': 'Denver, CO'}
+
+
+class SimulateApiTests(TestCase):
+
+    def setUp(self):
+        # Token buckets live in the default cache
+        cache.clear()
+
+    def simulate(self, body):
+        return self.client.post('/api/trips/simulate/', body, content_type='application/json')
+
+    def test_ranks_variants_without_persisting(self):
+        response = self.simulate({'base': LANE, 'variants': [
+            {'current_cycle_hours': 69}, {'current_cycle_hours': 0}, {'current_cycle_hours': 0, 'via': ['Nashville, TN']},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        plans = response.json()['plans']
+
+        self.assertEqual([plan['rank'] for plan in plans], [1, 2, 3])
+        self.assertEqual([plan['index'] for plan in plans], [1, 2, 0])
+        self.assertTrue(plans[0]['can_complete_trip'])
+        self.assertFalse(plans[2]['can_complete_trip'])
+        self.assertIn('cycle_limit', [v['violation_type'] for v in plans[2]['violations']])
+        self.assertGreater(plans[1]['total_distance'], plans[0]['total_distance'])
+        self.assertEqual((plans[0]['stops'][0]['stop_type'], plans[0]['stops'][-1]['stop_type']), ('pickup', 'dropoff'))
+        self.assertFalse(Trip.objects.exists() or RouteStop.objects.exists() or ELDLog.objects.exists())
+
+    def test_rejects_incomplete_variants(self):
+        response = self.simulate({'base': LANE, 'variants': [{'current_cycle_hours': 0}, {}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('variants', response.json())
+
+    @override_settings(TRIP_SIMULATION_MAX_VARIANTS=2)
+    def test_limits_variants_per_request(self):
+        response = self.simulate({'base': {**LANE, 'current_cycle_hours': 0}, 'variants': [{}, {}, {}]})
+        self.assertEqual(response.status_code, 400)
+
+
+class SimulationBudgetTests(TestCase):
+
+    def test_variants_past_the_budget_are_skipped(self):
+        result = simulate_trips([{**LANE, 'current_cycle_hours': 0}] * 3, budget_seconds=0)
+        self.assertEqual([plan['status'] for plan in result['plans']], ['skipped'] * 3)
+        self.assertEqual([plan['index'] for plan in result['plans']], [0, 1, 2])
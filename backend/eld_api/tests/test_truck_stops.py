@@ -0,0 +1,70 @@
+from django.test import SimpleTestCase
+
+from eld_api.geo import Polyline, haversine_miles
+from eld_api.truck_stops import StopPlacementEngine, TruckStop, TruckStopIndex, load_truck_stops
+
+# Due east along the 40th parallel, about 53 miles per degree of longitude
+ROUTE = [(40.0, float(lon)) for lon in range(-100, -79)]
+FUEL_STOP = TruckStop('Pilot', 'truck_stop', 40.1, -83.0, 'Columbus', 'OH')
+REST_AREA = TruckStop('I-70 Rest Area', 'rest_area', 39.9, -94.5, 'Topeka', 'KS')
+
+
+def route_mile(stop: TruckStop) -> float:
+    return (stop.longitude - ROUTE[0][1]) * haversine_miles((40.0, 0.0), (40.0, 1.0))
+
+
+class StopPlacementTests(SimpleTestCase):
+
+    def setUp(self):
+        self.engine = StopPlacementEngine(TruckStopIndex([FUEL_STOP, REST_AREA]))
+
+    def test_fuel_and_rest_at_real_stops_within_reach(self):
+        fuel, = self.engine.place(ROUTE)
+        self.assertEqual((fuel.stop_type, fuel.location), ('fuel_stop', 'Pilot - Columbus, OH'))
+        self.assertLessEqual(fuel.route_mile, 1000)
+        self.assertAlmostEqual(fuel.route_mile, route_mile(FUEL_STOP), delta=5)
+
+        rest = self.engine.place_rest(Polyline(ROUTE), 0, 300, 'mandatory_break', 'Mandatory Rest Break')
+        self.assertEqual((rest.stop_type, rest.location), ('mandatory_break', 'I-70 Rest Area - Topeka, KS'))
+        self.assertLessEqual(rest.route_mile, 300)
+
+    def test_falls_back_to_the_deadline_without_a_stop_nearby(self):
+        engine = StopPlacementEngine(TruckStopIndex([]))
+        fuel, = engine.place(ROUTE)
+        self.assertEqual((fuel.location, fuel.route_mile), ('Fuel Stop 1', 1000))
+        rest = engine.place_rest(Polyline(ROUTE), 0, 300, 'mandatory_break', 'Mandatory Rest Break')
+        self.assertEqual((rest.location, rest.route_mile), ('Mandatory Rest Break', 300))
+
+    def test_rest_must_start_inside_its_window(self):
+        route = Polyline(ROUTE)
+        rest = self.engine.place_rest(route, 250, 300, 'rest_stop', 'Rest Stop')
+        self.assertEqual(rest.location, 'I-70 Rest Area - Topeka, KS')
+        # The rest area lies before the window opens, so it falls back to the deadline
+        late = self.engine.place_rest(route, 295, 320, 'rest_stop', 'Rest Stop')
+        self.assertEqual((late.location, late.route_mile), ('Rest Stop', 320))
+
+    def test_fuel_gaps_on_a_long_route(self):
+        engine = StopPlacementEngine(TruckStopIndex(load_truck_stops()), fuel_range_miles=400)
+        route = [(40.7128, -74.0060), (39.7392, -104.9903), (34.0522, -118.2437)]
+        miles = [0] + [stop.route_mile for stop in engine.place(route)] + [Polyline(route).length]
+        self.assertGreater(len(miles), 2)
+        self.assertTrue(all(0 < b - a <= 400 for a, b in zip(miles, miles[1:])))
+
+
+class TruckStopIndexTests(SimpleTestCase):
+
+    def test_nearest_matches_brute_force(self):
+        stops = load_truck_stops()
+        index = TruckStopIndex(stops)
+        for lat in range(30, 48, 3):
+            for lon in range(-120, -72, 6):
+                point = (float(lat), float(lon))
+                candidates = [(haversine_miles(point, (s.latitude, s.longitude)), s) for s in stops
+                              if s.kind == 'truck_stop']
+                expected = min(candidates, key=lambda c: c[0])
+                hit = index.nearest(point, 200, ('truck_stop',))
+                if expected[0] > 200:
+                    self.assertIsNone(hit)
+                    continue
+                self.assertEqual(hit[0], expected[1])
+                self.assertAlmostEqual(hit[1], expected[0], places=3)
@@ -0,0 +1,57 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+
+from eld_api.models import FleetStat, HOSViolation
+from eld_api.services import HOSService
+
+from .factories import make_trip
+
+MONDAY = date(2026, 10, 19)
+
+
+def violation(violation_type, severity='violation', description='Over the limit'):
+    return {'violation_type': violation_type, 'severity': severity, 'description': description}
+
+
+def open_counts():
+    return {stat.key: stat.value for stat in FleetStat.objects.filter(key__contains=':') if stat.value}
+
+
+class StoreViolationsTests(TestCase):
+
+    def setUp(self):
+        self.service = HOSService()
+        self.trip = make_trip()
+
+    def test_recalculating_updates_rows_in_place(self):
+        first, = self.service._store_violations(self.trip, MONDAY, [violation('daily_driving')])
+        again, = self.service._store_violations(self.trip, MONDAY, [violation('daily_driving', 'warning', 'Close')])
+
+        self.assertEqual(again['id'], first['id'])
+        self.assertEqual(again['created_at'], first['created_at'])
+        self.assertEqual((again['severity'], again['description']), ('warning', 'Close'))
+        self.assertEqual(HOSViolation.objects.filter(trip=self.trip).count(), 1)
+        self.assertEqual(self.trip.compliance_status, 'compliant')
+        self.assertEqual(open_counts(), {'warning:daily_driving': 1})
+
+    def test_returns_stored_rows_in_found_order(self):
+        stored = self.service._store_violations(self.trip, MONDAY, [violation('daily_duty'), violation('cycle_limit')])
+        self.assertEqual([v['violation_type'] for v in stored], ['daily_duty', 'cycle_limit'])
+        self.assertTrue(all(v['id'] and v['created_at'] for v in stored))
+        self.assertEqual(self.trip.compliance_status, 'violation')
+
+    def test_violations_of_other_windows_are_resolved(self):
+        self.service._store_violations(self.trip, MONDAY, [violation('daily_driving'), violation('cycle_limit')])
+        self.service._store_violations(self.trip, MONDAY + timedelta(days=1), [violation('cycle_limit')])
+
+        rows = list(HOSViolation.objects.filter(trip=self.trip).values_list('violation_type', 'window_start'))
+        self.assertEqual(rows, [('cycle_limit', MONDAY + timedelta(days=1))])
+        self.assertEqual(open_counts(), {'violation:cycle_limit': 1})
+
+    def test_no_violations_clears_the_trip(self):
+        self.service._store_violations(self.trip, MONDAY, [violation('daily_driving')])
+        self.assertEqual(self.service._store_violations(self.trip, MONDAY + timedelta(days=2), []), [])
+        self.assertFalse(HOSViolation.objects.filter(trip=self.trip).exists())
+        self.assertEqual(open_counts(), {})
+        self.assertEqual(self.trip.compliance_status, 'compliant')
@@ -0,0 +1,171 @@
+import csv
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .geo import (
+    EARTH_RADIUS_MILES, Coordinate, KDTree, Polyline, chord_to_miles, miles_to_chord, to_unit_vector
+)
+
+TRUCK_STOPS_CSV = Path(__file__).resolve().parent / 'data' / 'truck_stops.csv'
+
+FUEL_RANGE_MILES = 1000         # Refuel at least this often
+SEARCH_RADIUS_MILES = 75        # How far off the route a stop may be
+
+
+@dataclass(frozen=True)
+class TruckStop:
+    """A truck stop or public rest area from the local dataset"""
+    name: str
+    kind: str
+    latitude: float
+    longitude: float
+    city: str
+    state: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} - {self.city}, {self.state}"
+
+
+@dataclass(frozen=True)
+class PlannedStop:
+    """A stop chosen by the placement engine, positioned by route mileage"""
+    stop_type: str
+    location: str
+    latitude: float
+    longitude: float
+    route_mile: float
+
+
+class TruckStopIndex:
+    """Nearest-stop lookups over the truck-stop dataset, one KD-tree per stop kind"""
+
+    def __init__(self, stops: Iterable[TruckStop]):
+        by_kind: Dict[str, List[TruckStop]] = {}
+        for stop in stops:
+            by_kind.setdefault(stop.kind, []).append(stop)
+
+        self._stops = by_kind
+        self._trees = {
+            kind: KDTree([to_unit_vector(s.latitude, s.longitude) for s in kind_stops])
+            for kind, kind_stops in by_kind.items()
+        }
+
+    def __len__(self):
+        return sum(len(stops) for stops in self._stops.values())
+
+    def nearest(self, coords: Coordinate, max_miles: float, kinds: Sequence[str]) -> Optional[Tuple[TruckStop, float]]:
+        """Return the closest stop of any of `kinds` within max_miles, with its distance"""
+        target = to_unit_vector(*coords)
+        best = None
+        max_chord = miles_to_chord(max_miles)
+        for kind in kinds:
+            tree = self._trees.get(kind)
+            if tree is None:
+                continue
+            hit = tree.nearest(target, max_chord)
+            if hit is not None and (best is None or hit[1] < best[1]):
+                best = (self._stops[kind][hit[0]], hit[1])
+                max_chord = hit[1]
+
+        if best is None:
+            return None
+        return best[0], chord_to_miles(best[1])
+
+
+def load_truck_stops(path: Path = TRUCK_STOPS_CSV) -> List[TruckStop]:
+    """Read the truck-stop dataset from CSV"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [
+            TruckStop(
+                name=row['name'],
+                kind=row['kind'],
+                latitude=float(row['latitude']),
+                longitude=float(row['longitude']),
+                city=row['city'],
+                state=row['state'],
+            )
+            for row in csv.DictReader(f)
+        ]
+
+
+@lru_cache(maxsize=None)
+def get_truck_stop_index() -> TruckStopIndex:
+    """Process-wide truck-stop index, built on first use"""
+    return TruckStopIndex(load_truck_stops())
+
+
+class StopPlacementEngine:
+    """Places fuel stops and mandatory breaks at real stops along a route polyline
+
+    Each placement is one polyline interpolation (O(log segments)) and one
+    KD-tree query (O(log stations)).
+    """
+
+    def __init__(self, index: TruckStopIndex, fuel_range_miles: float = FUEL_RANGE_MILES,
+                 search_radius_miles: float = SEARCH_RADIUS_MILES):
+        self.index = index
+        self.fuel_range_miles = fuel_range_miles
+        self.search_radius_miles = search_radius_miles
+
+    def place(self, coords: Sequence[Coordinate]) -> List[PlannedStop]:
+        """Return fuel stops for the route, ordered by route mileage
+
+        Breaks and rests depend on the driving so far and are placed with place_rest.
+        """
+        route = Polyline(coords)
+        planned = []
+
+        last_fuel = 0.0
+        fuel_number = 0
+        while route.length - last_fuel > self.fuel_range_miles:
+            fuel_number += 1
+            stop = self._place_before(route, last_fuel, last_fuel + self.fuel_range_miles,
+                                      ('truck_stop',), 'fuel_stop', f"Fuel Stop {fuel_number}")
+            planned.append(stop)
+            last_fuel = stop.route_mile
+        return planned
+
+    def place_rest(self, route: Polyline, earliest: float, deadline: float, stop_type: str,
+                   fallback_name: str, exclude: Optional[Coordinate] = None) -> PlannedStop:
+        """A rest area (or truck stop) for a break or rest that must start after `earliest` and by `deadline`
+
+        `exclude` is where the truck already is, which never counts as a new place to stop.
+        """
+        return self._place_before(route, earliest, deadline, ('rest_area', 'truck_stop'), stop_type, fallback_name,
+                                  exclude)
+
+    def _place_before(self, route: Polyline, earliest: float, deadline: float, kinds: Sequence[str],
+                      stop_type: str, fallback_name: str, exclude: Optional[Coordinate] = None) -> PlannedStop:
+        """Pick the nearest stop that is reachable between `earliest` and `deadline`"""
+        # Searching one radius short of the deadline keeps any hit within reach
+        query_mile = max(earliest, deadline - self.search_radius_miles)
+        query_point = route.point_at(query_mile)
+
+        hit = self.index.nearest(query_point, self.search_radius_miles, kinds)
+        if hit is not None and (hit[0].latitude, hit[0].longitude) != exclude:
+            stop, _ = hit
+            stop_mile = query_mile + self._along_track_offset(route, query_mile, stop)
+            if earliest < stop_mile <= deadline:
+                return PlannedStop(stop_type, stop.label, stop.latitude, stop.longitude, stop_mile)
+
+        # No real stop nearby: keep a generic stop on the route at the deadline
+        lat, lon = route.point_at(deadline)
+        return PlannedStop(stop_type, fallback_name, lat, lon, deadline)
+
+    @staticmethod
+    def _along_track_offset(route: Polyline, mile: float, stop: TruckStop) -> float:
+        """Signed miles from `mile` to the stop's projection onto the local route direction"""
+        here = route.point_at(mile)
+        ahead = route.point_at(mile + 1)
+        # Local equirectangular frame around the query point
+        scale = math.cos(math.radians(here[0]))
+        dx, dy = (ahead[1] - here[1]) * scale, ahead[0] - here[0]
+        norm = math.hypot(dx, dy)
+        if norm == 0:
+            return 0.0
+        sx, sy = (stop.longitude - here[1]) * scale, stop.latitude - here[0]
+        return math.radians((sx * dx + sy * dy) / norm) * EARTH_RADIUS_MILES
@@ -1,13 +1,21 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
-from .views import TripViewSet, RouteStopViewSet, ELDLogViewSet, HOSViolationViewSet
+from .views import admission_stats, trip_events, DriverViewSet, VehicleViewSet, TripViewSet, RouteStopViewSet, ELDLogViewSet, HOSViolationViewSet, FleetViewSet
 
 router = DefaultRouter()
+router.register(r'drivers', DriverViewSet)
+router.register(r'vehicles', VehicleViewSet)
 router.register(r'trips', TripViewSet)
 router.register(r'route-stops', RouteStopViewSet)
 router.register(r'eld-logs', ELDLogViewSet)
 router.register(r'hos-violations', HOSViolationViewSet)
+router.register(r'fleet', FleetViewSet, basename='fleet')
 
 urlpatterns = [
+    path('api/trips/<uuid:pk>/events/', trip_events, name='trip-events'),
+    path('api/admission-stats/', admission_stats, name='admission-stats'),
+    # A file name, so no trailing slash: /api/trips/<id>/log-sheet/2026-10-19.svg
+    re_path(r'^api/trips/(?P<pk>[0-9a-f-]{36})/log-sheet/(?P<log_date>\d{4}-\d{2}-\d{2})\.(?P<fmt>svg|png|pdf)$',
+            TripViewSet.as_view({'get': 'log_sheet'}), name='trip-log-sheet'),
     path('api/', include(router.urls)),
 ]
@@ -1,38 +1,126 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
+from rest_framework.exceptions import UnsupportedMediaType, ValidationError
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router, transaction
 from django.shortcuts import get_object_or_404
-from .models import Trip, RouteStop, ELDLog, HOSViolation
+from django.utils.dateparse import parse_date
+from datetime import timedelta
+import json
+import uuid
+from .models import CYCLE_DAYS, Driver, Vehicle, Trip, RouteStop, ELDLog, HOSViolation, FleetStat
 from .serializers import (
-    TripSerializer, TripCreateSerializer, RouteStopSerializer,
-    ELDLogSerializer, HOSViolationSerializer
+    DriverSerializer, VehicleSerializer, TripSerializer, TripCreateSerializer, RouteStopSerializer,
+    ELDLogSerializer, HOSViolationSerializer, PositionSerializer, TripSimulationSerializer
 )
-from .services import RouteService, HOSService
+from .admission import TokenBucketThrottle, admission_stats as get_admission_stats, limit_concurrency
+from .clock import from_datetime, now_minutes, today_in
+from .events import get_broker
+from .partitions import LogPartitionManager
+from .plan_cache import get_trip_plan_cache
+# The planning stack (services, eta, fleet, hos_rules, truck stops) is imported by the
+# views that use it, so a cold serverless worker answering reads never loads it
+
+def _parse_uuid_param(request, name):
+    try:
+        return uuid.UUID(request.query_params[name])
+    except ValueError:
+        raise ValidationError({name: "Expected a UUID"})
+
+def _parse_date_param(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Expected a date in YYYY-MM-DD format"})
+    return parsed
+
+class DriverViewSet(viewsets.ModelViewSet):
+    """API ViewSet for Driver management"""
+    queryset = Driver.objects.all()
+    serializer_class = DriverSerializer
+
+    @action(detail=True, methods=['get'])
+    def logs(self, request, pk=None):
+        """Get a driver's ELD logs between ?from= and ?to= (default: the 8-day cycle)"""
+        from .hos_rules import get_rule_engine, timeline_from_logs
+
+        driver = get_object_or_404(Driver, pk=pk)
+        date_to = _parse_date_param(request, 'to') or today_in(driver.home_terminal_timezone)
+        date_from = _parse_date_param(request, 'from') or date_to - timedelta(days=CYCLE_DAYS - 1)
+        if date_from > date_to:
+            raise ValidationError({'from': "Must not be after 'to'"})
+
+        # Range scan on the (driver, date, start_time) index of each partition in range
+        logs = LogPartitionManager.for_reads().query(date_from, date_to, driver_id=driver.id)
+
+        return Response({
+            'driver_id': driver.id,
+            'from': date_from,
+            'to': date_to,
+            'logs': ELDLogSerializer(logs, many=True).data,
+            'total_driving_time': sum(log.driving_time for log in logs),
+            'total_on_duty_time': sum(log.on_duty_time for log in logs),
+            'violations': get_rule_engine().evaluate(timeline_from_logs(logs))
+        })
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            # The model table clears the driver from its logs; rotated and archived logs are ours to clear
+            LogPartitionManager().detach_driver(instance.id)
+            instance.delete()
+
+
+class VehicleViewSet(viewsets.ModelViewSet):
+    """API ViewSet for Vehicle management"""
+    queryset = Vehicle.objects.all()
+    serializer_class = VehicleSerializer
 
 class TripViewSet(viewsets.ModelViewSet):
     """API ViewSet for Trip management"""
     queryset = Trip.objects.all()
 
+    # Token-bucket scope per expensive action; other actions are not throttled
+    throttle_scopes = {'create': 'trip_create', 'simulate': 'batch'}
+
     def get_serializer_class(self):
         if self.action == 'create':
             return TripCreateSerializer
         return TripSerializer
 
+    def get_throttles(self):
+        scope = self.throttle_scopes.get(self.action)
+        return [TokenBucketThrottle(scope)] if scope else []
+
+    @limit_concurrency('trip_create')
     def create(self, request, *args, **kwargs):
         """Create a new trip and calculate route and HOS compliance"""
+        from .services import get_hos_service, get_route_service, get_trip_plan
+
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         # Create the trip
         trip = serializer.save()
 
+        # Cycle-independent plan for the lane, memoized across trips
+        plan = get_trip_plan(trip)
+
         # Calculate route
-        route_service = RouteService()
-        route_data = route_service.calculate_route(trip)
+        route_service = get_route_service()
+        route_data = route_service.calculate_route(trip, plan)
 
         # Calculate HOS compliance
-        hos_service = HOSService()
-        hos_data = hos_service.calculate_hos_compliance(trip)
+        hos_service = get_hos_service()
+        hos_data = hos_service.calculate_hos_compliance(trip, plan)
 
         # Return complete trip data
         trip_serializer = TripSerializer(trip)
@@ -43,13 +131,35 @@ class TripViewSet(viewsets.ModelViewSet):
             'hos_compliance': hos_data
         }, status=status.HTTP_201_CREATED)
 
+    def perform_update(self, serializer):
+        from .fleet import refresh_driver_cycle
+
+        previous_driver_id = serializer.instance.driver_id
+        with transaction.atomic():
+            trip = serializer.save()
+            if trip.driver_id != previous_driver_id:
+                # Logs carry their trip's driver for per-driver history and cycle hours
+                LogPartitionManager().reassign_trip(trip.id, trip.driver_id)
+                refresh_driver_cycle([previous_driver_id, trip.driver_id])
+
+    def perform_destroy(self, instance):
+        from .fleet import refresh_driver_cycle
+
+        with transaction.atomic():
+            # The model table cascades to its logs; rotated and archived logs are ours to remove
+            LogPartitionManager().purge_trip(instance.id)
+            instance.delete()
+            refresh_driver_cycle([instance.driver_id])
+
     @action(detail=True, methods=['get'])
     def route(self, request, pk=None):
         """Get route information for a trip"""
+        from .services import get_route_service
+
         trip = get_object_or_404(Trip, pk=pk)
         stops = RouteStop.objects.filter(trip=trip)
 
-        route_service = RouteService()
+        route_service = get_route_service()
 
         return Response({
             'trip_id': trip.id,
@@ -67,7 +177,7 @@ class TripViewSet(viewsets.ModelViewSet):
     def eld_logs(self, request, pk=None):
         """Get ELD logs for a trip"""
         trip = get_object_or_404(Trip, pk=pk)
-        logs = ELDLog.objects.filter(trip=trip)
+        logs = LogPartitionManager.for_reads().query(trip_id=trip.id)
 
         return Response({
             'trip_id': trip.id,
@@ -78,19 +188,85 @@ class TripViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def hos_compliance(self, request, pk=None):
         """Get HOS compliance information for a trip"""
-        trip = get_object_or_404(Trip, pk=pk)
-        violations = HOSViolation.objects.filter(trip=trip)
+        from .services import get_hos_service
+
+        trip = get_object_or_404(Trip.objects.prefetch_related('hos_violations'), pk=pk)
 
-        hos_service = HOSService()
+        hos_service = get_hos_service()
 
         return Response({
             'trip_id': trip.id,
             'current_cycle_hours': trip.current_cycle_hours,
-            'remaining_hours': 70 - trip.current_cycle_hours,
-            'violations': HOSViolationSerializer(violations, many=True).data,
-            'compliance_status': 'compliant' if not violations.filter(severity='violation').exists() else 'violation'
+            'remaining_hours': hos_service.remaining_cycle_hours(trip.current_cycle_hours),
+            'violations': HOSViolationSerializer(trip.hos_violations.all(), many=True).data,
+            # Maintained on the trip row by HOSService, no scan over violations
+            'compliance_status': trip.compliance_status
         })
 
+    @action(detail=True, methods=['post'])
+    def position(self, request, pk=None):
+        """Apply a GPS ping: mark stops reached and shift downstream stop ETAs by the delay"""
+        from .eta import record_position
+
+        serializer = PositionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        recorded_at = data.get('recorded_at')
+
+        result = record_position(
+            pk, (data['latitude'], data['longitude']),
+            from_datetime(recorded_at) if recorded_at else now_minutes()
+        )
+        if result is None:
+            # No stops to re-time; still a 404 for unknown trips
+            trip = get_object_or_404(Trip, pk=pk)
+            result = {'trip_id': str(trip.id), 'next_stop_id': None, 'delay_minutes': 0, 'reached': [], 'updated': []}
+        return Response(result)
+
+    @action(detail=False, methods=['post'])
+    @limit_concurrency('batch')
+    def simulate(self, request):
+        """Plan and rank what-if trip variants without persisting anything"""
+        from .services import simulate_trips
+
+        serializer = TripSimulationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        budget_ms = getattr(settings, 'TRIP_SIMULATION_BUDGET_MS', None)
+        return Response(simulate_trips(
+            serializer.validated_data['variants'],
+            budget_seconds=budget_ms / 1000 if budget_ms else None
+        ))
+
+    # Routed in urls.py: the router would append a slash after the file extension
+    def log_sheet(self, request, pk=None, log_date=None, fmt=None):
+        """Render the 24-hour duty-status grid for one day of a trip"""
+        # Imported on first use: the renderer builds its static grids at import time
+        from .log_sheet import render_log_sheet
+
+        trip = get_object_or_404(Trip, pk=pk)
+        try:
+            day = parse_date(log_date)
+        except ValueError:
+            day = None
+        if day is None:
+            raise ValidationError({'date': "Expected a date in YYYY-MM-DD format"})
+
+        logs = LogPartitionManager.for_reads().query(day, day, trip_id=trip.id)
+        title = f"Daily Log {day.isoformat()} - {trip.pickup_location} to {trip.dropoff_location}"
+        body, content_type, digest = render_log_sheet(logs, title, fmt)
+
+        etag = f'"{digest}"'
+        # Compression weakens the ETag it sends (W/"...")
+        if request.headers.get('If-None-Match', '').removeprefix('W/') == etag:
+            return HttpResponseNotModified(headers={'ETag': etag})
+        return HttpResponse(body, content_type=content_type, headers={'ETag': etag})
+
+    @action(detail=False, methods=['get'], url_path='plan-cache-stats')
+    def plan_cache_stats(self, request):
+        """Get hit rate and latency savings of the trip plan cache"""
+        return Response(get_trip_plan_cache().stats())
+
     def _calculate_daily_summary(self, logs):
         """Calculate daily summary from ELD logs"""
         total_driving = sum(log.driving_time for log in logs)
@@ -122,6 +298,9 @@ class ELDLogViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = ELDLog.objects.all()
     serializer_class = ELDLogSerializer
 
+    def get_throttles(self):
+        return [TokenBucketThrottle('batch')] if self.action == 'bulk' else []
+
     def get_queryset(self):
         queryset = ELDLog.objects.all()
         trip_id = self.request.query_params.get('trip_id', None)
@@ -129,6 +308,62 @@ class ELDLogViewSet(viewsets.ReadOnlyModelViewSet):
             queryset = queryset.filter(trip_id=trip_id)
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        # Rotated and archived months are outside the model table
+        filters = {}
+        if 'trip_id' in request.query_params:
+            filters['trip_id'] = _parse_uuid_param(request, 'trip_id')
+        logs = LogPartitionManager.for_reads().query(**filters)
+        return Response(self.get_serializer(logs, many=True).data)
+
+    def get_object(self):
+        pk = self.kwargs['pk']
+        if not str(pk).isdigit():
+            raise Http404
+        log = self.get_queryset().filter(pk=pk).first()
+        if log is None:
+            log = next(iter(LogPartitionManager.for_reads().query(id=int(pk))), None)
+        if log is None:
+            raise Http404
+        self.check_object_permissions(self.request, log)
+        return log
+
+    @action(detail=False, methods=['post'])
+    @limit_concurrency('batch')
+    def bulk(self, request):
+        """Ingest NDJSON, CSV or a JSON array of log records; replayed records are skipped"""
+        from .ingest import PARSERS, BulkLogIngestor
+
+        content_type = request.content_type.split(';')[0].strip()
+        parser = PARSERS.get(content_type)
+        if parser is None:
+            raise UnsupportedMediaType(content_type)
+
+        # NDJSON and CSV bodies are read line by line so large uploads are never held in memory
+        lines = iter(request.stream.readline, b'') if request.stream is not None else iter(())
+        result = BulkLogIngestor().ingest(parser(lines))
+
+        if result['rejected'] and not result['inserted'] and not result['duplicates']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream logs as NDJSON across live partitions and archived months"""
+        # Validated up front: the stream's 200 headers go out before the first row is read
+        filters = {
+            name: _parse_uuid_param(request, name)
+            for name in ('trip_id', 'driver_id')
+            if name in request.query_params
+        }
+        rows = LogPartitionManager.for_reads().iter_rows(
+            _parse_date_param(request, 'from'), _parse_date_param(request, 'to'), **filters
+        )
+        return StreamingHttpResponse(
+            (json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in rows),
+            content_type='application/x-ndjson'
+        )
+
 class HOSViolationViewSet(viewsets.ReadOnlyModelViewSet):
     """API ViewSet for HOS Violations"""
     queryset = HOSViolation.objects.all()
@@ -140,3 +375,61 @@ class HOSViolationViewSet(viewsets.ReadOnlyModelViewSet):
         if trip_id is not None:
             queryset = queryset.filter(trip_id=trip_id)
         return queryset
+
+class FleetViewSet(viewsets.ViewSet):
+    """API ViewSet for fleet dashboard totals"""
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Fleet totals read from the incrementally maintained summary tables
+
+        ?date= picks the log date for miles_today, e.g. the dashboard's local date.
+        """
+        from .fleet import summary as fleet_summary
+
+        return Response(fleet_summary(_parse_date_param(request, 'date'), using=router.db_for_read(FleetStat)))
+
+@api_view(['GET'])
+def admission_stats(request):
+    """Queue depth, shed counts and throttled requests of the admission controls (this process)"""
+    return Response(get_admission_stats())
+
+SSE_HEARTBEAT_SECONDS = 15
+
+async def trip_events(request, pk):
+    """Server-sent events stream of a trip's deltas: new stops, log segments and violations
+
+    Needs an ASGI server (config.asgi); each open stream holds only an
+    in-memory subscription, no database connection. Under WSGI the stream
+    would be buffered and its per-request event loop closed under it, so
+    the endpoint answers 501 there.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse('Trip event streams need an ASGI server.', status=501, content_type='text/plain')
+    if not await Trip.objects.filter(pk=pk).aexists():
+        return HttpResponse(status=404)
+
+    last_event_id = request.headers.get('Last-Event-ID')
+    subscription = get_broker().subscribe(
+        pk, int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    )
+
+    async def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                event = await subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ': keepalive\n\n'
+                    continue
+                yield (
+                    f"id: {event['id']}\nevent: {event['event']}\n"
+                    f"data: {json.dumps(event['data'], cls=DjangoJSONEncoder)}\n\n"
+                )
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
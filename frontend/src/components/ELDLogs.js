@@ -28,6 +28,20 @@ const ELDLogs = ({ tripId }) => {
     }
   }, [tripId]);
 
+  // Append segments as they are logged instead of polling (ASGI deployments only)
+  useEffect(() => {
+    if (!tripId || !apiService.liveEventsEnabled) {
+      return undefined;
+    }
+    return apiService.subscribeTripEvents(tripId, {
+      log_segments_added: (segments) => {
+        setEldLogs((logs) => [...logs, ...segments].sort((a, b) =>
+          `${a.date}T${a.start_time}`.localeCompare(`${b.date}T${b.start_time}`)
+        ));
+      },
+    });
+  }, [tripId]);
+
   const getDutyStatusBadge = (status) => {
     const statusConfig = {
       off_duty: { variant: 'secondary', label: 'Off Duty', icon: 'fa-home' },
@@ -3,6 +3,9 @@ import axios from 'axios';
 const API_BASE_URL = process.env.REACT_APP_API_BASE_URL ||
   (process.env.NODE_ENV === 'production' ? '/api' : 'http://localhost:8000/api');
 
+// Trip event streams need the backend served over ASGI; WSGI deployments answer 501
+const LIVE_EVENTS_ENABLED = process.env.REACT_APP_LIVE_EVENTS === 'true';
+
 // Create axios instance with base configuration
 const api = axios.create({
   baseURL: API_BASE_URL,
@@ -11,6 +14,26 @@ const api = axios.create({
   },
 });
 
+// Read-your-writes: after a write the backend names a deadline until which this client's
+// reads must go to the primary database; echo it back until then
+const READ_PRIMARY_HEADER = 'X-ELD-Read-Primary-Until';
+let readPrimaryUntil = 0;
+
+api.interceptors.request.use((config) => {
+  if (Date.now() / 1000 < readPrimaryUntil) {
+    config.headers[READ_PRIMARY_HEADER] = String(readPrimaryUntil);
+  }
+  return config;
+});
+
+api.interceptors.response.use((response) => {
+  const until = Number(response.headers[READ_PRIMARY_HEADER.toLowerCase()]);
+  if (until > readPrimaryUntil) {
+    readPrimaryUntil = until;
+  }
+  return response;
+});
+
 // API service methods
 export const apiService = {
   // Trip management
@@ -39,6 +62,20 @@ export const apiService = {
     return response.data;
   },
 
+  // Live trip deltas pushed by the server; returns a function that closes the stream
+  liveEventsEnabled: LIVE_EVENTS_ENABLED,
+
+  subscribeTripEvents: (tripId, handlers) => {
+    if (!LIVE_EVENTS_ENABLED) {
+      return () => {};
+    }
+    const source = new EventSource(`${API_BASE_URL}/trips/${tripId}/events/`);
+    Object.entries(handlers).forEach(([eventType, handler]) => {
+      source.addEventListener(eventType, (event) => handler(JSON.parse(event.data)));
+    });
+    return () => source.close();
+  },
+
   // Route stops
   getRouteStops: async (tripId) => {
     const response = await api.get(`/route-stops/?trip_id=${tripId}`);